@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +44,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.RequestTimingMiddleware',
+    'core.middleware.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,6 +54,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'app.urls'
@@ -79,6 +86,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # WAL: a reader (e.g. the streamed stories export, one transaction) does not block the writers
+        'OPTIONS': {'init_command': 'PRAGMA journal_mode=WAL'},
     }
 }
 
@@ -132,18 +141,157 @@ My custom code added for JWT authentication
 from datetime import timedelta
 
 REST_FRAMEWORK = {
+    # request.user is built from the access token's claims, without a query (core/authentication.py)
     "DEFAULT_AUTHENTICATION_CLASSES":(
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.ClaimsJWTAuthentication",
+    ),
+    # Report bulk (list) validation errors as {index: errors}
+    "LIST_SERIALIZER_ERRORS_AS_DICT":True,
+    # JSON is encoded and decoded with orjson (core/renderers.py, core/parsers.py), falling back to DRF's
+    # own JSON renderer and parser when orjson is not installed. MessagePack (application/msgpack) is
+    # offered when msgpack is installed
+    "DEFAULT_RENDERER_CLASSES":(
+        "core.renderers.ORJSONRenderer",
+        *(("core.renderers.MessagePackRenderer",) if find_spec("msgpack") else ()),
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES":(
+        "core.parsers.ORJSONParser",
+        *(("core.parsers.MessagePackParser",) if find_spec("msgpack") else ()),
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ),
 }
 
+# Stories list pagination (clients can ask for ?page_size= up to the maximum)
+STORIES_PAGE_SIZE = 50
+STORIES_MAX_PAGE_SIZE = 200
+
+# Number of stories read (and prefetched) at a time by the NDJSON export
+STORIES_EXPORT_CHUNK_SIZE = 500
+
+# Number of stories written per transaction by the NDJSON import, and how many failed lines it reports
+STORIES_IMPORT_BATCH_SIZE = 500
+STORIES_IMPORT_MAX_ERRORS = 100
+# Retries of an import batch failing with an OperationalError (e.g. SQLite's lock), the first after
+# STORIES_IMPORT_RETRY_DELAY seconds and each next one after twice as long
+STORIES_IMPORT_RETRIES = 3
+STORIES_IMPORT_RETRY_DELAY = 0.1
+
+# Full-text search (core/search.py): snippet markers (around the escaped text) and length, stories per response, rows ranked per query
+STORY_SEARCH_HIGHLIGHT = ("<mark>", "</mark>")
+STORY_SEARCH_SNIPPET_TOKENS = 12
+STORY_SEARCH_MAX_RESULTS = 100
+STORY_SEARCH_MAX_MATCHES = 500
+
+# Read replicas (core/routers.py): reads of GET/HEAD/OPTIONS requests go to a replica, everything else
+# to "default". A client that wrote reads from "default" for DATABASE_REPLICA_STICKY_SECONDS afterwards.
+# Try it locally with DJANGO_READ_REPLICAS=2 (SQLite copies next to db.sqlite3, kept in sync with
+# "python manage.py sync_replicas --interval 1"). Tests use "default" for every replica (MIRROR).
+DATABASE_REPLICAS = []
+for replica_number in range(1, int(os.environ.get("DJANGO_READ_REPLICAS", "0")) + 1):
+    DATABASES[f"replica{replica_number}"] = {
+        "ENGINE":"django.db.backends.sqlite3",
+        "NAME":BASE_DIR / f"db.replica{replica_number}.sqlite3",
+        "OPTIONS":{"init_command":"PRAGMA query_only = 1"},
+        "TEST":{"MIRROR":"default"},
+    }
+    DATABASE_REPLICAS.append(f"replica{replica_number}")
+
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+DATABASE_REPLICA_STICKY_SECONDS = 5
+
+# Request timing (RequestTimingMiddleware, core/timing.py): the fraction of the requests measured (lower it in
+# production, e.g. DJANGO_REQUEST_TIMING_SAMPLE_RATE=0.01), whether they get a Server-Timing header, and how
+# slow (ms) a measured request must be to be logged by the "core.timing" logger (at INFO level)
+REQUEST_TIMING_SAMPLE_RATE = float(os.environ.get("DJANGO_REQUEST_TIMING_SAMPLE_RATE", "1.0"))
+REQUEST_TIMING_HEADER = True
+REQUEST_TIMING_LOG_THRESHOLD_MS = 0
+
+# N+1 query detection (NPlusOneMiddleware, core/nplusone.py): a request running one statement shape more than
+# NPLUSONE_THRESHOLD times is reported. "log" logs a warning from the "core.nplusone" logger for the
+# NPLUSONE_SAMPLE_RATE fraction of the requests, "raise" raises NPlusOneError, None turns the check off.
+# The test runner switches to "raise" with NPLUSONE_TEST_THRESHOLD, the test data being small
+NPLUSONE_MODE = "log"
+NPLUSONE_THRESHOLD = 10
+NPLUSONE_TEST_THRESHOLD = 3
+NPLUSONE_SAMPLE_RATE = float(os.environ.get("DJANGO_NPLUSONE_SAMPLE_RATE", "0.1"))
+TEST_RUNNER = "core.testing.CoreTestRunner"
+
+# Per endpoint metrics served at /api/metrics (MetricsMiddleware, core/metrics.py). Every worker process writes
+# its counters to its own file in METRICS_DIRECTORY at most every METRICS_FLUSH_SECONDS and /api/metrics adds
+# them up; an exiting worker adds its counters to metrics-exited.json and removes its file. Scrapers must send
+# METRICS_TOKEN as a Bearer token, the endpoint refuses every request while it is not set
+METRICS_ENABLED = True
+METRICS_DIRECTORY = os.environ.get("DJANGO_METRICS_DIR", BASE_DIR / "metrics")
+METRICS_FLUSH_SECONDS = 5
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_TOKEN = os.environ.get("DJANGO_METRICS_TOKEN")
+
+# On demand profiling of staff requests sent with ?profile=1 or "X-Profile: 1" (ProfilingMiddleware,
+# core/profiling.py). Each staff user gets PROFILING_RATE_LIMIT profiles every PROFILING_RATE_WINDOW_SECONDS;
+# profiles are kept PROFILING_RESULT_SECONDS and list the PROFILING_TOP_LINES slowest functions and allocations
+PROFILING_ENABLED = True
+PROFILING_RATE_LIMIT = 10
+PROFILING_RATE_WINDOW_SECONDS = 600
+PROFILING_RESULT_SECONDS = 3600
+PROFILING_TOP_LINES = 40
+
+# Per-process cache of the full user rows (core/authentication.py): at most USER_CACHE_SIZE users, each kept
+# USER_CACHE_SECONDS (how long another process can serve a changed row)
+USER_CACHE_SIZE = 1024
+USER_CACHE_SECONDS = 60
+
+# Revoked refresh tokens (core/revocation.py): each process keeps a Bloom filter sized for REVOCATION_BLOOM_CAPACITY
+# keys at REVOCATION_BLOOM_ERROR_RATE false positives, takes the new rows every REVOCATION_SYNC_SECONDS (how long
+# another process can accept a revoked family) and is rebuilt every REVOCATION_REBUILD_SECONDS to drop the purged rows
+REVOCATION_BLOOM_CAPACITY = 100000
+REVOCATION_BLOOM_ERROR_RATE = 0.001
+REVOCATION_SYNC_SECONDS = 1
+REVOCATION_REBUILD_SECONDS = 3600
+# Rows deleted per statement by python manage.py purge_revoked_tokens
+REVOCATION_PURGE_BATCH_SIZE = 1000
+
+# Cached story responses and their versions (core/cache.py), the read-your-writes flags (core/routers.py) and the
+# profiling rate limits. Every worker must see the same entries (a write on one worker invalidates the responses
+# cached by all of them), so the default cache is a directory shared by the workers of a host (DJANGO_CACHE_DIR);
+# set DJANGO_REDIS_URL (e.g. redis://127.0.0.1:6379/0) to share it between hosts and to make it faster.
+if os.environ.get("DJANGO_REDIS_URL"):
+    CACHES = {
+        "default":{
+            "BACKEND":"django.core.cache.backends.redis.RedisCache",
+            "LOCATION":os.environ["DJANGO_REDIS_URL"],
+        },
+    }
+else:
+    CACHES = {
+        "default":{
+            "BACKEND":"django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION":os.environ.get("DJANGO_CACHE_DIR", BASE_DIR / "cache"),
+            # Expired files are only deleted by culling: once a set finds more than MAX_ENTRIES files it deletes a
+            # third of them picked at random, story versions and read-your-writes flags included (not only the
+            # responses). A lost version is replaced by a new one, so it only costs cache misses; a lost flag sends
+            # that user's reads to the replica before their write may have reached it. Every set lists the whole
+            # directory, keep MAX_ENTRIES small or use Redis.
+            "OPTIONS":{"MAX_ENTRIES":10000},
+        },
+    }
+STORY_RESPONSE_CACHE_TIMEOUT = 300
+
 SIMPLE_JWT = {
+    # Access tokens carry the user claims (core/authentication.py): a user deleted or made inactive is
+    # refused at once by the process that saved the change, but the other processes keep accepting
+    # their access tokens until these expire, so for up to ACCESS_TOKEN_LIFETIME
     # "ACCESS_TOKEN_LIFETIME":timedelta(minutes=30),
     "ACCESS_TOKEN_LIFETIME":timedelta(minutes=200),
     "REFRESH_TOKEN_LIFETIME":timedelta(days=1),
-    "ROTATE_FRESH_TOKENS":True,
+    "ROTATE_REFRESH_TOKENS":True,
+    # Revokes the rotated refresh token in core/revocation.py (no token_blacklist app needed)
     "BLACKLIST_AFTER_ROTATION":True,
     "ALGORITHM":"HS256",
     'USER_ID_FIELD': 'user_id',
     'USER_ID_CLAIM': 'user_id',
+    # Login and refresh add the user claims (is_staff) to the tokens
+    "TOKEN_OBTAIN_SERIALIZER":"core.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER":"core.serializers.ClaimsTokenRefreshSerializer",
 }
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Benchmarks for the core application (run from the app directory, e.g. python -m benchmarks.async_reads)
+"""
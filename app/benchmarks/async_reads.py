@@ -0,0 +1,80 @@
+"""
+Benchmark: concurrent reads through the synchronous (DRF) endpoints and their async versions
+
+Both run through Django's ASGI handler (AsyncClient), the way uvicorn serves the project: many
+requests in flight on one event loop. Synchronous views are run by the handler through
+sync_to_async, async views run on the loop. Either way Django runs the ORM queries one at a time on
+its single database thread, so the async views do not query concurrently: what they can save is the
+thread handoffs, not database time. Uses a throwaway test database.
+
+    python -m benchmarks.async_reads --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import percentile, seed
+
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+ENDPOINTS = ["story-full", "story-script", "story-points", "story-people"]
+
+async def load(url, token, requests, concurrency):
+    """Sends `requests` GETs with at most `concurrency` in flight, returns (seconds, latencies in ms)"""
+    client = AsyncClient()
+    headers = {"Authorization": f"Bearer {token}"}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_request():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} answered {response.status_code}: {response.content[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    return time.perf_counter() - started, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="Requests per endpoint and implementation")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight at the same time")
+    parser.add_argument("--children", type=int, default=20, help="People, points, links and characters in the story")
+    parser.add_argument("--with-cache", action="store_true", help="Keep the response cache (both implementations use it)")
+    options = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        user, story = seed(options.children)
+        token = str(AccessToken.for_user(user))
+        caches = None if options.with_cache else {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+        print(f"{'endpoint':<16}{'implementation':<16}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        with override_settings(**({"CACHES": caches} if caches else {})):
+            for name in ENDPOINTS:
+                for implementation, url_name in (("sync (DRF)", name), ("async", f"async-{name}")):
+                    url = reverse(url_name, args=[story.story_id])
+                    # Warm up (URL resolution, imports, first queries)
+                    asyncio.run(load(url, token, 10, 1))
+                    seconds, latencies = asyncio.run(load(url, token, options.requests, options.concurrency))
+                    print(
+                        f"{name:<16}{implementation:<16}{options.requests / seconds:>10.1f}"
+                        f"{statistics.median(latencies):>10.2f}{percentile(latencies, 0.95):>10.2f}"
+                        f"{percentile(latencies, 0.99):>10.2f}"
+                    )
+        print("The ORM queries of both implementations run one at a time on Django's database thread.")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+if __name__ == "__main__":
+    main()
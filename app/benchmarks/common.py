@@ -0,0 +1,63 @@
+"""
+Helpers shared by the benchmarks
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+# Nor share the cache of the real server (its directory is shared between processes)
+if "DJANGO_CACHE_DIR" not in os.environ:
+    os.environ["DJANGO_CACHE_DIR"] = tempfile.mkdtemp(prefix="benchmark-cache-")
+    atexit.register(shutil.rmtree, os.environ["DJANGO_CACHE_DIR"], ignore_errors=True)
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from core import models
+
+# The benchmark requests must not be added to the metrics of the real server (core/metrics.py)
+settings.METRICS_DIRECTORY = tempfile.mkdtemp(prefix="benchmark-metrics-")
+atexit.register(shutil.rmtree, settings.METRICS_DIRECTORY, ignore_errors=True)
+# The metrics endpoint refuses every request without its token
+settings.METRICS_TOKEN = "benchmark-metrics-token"
+
+BENCHMARK_EMAIL = "benchmark@example.com"
+BENCHMARK_PASSWORD = "Benchmark123"
+
+def seed(children):
+    """Creates a user with one story holding `children` people, points, links and characters"""
+    user = get_user_model().objects.create_user(
+        email=BENCHMARK_EMAIL,
+        first_name="Bench",
+        last_name="Mark",
+        date_of_birth="2003-10-18",
+        city="london",
+        password=BENCHMARK_PASSWORD,
+    )
+    story = models.StoriesModel.objects.create(user=user, title="Benchmark story")
+    incident = models.IncidentsModel.objects.create(
+        story=story, incident_what="What", incident_where="Where", incident_when=timezone.now(),
+    )
+    models.VAKSModel.objects.create(story=story, sight="a", sound="b", smell="c", taste="d", touch="e", emotion="f")
+    models.ScriptsModel.objects.create(story=story, content="Script " * 500)
+    for number in range(children):
+        person = models.PeoplesModel.objects.create(first_name=f"Person {number}", type="friend")
+        models.PeopleIncidentModel.objects.create(person=person, incident=incident)
+        models.PointsModel.objects.create(story=story, content=f"Point {number}")
+        link = models.LinksModel.objects.create(title=f"Link {number}", description="Benchmark")
+        models.StoryLinkModel.objects.create(story=story, link=link)
+        character = models.CharactersModel.objects.create(body_language="calm", dialog=f"Line {number}")
+        models.StoryCharactersModel.objects.create(story=story, character=character)
+    return user, story
+
+def percentile(values, fraction):
+    """Returns the value below which `fraction` of the values fall"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
@@ -0,0 +1,296 @@
+"""
+Benchmark: latency, throughput and queries per request of every route in core/urls.py
+
+Runs the app in-process against a throwaway test database (a file, so the worker threads share
+it): seeds a story with children, logs in through the token endpoint (TokenObtainPairView) and
+sends --requests requests to each route from --concurrency threads, each with its own Django test
+client and database connection. Routes without an entry in SCENARIOS are sent a GET, so new
+routes are covered as soon as they are added.
+
+Results (p50/p95/p99/mean latency, requests per second, errors and queries per request) are
+written as JSON and compared with a baseline saved by an earlier run:
+
+    python -m benchmarks.endpoints --save-baseline benchmarks/baseline.json     # e.g. on main
+    python -m benchmarks.endpoints --baseline benchmarks/baseline.json --fail-on-regression
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from benchmarks.common import BENCHMARK_EMAIL, BENCHMARK_PASSWORD, percentile, seed
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import models, profiling, urls
+
+# Request bodies of the routes that are not benchmarked with a GET: (method, query string, body factory)
+# A body factory gets the run context and the request number and returns (body, content type)
+SCENARIOS = {
+    "user-registration-endpoint": ("POST", "", lambda context, number: ({
+        "email": f"benchmark-{context['run']}-{number}@example.com",
+        "first_name": "Bench",
+        "last_name": "Mark",
+        "date_of_birth": "2003-10-18",
+        "city": "london",
+        "password": BENCHMARK_PASSWORD,
+        "confirm_password": BENCHMARK_PASSWORD,
+    }, "application/json")),
+    "token-obtain-pair-endpoint": ("POST", "", lambda context, number: (
+        {"email": BENCHMARK_EMAIL, "password": BENCHMARK_PASSWORD}, "application/json",
+    )),
+    "token-refresh-endpoint": ("POST", "", lambda context, number: (
+        {"refresh": str(RefreshToken.for_user(context["user"]))}, "application/json",
+    )),
+    "create-story": ("POST", "", lambda context, number: ({"title": f"Benchmark story {number}"}, "application/json")),
+    "stories-import": ("POST", "", lambda context, number: (
+        json.dumps({"title": f"Imported story {number}", "points": [{"content": "Imported point"}]}) + "\n",
+        "application/x-ndjson",
+    )),
+    "stories-search": ("GET", "q=point", None),
+}
+
+# Queries of the request being timed (counted on every connection, including the threads async views use)
+_request_queries = ContextVar("benchmark_request_queries", default=None)
+
+def count_queries(execute, sql, params, many, context):
+    """Database execute wrapper counting the queries of the current request"""
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+def install_query_counter(sender=None, connection=None, **kwargs):
+    """Adds count_queries to a database connection"""
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+def get_routes(only=None):
+    """Returns (url name, url kwargs names) of every named route in core/urls.py"""
+    routes = []
+    for pattern in urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        if only and not re.search(only, pattern.name):
+            continue
+        routes.append((pattern.name, list(pattern.pattern.converters)))
+    return routes
+
+def build_context(children):
+    """Seeds the database and returns what the scenarios need (user, ids of the seeded records)"""
+    user, story = seed(children)
+    user.is_staff = True  # cache/stats/ and profiles/ are staff only
+    user.save()
+    cache.set(profiling.result_key("benchmark"), {"path": "/benchmark/", "profile": "", "allocations": []}, None)
+    return {
+        "run": int(time.time()),
+        "user": user,
+        "ids": {
+            "story_id": story.story_id,
+            "person_id": models.PeopleIncidentModel.objects.filter(incident_id=story.story_id).first().person_id,
+            "point_id": models.PointsModel.objects.filter(story=story).first().point_id,
+            "link_id": models.StoryLinkModel.objects.filter(story=story).first().link_id,
+            "character_id": models.StoryCharactersModel.objects.filter(story=story).first().character_id,
+            "profile_id": "benchmark",
+        },
+    }
+
+def obtain_access_token():
+    """Logs in through TokenObtainPairView and returns the access token"""
+    response = Client().post(
+        reverse("token-obtain-pair-endpoint"),
+        {"email": BENCHMARK_EMAIL, "password": BENCHMARK_PASSWORD},
+        content_type="application/json",
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"Login failed ({response.status_code}): {response.content[:200]}")
+    return response.json()["access"]
+
+class RouteRunner:
+    """Sends the requests of one route from a pool of threads and collects their measures"""
+
+    def __init__(self, name, path, scenario, context, token):
+        self.name = name
+        self.method, query, self.body = scenario
+        self.path = f"{path}?{query}" if query else path
+        self.context = context
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.numbers = itertools.count()
+        self.local = threading.local()
+
+    def request(self):
+        """Sends one request and returns (latency in ms, status code, queries)"""
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = Client()
+
+        kwargs = {"headers": self.headers}
+        if self.body is not None:
+            body, content_type = self.body(self.context, next(self.numbers))
+            kwargs.update(data=body, content_type=content_type)
+
+        counter = [0]
+        token = _request_queries.set(counter)
+        try:
+            started = time.perf_counter()
+            response = getattr(client, self.method.lower())(self.path, **kwargs)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            latency = (time.perf_counter() - started) * 1000
+        finally:
+            _request_queries.reset(token)
+        return latency, response.status_code, counter[0]
+
+    def worker(self, requests):
+        """Runs requests in the current thread"""
+        try:
+            return [self.request() for _ in range(requests)]
+        finally:
+            connections.close_all()
+
+    def run(self, requests, concurrency):
+        """Returns the measures of `requests` requests spread over `concurrency` threads"""
+        shares = [requests // concurrency + (1 if index < requests % concurrency else 0) for index in range(concurrency)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = [sample for result in executor.map(self.worker, [share for share in shares if share]) for sample in result]
+        seconds = time.perf_counter() - started
+
+        latencies = [latency for latency, status_code, queries in samples]
+        return {
+            "method": self.method,
+            "path": self.path,
+            "requests": len(samples),
+            "errors": sum(1 for latency, status_code, queries in samples if status_code >= 400),
+            "status_codes": sorted({status_code for latency, status_code, queries in samples}),
+            "throughput_rps": round(len(samples) / seconds, 2),
+            "latency_ms": {
+                "p50": round(percentile(latencies, 0.50), 3),
+                "p95": round(percentile(latencies, 0.95), 3),
+                "p99": round(percentile(latencies, 0.99), 3),
+                "mean": round(statistics.fmean(latencies), 3),
+            },
+            "queries_per_request": round(statistics.fmean(queries for latency, status_code, queries in samples), 2),
+        }
+
+def compare(results, baseline, tolerance):
+    """Prints the results next to the baseline and returns the names of the regressed routes
+
+    A route regresses when its p95 latency grows by more than `tolerance` (a fraction) or when it
+    makes more queries per request.
+    """
+    regressions = []
+    print(f"\n{'route':<34}{'p95 ms':>10}{'baseline':>10}{'change':>9}{'queries':>9}{'baseline':>10}")
+    for name, result in results["routes"].items():
+        before = baseline["routes"].get(name)
+        if before is None:
+            print(f"{name:<34}{result['latency_ms']['p95']:>10.2f}{'new':>10}")
+            continue
+
+        p95, before_p95 = result["latency_ms"]["p95"], before["latency_ms"]["p95"]
+        change = (p95 - before_p95) / before_p95 if before_p95 else 0
+        regressed = change > tolerance or result["queries_per_request"] > before["queries_per_request"]
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<34}{p95:>10.2f}{before_p95:>10.2f}{change:>+9.0%}"
+            f"{result['queries_per_request']:>9.1f}{before['queries_per_request']:>10.1f}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=8, help="Threads sending requests at the same time")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per route before measuring")
+    parser.add_argument("--children", type=int, default=20, help="People, points, links and characters in the story")
+    parser.add_argument("--only", default=None, help="Only the routes whose name matches this regular expression")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache (DummyCache)")
+    parser.add_argument("--output", default="benchmark-results.json", help="JSON file to write the results to")
+    parser.add_argument("--baseline", default=None, help="JSON results of an earlier run to compare with")
+    parser.add_argument("--save-baseline", default=None, help="Also write the results to this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 slowdown before a regression (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 when a route regressed")
+    options = parser.parse_args()
+
+    # A file database: an in-memory one cannot be shared by the worker threads' connections
+    database_directory = tempfile.mkdtemp(prefix="benchmark-")
+    database_file = os.path.join(database_directory, "db.sqlite3")
+    connection.settings_dict["TEST"] = {**connection.settings_dict.get("TEST", {}), "NAME": database_file}
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    connection_created.connect(install_query_counter)
+    install_query_counter(connection=connection)
+    caches = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    try:
+        with override_settings(**({"CACHES": caches} if options.no_cache else {})):
+            context = build_context(options.children)
+            token = obtain_access_token()
+
+            results = {
+                "meta": {
+                    "date": datetime.now(timezone.utc).isoformat(),
+                    "requests": options.requests,
+                    "concurrency": options.concurrency,
+                    "cache": not options.no_cache,
+                    "python": platform.python_version(),
+                    "django": django.get_version(),
+                    "database": connection.vendor,
+                },
+                "routes": {},
+            }
+            print(f"{'route':<34}{'method':<7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}")
+            for name, kwarg_names in get_routes(options.only):
+                path = reverse(name, kwargs={kwarg: context["ids"][kwarg] for kwarg in kwarg_names})
+                # The metrics endpoint takes its own token instead of a JWT
+                route_token = settings.METRICS_TOKEN if name == "metrics" else token
+                runner = RouteRunner(name, path, SCENARIOS.get(name, ("GET", "", None)), context, route_token)
+                runner.worker(options.warmup)
+                result = results["routes"][name] = runner.run(options.requests, options.concurrency)
+                print(
+                    f"{name:<34}{result['method']:<7}{result['throughput_rps']:>9.1f}"
+                    f"{result['latency_ms']['p50']:>9.2f}{result['latency_ms']['p95']:>9.2f}"
+                    f"{result['latency_ms']['p99']:>9.2f}{result['queries_per_request']:>9.1f}{result['errors']:>8}"
+                )
+    finally:
+        connection_created.disconnect(install_query_counter)
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        shutil.rmtree(database_directory, ignore_errors=True)
+
+    for path in filter(None, (options.output, options.save_baseline)):
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+        print(f"Results written to {path}")
+
+    if options.baseline:
+        with open(options.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), options.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} route(s) regressed: {', '.join(regressions)}")
+            if options.fail_on_regression:
+                sys.exit(1)
+
+if __name__ == "__main__":
+    main()
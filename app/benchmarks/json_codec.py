@@ -0,0 +1,104 @@
+"""
+Benchmark: DRF's JSON renderer and parser vs the orjson and MessagePack ones (core/renderers.py,
+core/parsers.py)
+
+Renders and parses full stories with long scripts and dialogs (the payloads of the full story
+endpoint and the export) with each implementation, and compares the body sizes of the full and
+compact envelopes. No database is needed.
+
+    python -m benchmarks.json_codec --stories 200 --repeat 20
+"""
+import argparse
+import datetime
+import io
+import os
+import time
+from decimal import Decimal
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+
+import django
+
+django.setup()
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import MessagePackParser, ORJSONParser
+from core.renderers import MessagePackRenderer, ORJSONRenderer, compact_envelope, msgpack, orjson
+
+def full_story(number, children):
+    """Returns data shaped like FullStorySerializer's output"""
+    created_at = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc) + datetime.timedelta(minutes=number)
+    return {
+        "user": 1,
+        "story_id": number,
+        "title": f"Story {number} – “the long one”",
+        "created_at": created_at,
+        "incident": {"story": number, "incident_what": "What happened " * 20, "incident_where": "Here", "incident_when": created_at},
+        "people": [{"person_id": person, "first_name": f"Person {person}", "type": "friend"} for person in range(children)],
+        "vaks": {"story": number, "vaks_id": number, "sight": "a", "sound": "b", "smell": "c", "taste": "d", "touch": "e", "emotion": "f"},
+        "points": [{"story": number, "point_id": point, "content": f"Point {point} " * 10} for point in range(children)],
+        "script": {"story": number, "script_id": number, "content": "Script line ✍️\n" * 400},
+        "links": [{"link_id": link, "title": f"Link {link}", "description": "Description"} for link in range(children)],
+        "characters": [
+            {"character_id": character, "body_language": "calm", "dialog": f"Dialog {character} " * 50, "weight": Decimal("1.5")}
+            for character in range(children)
+        ],
+    }
+
+def best_time(function, repeat):
+    """Returns the fastest of `repeat` runs of function, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, default=100, help="Full stories in the payload")
+    parser.add_argument("--children", type=int, default=20, help="People, points, links and characters per story")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs of each measure (the fastest is kept)")
+    options = parser.parse_args()
+
+    if orjson is None:
+        print("orjson is not installed: ORJSONRenderer and ORJSONParser fall back to DRF's implementations")
+
+    data = {"Here are your stories:": [full_story(number, options.children) for number in range(options.stories)]}
+    body = JSONRenderer().render(data)
+    assert ORJSONRenderer().render(data) == body
+    print(f"payload: {len(body) / 1024:.0f} KiB")
+
+    compact = compact_envelope(data, 200)
+    sizes = [("JSON", len(body)), ("JSON compact", len(JSONRenderer().render(compact)))]
+    if msgpack is not None:
+        sizes += [
+            ("msgpack", len(MessagePackRenderer().render(data))),
+            ("msgpack compact", len(MessagePackRenderer().render(compact))),
+        ]
+    for name, size in sizes:
+        print(f"{name:<16}{size / 1024:>10.1f} KiB")
+    print()
+
+    renderers = [("DRF (json)", JSONRenderer().render), ("orjson", ORJSONRenderer().render)]
+    parsers = [
+        ("DRF (json)", lambda _: JSONParser().parse(io.BytesIO(body))),
+        ("orjson", lambda _: ORJSONParser().parse(io.BytesIO(body))),
+    ]
+    if msgpack is not None:
+        packed = MessagePackRenderer().render(data)
+        renderers.append(("msgpack", MessagePackRenderer().render))
+        parsers.append(("msgpack", lambda _: MessagePackParser().parse(io.BytesIO(packed))))
+
+    print(f"{'operation':<10}{'implementation':<16}{'ms':>10}{'speedup':>10}")
+    for operation, implementations in (("render", renderers), ("parse", parsers)):
+        baseline = None
+        for name, function in implementations:
+            seconds = best_time(lambda: function(data), options.repeat)
+            baseline = baseline or seconds
+            print(f"{operation:<10}{name:<16}{seconds * 1000:>10.2f}{baseline / seconds:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: per row cost of the list serialization, model instances + Serializer vs .values() rows
+
+For each list shape (stories, points, people, links, characters) the same rows are fetched and
+serialized both ways and the time per row is reported, with and without the query. Uses a
+throwaway test database.
+
+    python -m benchmarks.serialization --rows 5000 --repeat 5
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+
+import django
+
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.renderers import JSONRenderer
+
+from core import models, serializers
+
+def seed(rows):
+    """Creates a user with `rows` stories, and one story holding `rows` points, links and characters"""
+    user = get_user_model().objects.create_user(
+        email="benchmark@example.com",
+        first_name="Bench",
+        last_name="Mark",
+        date_of_birth="2003-10-18",
+        city="london",
+        password="Benchmark123",
+    )
+    models.StoriesModel.objects.bulk_create(
+        [models.StoriesModel(user=user, title=f"Story {number}") for number in range(rows)]
+    )
+    story = models.StoriesModel.objects.filter(user=user).first()
+    models.PointsModel.objects.bulk_create(
+        [models.PointsModel(story=story, content=f"Point {number} " * 5) for number in range(rows)]
+    )
+    models.PeoplesModel.objects.bulk_create(
+        [models.PeoplesModel.from_content(first_name=f"Person {number}", type="friend") for number in range(rows)]
+    )
+    models.LinksModel.objects.bulk_create(
+        [models.LinksModel.from_content(title=f"Link {number}", description="Benchmark") for number in range(rows)]
+    )
+    models.CharactersModel.objects.bulk_create(
+        [models.CharactersModel.from_content(body_language="calm", dialog=f"Line {number}") for number in range(rows)]
+    )
+    return user, story
+
+def best_time(function, repeat):
+    """Returns the fastest of `repeat` runs of function, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="Rows of each list")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of each measure (the fastest is kept)")
+    options = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        user, story = seed(options.rows)
+        lists = [
+            ("stories", serializers.StorySerializer, serializers.story_rows, models.StoriesModel.objects.filter(user=user)),
+            ("points", serializers.PointsSerializer, serializers.points_rows, models.PointsModel.objects.filter(story=story)),
+            ("people", serializers.PeopleSerializer, serializers.people_rows, models.PeoplesModel.objects.all()),
+            ("links", serializers.LinksSerializer, serializers.links_rows, models.LinksModel.objects.all()),
+            ("characters", serializers.CharactersSerializer, serializers.characters_rows, models.CharactersModel.objects.all()),
+        ]
+
+        print(f"{'list':<12}{'path':<12}{'query+serialize us/row':>24}{'serialize us/row':>18}{'speedup':>10}")
+        for name, serializer_class, rows_serializer, queryset in lists:
+            instances = list(queryset)
+            rows = list(rows_serializer.values(queryset))
+            # Both paths must render the same bytes
+            assert JSONRenderer().render(serializer_class(instances, many=True).data) == \
+                JSONRenderer().render(rows_serializer.serialize(rows))
+
+            results = {
+                "instances": (
+                    best_time(lambda: serializer_class(list(queryset.all()), many=True).data, options.repeat),
+                    best_time(lambda: serializer_class(instances, many=True).data, options.repeat),
+                ),
+                "values()": (
+                    best_time(lambda: rows_serializer.serialize(rows_serializer.values(queryset.all())), options.repeat),
+                    best_time(lambda: rows_serializer.serialize(rows), options.repeat),
+                ),
+            }
+            baseline = results["instances"][0]
+            for path, (total, serialize) in results.items():
+                print(
+                    f"{name:<12}{path:<12}{total / options.rows * 1e6:>24.2f}"
+                    f"{serialize / options.rows * 1e6:>18.2f}{baseline / total:>9.1f}x"
+                )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+if __name__ == "__main__":
+    main()
@@ -20,4 +20,6 @@ admin.site.register(models.CharactersModel)
 # Junction tables
 admin.site.register(models.StoryLinkModel)
 admin.site.register(models.StoryCharactersModel)
-admin.site.register(models.PeopleIncidentModel)
\ No newline at end of file
+admin.site.register(models.PeopleIncidentModel)
+# Revoked refresh tokens
+admin.site.register(models.RevokedTokensModel)
\ No newline at end of file
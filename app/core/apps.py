@@ -4,3 +4,20 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Register the signal receivers (response cache invalidation)
+        from core import signals
+
+        # Rebuild the search index when a migration remade an indexed table and dropped its triggers
+        from django.db.models.signals import post_migrate
+        post_migrate.connect(signals.restore_search_triggers, sender=self, dispatch_uid="core_search_triggers")
+
+        # Time the queries of the measured requests (RequestTimingMiddleware) and count them by
+        # statement shape in the requests checked for N+1 queries (NPlusOneMiddleware)
+        from django.db.backends.signals import connection_created
+
+        from core.nplusone import install_query_detector
+        from core.timing import install_query_timer
+        connection_created.connect(install_query_timer, dispatch_uid="core_request_timing")
+        connection_created.connect(install_query_detector, dispatch_uid="core_nplusone")
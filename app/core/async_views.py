@@ -0,0 +1,330 @@
+"""
+Async (ASGI native) versions of the core application's read APIs
+
+DRF's APIView only runs synchronous handlers, so under ASGI every request to core/views.py holds a
+worker thread for its whole duration. These views run their handlers on the event loop but are
+otherwise handled by DRF like the synchronous views (asyncApiView): the same authentication
+classes, permissions, content negotiation and renderers (JSON, MessagePack, the compact envelope),
+error bodies, ownership lookups (storyScopedApi), serializers, response cache and conditional GETs,
+so both URLs of a resource return the same bytes and headers.
+
+The async ORM (aget, afirst, aexists, async for) does not make the queries concurrent: Django runs
+every one of them on its single database thread, one after the other. What an async view saves is
+the worker thread held while a request waits, not the time spent in the database.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import models, pagination, serializers
+from core.cache import cache_story_response
+from core.conditional import story_conditional_get
+from core.views import storyScopedApi
+
+async def as_list(queryset):
+    """Evaluates a queryset asynchronously"""
+    return [record async for record in queryset]
+
+class asyncApiView(APIView):
+    """Base async view: DRF's APIView request handling with async handlers and authentication"""
+    permission_classes = [IsAuthenticated,]
+    # The browsable API renders the view's forms through a synchronous APIView
+    renderer_classes = [
+        renderer for renderer in APIView.renderer_classes if not issubclass(renderer, BrowsableAPIRenderer)
+    ]
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Async version of APIView.dispatch"""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            handler = getattr(self, request.method.lower(), None) if request.method.lower() in self.http_method_names else None
+            if handler is None:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if hasattr(response, "__await__"):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        """Async version of APIView.initial (only the authentication may need the database)"""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        request.accepted_renderer, request.accepted_media_type = self.perform_content_negotiation(request)
+        request.version, request.versioning_scheme = self.determine_version(request, *args, **kwargs)
+        await self.aperform_authentication(request)
+        self.check_permissions(request)
+        self.check_throttles(request)
+
+    async def aperform_authentication(self, request):
+        """Authenticates the request with the view's authentication classes, like Request.user would"""
+        for authenticator in self.get_authenticators():
+            if hasattr(authenticator, "aauthenticate"):
+                authenticated = await authenticator.aauthenticate(request)
+            else:
+                authenticated = await sync_to_async(authenticator.authenticate)(request)
+            if authenticated is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = authenticated
+                return
+        request._authenticator = None
+        request.user, request.auth = AnonymousUser(), None
+
+    def ok(self, data):
+        """Returns the 200 response of a handler"""
+        return Response(data, status=status.HTTP_200_OK)
+
+class asyncStoryScopedView(asyncApiView, storyScopedApi):
+    """Base async view for endpoints nested under one of the user's stories (see storyScopedApi)"""
+
+    async def astory_exists(self, story_id):
+        """Async version of story_exists"""
+        return await self.story_queryset(story_id).aexists()
+
+    async def astory_child_not_found(self, story_id, child_error, story_error=None):
+        """Async version of story_child_not_found"""
+        return self.not_found_response(await self.astory_exists(story_id), child_error, story_error)
+
+# Stories
+class asyncStoriesView(asyncApiView):
+    """Async version of storiesApi.get"""
+    pagination_class = pagination.StoryCursorPagination
+
+    async def get(self, request, format=None):
+        """Returns one page of the user's stories (newest first)"""
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(
+            serializers.story_rows.values(models.StoriesModel.objects.filter(user=request.user)),
+            request,
+        )
+        return self.ok({
+            "Here are your stories:":serializers.story_rows.serialize(page),
+            "next":paginator.get_next_link(),
+            "previous":paginator.get_previous_link(),
+        })
+
+class asyncStoryDetailsView(asyncStoryScopedView):
+    """Async version of storyDetailsApi.get"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, format=None):
+        """Returns the user's story"""
+        story = await self.story_queryset(story_id).afirst()
+        if story is None:
+            return self.not_found_response(False, None, {"Error:":"Story retrieval failed❌"})
+        return self.ok({"Story successfully retrieved✅":serializers.StorySerializer(story).data})
+
+class asyncStoryFullView(asyncStoryScopedView):
+    """Async version of storyFullApi.get (the same prefetching query and serializer)"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, format=None):
+        """Returns the user's story with everything that belongs to it"""
+        story = await models.StoriesModel.objects.with_children().filter(user=request.user, story_id=story_id).afirst()
+        if story is None:
+            return self.not_found_response(False, None, {"Error:":"Story retrieval failed❌"})
+        return self.ok({"Full story retrieved successfully✅":serializers.FullStorySerializer(story).data})
+
+# Single children
+class asyncStoryIncidentView(asyncStoryScopedView):
+    """Async version of storyIncidentApi.get"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, format=None):
+        """Returns the incident of the user's story"""
+        try:
+            incident = await models.IncidentsModel.objects.aget(**self.story_lookup(story_id))
+        except models.IncidentsModel.DoesNotExist:
+            return await self.astory_child_not_found(
+                story_id,
+                {"Errors": "Incident not found or does not belong to you❌"},
+                story_error={"Errors": "Story not found or does not belong to you❌"},
+            )
+        return self.ok({"Here is your incident for this story": serializers.IncidentsSerializer(incident).data})
+
+class asyncVaksView(asyncStoryScopedView):
+    """Async version of vaksApi.get"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, format=None):
+        """Returns the VAKS of the user's story"""
+        try:
+            vaks = await models.VAKSModel.objects.aget(**self.story_lookup(story_id))
+        except models.VAKSModel.DoesNotExist:
+            return await self.astory_child_not_found(
+                story_id,
+                {"Error❌":"VAKS not found for this story"},
+                story_error={"Error❌":"Story not found"},
+            )
+        return self.ok({"VAKS retrieved✅":serializers.VAKSSerializer(vaks).data})
+
+class asyncScriptView(asyncStoryScopedView):
+    """Async version of scriptApi.get"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, format=None):
+        """Returns the script of the user's story"""
+        try:
+            script = await models.ScriptsModel.objects.aget(**self.story_lookup(story_id))
+        except models.ScriptsModel.DoesNotExist:
+            return await self.astory_child_not_found(story_id, {"Errors❌":"Script not found"})
+        return self.ok({"Script retrieved successfully✅":serializers.ScriptsSerializer(script).data})
+
+# Collections
+class asyncPeopleView(asyncStoryScopedView):
+    """Async version of storyPeopleApi.get"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, format=None):
+        """Returns the people of the user's story incident"""
+        people = await as_list(serializers.people_rows.values(self.filter_story_children(
+            models.PeoplesModel.objects, story_id, story_path="peopleincidentmodel__incident__story",
+        )))
+
+        # No people could also mean the story is not the user's or has no incident
+        if not people and not await self.filter_story_children(models.IncidentsModel.objects, story_id).aexists():
+            return await self.astory_child_not_found(
+                story_id,
+                {"Errors": "Incident not found for this story ❌"},
+                story_error={"Errors": "Story not found or you do not have access to this story ❌"},
+            )
+        return self.ok({"People involved in this incident (the WHO)": serializers.people_rows.serialize(people)})
+
+class asyncPointsView(asyncStoryScopedView):
+    """Async version of pointsApi.get"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, format=None):
+        """Returns the points of the user's story"""
+        points = await as_list(serializers.points_rows.values(self.filter_story_children(models.PointsModel.objects, story_id)))
+        if not points and not await self.astory_exists(story_id):
+            return self.not_found_response(False, None)
+        return self.ok({"Points retrieved successfully✅":serializers.points_rows.serialize(points)})
+
+class asyncLinksView(asyncStoryScopedView):
+    """Async version of linksApi.get"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, format=None):
+        """Returns the links of the user's story"""
+        links = await as_list(serializers.links_rows.values(
+            self.filter_story_children(models.LinksModel.objects, story_id, story_path="storylinkmodel__story"),
+        ))
+        if not links and not await self.astory_exists(story_id):
+            return self.not_found_response(False, None)
+        return self.ok({
+            "Success ✅": "Links retrieved successfully",
+            "Links": serializers.links_rows.serialize(links),
+        })
+
+class asyncCharactersView(asyncStoryScopedView):
+    """Async version of charactersApi.get"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, format=None):
+        """Returns the characters of the user's story"""
+        characters = await as_list(serializers.characters_rows.values(
+            self.filter_story_children(models.CharactersModel.objects, story_id, story_path="storycharactersmodel__story"),
+        ))
+        if not characters and not await self.astory_exists(story_id):
+            return self.not_found_response(False, None)
+        return self.ok({
+            "Success ✅": "Characters retrieved successfully",
+            "Characters": serializers.characters_rows.serialize(characters),
+        })
+
+# Collection members
+class asyncPersonDetailsView(asyncStoryScopedView):
+    """Async version of storyPeopleApiDetails.get"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, person_id, format=None):
+        """Returns a person of the user's story incident"""
+        try:
+            people_incident = await models.PeopleIncidentModel.objects.select_related("person").aget(
+                **self.story_lookup(story_id, "incident__story"), person_id=person_id,
+            )
+        except models.PeopleIncidentModel.DoesNotExist:
+            return await self.person_not_found(story_id, person_id)
+        return self.ok({"Person": serializers.PeopleSerializer(people_incident.person).data})
+
+    async def person_not_found(self, story_id, person_id):
+        """Returns the 404 response saying which part of the person lookup failed"""
+        if not await self.astory_exists(story_id):
+            return self.not_found_response(False, None, {"Errors❌": "Story not found or you do not have access to it"})
+        if not await models.IncidentsModel.objects.filter(story_id=story_id).aexists():
+            return self.not_found_response(True, {"Errors❌": "Incident not found or the story does not have one"})
+        if not await models.PeoplesModel.objects.filter(person_id=person_id).aexists():
+            return self.not_found_response(True, {"Errors❌":"Person was not found"})
+        return self.not_found_response(True, {"Errors❌": "This person is not linked to this incident"})
+
+class asyncPointDetailsView(asyncStoryScopedView):
+    """Async version of pointDetailsApi.get"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, point_id, format=None):
+        """Returns a point of the user's story"""
+        try:
+            point = await models.PointsModel.objects.aget(**self.story_lookup(story_id), point_id=point_id)
+        except models.PointsModel.DoesNotExist:
+            return await self.astory_child_not_found(story_id, {"Errors❌":"Point not found"})
+        return self.ok({"Point retrieved successfully✅:":serializers.PointsSerializer(point).data})
+
+class asyncLinkDetailsView(asyncStoryScopedView):
+    """Async version of linkDetailsApi.get"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, link_id, format=None):
+        """Returns a link of the user's story"""
+        try:
+            link = await models.LinksModel.objects.distinct().aget(
+                **self.story_lookup(story_id, "storylinkmodel__story"), link_id=link_id,
+            )
+        except models.LinksModel.DoesNotExist:
+            return await self.astory_child_not_found(story_id, {"Errors❌":"Link not found for this story"})
+        return self.ok({
+            "Success ✅": "Link retrieved successfully",
+            "Link details": serializers.LinksSerializer(link).data,
+        })
+
+class asyncCharacterDetailsView(asyncStoryScopedView):
+    """Async version of characterDetailsApi.get"""
+
+    @story_conditional_get
+    @cache_story_response
+    async def get(self, request, story_id, character_id, format=None):
+        """Returns a character of the user's story"""
+        try:
+            character = await models.CharactersModel.objects.distinct().aget(
+                **self.story_lookup(story_id, "storycharactersmodel__story"), character_id=character_id,
+            )
+        except models.CharactersModel.DoesNotExist:
+            return await self.astory_child_not_found(story_id, {"Errors❌":"Character not found for this story"})
+        return self.ok({
+            "Success ✅": "Character retrieved successfully",
+            "Character details": serializers.CharactersSerializer(character).data,
+        })
@@ -0,0 +1,207 @@
+"""
+Stateless JWT authentication: request.user is built from the access token's claims, without a query
+
+Tokens issued by the login and refresh endpoints (ClaimsTokenObtainPairSerializer and
+ClaimsTokenRefreshSerializer in core/serializers.py) carry the user claims the API needs besides
+the user id (USER_CLAIMS). ClaimsJWTAuthentication turns them into a UsersModel instance holding
+only those fields, the others deferred: it filters and is assigned like the full row (only its pk
+is used), and reading another field loads it from the database, so nothing breaks when a view
+needs more. Views that need the full user (userProfileApi) get it from user_cache, a bounded
+per-process LRU cache whose entries live USER_CACHE_SECONDS and are dropped when the row is saved or
+deleted in this process (core/signals.py); other processes see the change within USER_CACHE_SECONDS.
+
+Claims keep their login values until the access token expires: a user no longer staff keeps the
+access they had for at most ACCESS_TOKEN_LIFETIME, the next refresh takes the new value. A user
+deleted or made inactive is refused at once by the process that saved the change: the same signal
+marks the user id disabled in user_cache, and the claims of a disabled id are not trusted (the user
+is checked through user_cache). Other processes only see it when the token expires, so they keep
+serving the user for at most ACCESS_TOKEN_LIFETIME (see SIMPLE_JWT in settings.py). Tokens without
+the claims (issued before them, or by AccessToken.for_user) are authenticated from user_cache instead.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import revocation
+
+# Claims added to the tokens, copied from the user's fields of the same name
+USER_CLAIMS = ("is_staff",)
+
+def add_user_claims(token, user):
+    """Adds the user claims to a token and returns it"""
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token carrying the user claims (its access tokens copy them), checked against the revocation store"""
+    no_copy_claims = RefreshToken.no_copy_claims + (revocation.FAMILY_CLAIM,)
+
+    @classmethod
+    def for_user(cls, user):
+        token = add_user_claims(super().for_user(user), user)
+        # The tokens rotated from this one belong to its family (see core/revocation.py)
+        token[revocation.FAMILY_CLAIM] = token[jwt_settings.JTI_CLAIM]
+        return token
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        revocation.check_token(self)
+
+    def blacklist(self):
+        """Revokes the token (the refresh endpoint calls it on rotation, BLACKLIST_AFTER_ROTATION)"""
+        revocation.revoke_token(self)
+
+def user_from_claims(validated_token):
+    """Returns the user of a token carrying the user claims, built without a query (None without the claims or for a disabled user)"""
+    if any(claim not in validated_token for claim in USER_CLAIMS):
+        return None
+    if user_cache.is_disabled(validated_token[jwt_settings.USER_ID_CLAIM]):
+        return None
+    user_model = get_user_model()
+    id_field = user_model._meta.get_field(jwt_settings.USER_ID_FIELD)
+    # Tokens are only issued to active users (disabled ones are checked above), and hold the id as a string
+    values = {
+        id_field.attname: id_field.to_python(validated_token[jwt_settings.USER_ID_CLAIM]),
+        "is_active": True,
+        **{claim: validated_token[claim] for claim in USER_CLAIMS},
+    }
+    field_names = [field.attname for field in user_model._meta.concrete_fields if field.attname in values]
+    return user_model.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+class UserCache:
+    """Bounded per-process LRU cache of full users, each kept USER_CACHE_SECONDS at most
+
+    Also holds the ids of the users deleted or made inactive in this process, until the access
+    tokens issued before the change have expired.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = OrderedDict()
+        # user id -> time.monotonic() after which its tokens issued before the change have expired
+        self.disabled = {}
+        # Bumped by every invalidation, so a row read before one is not stored after it
+        self.invalidations = 0
+
+    def get(self, user_id):
+        """Returns a copy of the user (None when there is no such user)"""
+        # Token claims hold the id as a string, signals as the pk
+        user_id = str(user_id)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.users.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.users.move_to_end(user_id)
+                return copy.copy(entry[1])
+            invalidations = self.invalidations
+
+        user = get_user_model()._default_manager.filter(**{jwt_settings.USER_ID_FIELD: user_id}).first()
+        if user is None:
+            return None
+        with self.lock:
+            if invalidations == self.invalidations:
+                self.users[user_id] = (now + getattr(settings, "USER_CACHE_SECONDS", 60), user)
+                self.users.move_to_end(user_id)
+                while len(self.users) > getattr(settings, "USER_CACHE_SIZE", 1024):
+                    self.users.popitem(last=False)
+        return copy.copy(user)
+
+    def invalidate(self, user_id):
+        """Forgets a user whose row changed"""
+        with self.lock:
+            self.invalidations += 1
+            self.users.pop(str(user_id), None)
+
+    def disable(self, user_id):
+        """Stops trusting the claims of a user deleted or made inactive"""
+        now = time.monotonic()
+        with self.lock:
+            self.disabled = {key: until for key, until in self.disabled.items() if until > now}
+            self.disabled[str(user_id)] = now + jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+
+    def enable(self, user_id):
+        """Trusts the claims of a user made active again"""
+        with self.lock:
+            self.disabled.pop(str(user_id), None)
+
+    def is_disabled(self, user_id):
+        """Returns whether the user was deleted or made inactive while tokens issued before may still be valid"""
+        until = self.disabled.get(str(user_id))
+        return until is not None and until > time.monotonic()
+
+    def clear(self):
+        """Forgets every user"""
+        with self.lock:
+            self.invalidations += 1
+            self.users.clear()
+            self.disabled = {}
+
+user_cache = UserCache()
+
+def get_full_user(user):
+    """Returns the full row of a (possibly lightweight) authenticated user, None if it was deleted"""
+    return user_cache.get(getattr(user, jwt_settings.USER_ID_FIELD))
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication building request.user from the access token's claims (see the module docstring)"""
+
+    def authenticate(self, request):
+        validated_token = self.get_request_token(request)
+        if validated_token is None:
+            return None
+        return self.get_user(validated_token), validated_token
+
+    async def aauthenticate(self, request):
+        """Async version of authenticate (core/async_views.py): only tokens without the claims run a query, in the database thread"""
+        validated_token = self.get_request_token(request)
+        if validated_token is None:
+            return None
+        user = user_from_claims(validated_token) if jwt_settings.USER_ID_CLAIM in validated_token else None
+        if user is None:
+            user = await sync_to_async(self.get_user)(validated_token)
+        return user, validated_token
+
+    def get_request_token(self, request):
+        """Returns the request's validated access token (None without one, raises InvalidToken)
+
+        The signature is checked once per request: the token is kept on the Django request, where
+        DRF's authentication finds the one ReplicaRoutingMiddleware (core/routers.py) decoded.
+        """
+        header = self.get_header(request)
+        raw_token = self.get_raw_token(header) if header is not None else None
+        if raw_token is None:
+            return None
+        django_request = getattr(request, "_request", request)
+        decoded = getattr(django_request, "validated_token", None)
+        if decoded is not None and decoded[0] == raw_token:
+            return decoded[1]
+        validated_token = self.get_validated_token(raw_token)
+        django_request.validated_token = (raw_token, validated_token)
+        return validated_token
+
+    def get_user(self, validated_token):
+        if jwt_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_from_claims(validated_token)
+        if user is not None:
+            return user
+
+        user = user_cache.get(validated_token[jwt_settings.USER_ID_CLAIM])
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
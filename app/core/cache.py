@@ -0,0 +1,160 @@
+"""
+Response cache for the story read endpoints
+
+Rendered responses are stored under a per-story version number. Writes never delete cached
+responses, they only bump the story's version (one cache operation), which makes every response
+cached under the previous version unreachable; those entries then simply expire. The versions live
+in the shared cache (CACHES in settings.py), so a write handled by one worker invalidates the
+responses cached by every worker.
+
+Hits and misses are not counted in the shared cache (a write per request): each lookup is added to
+the request's metrics (core/timing.py), which every process keeps in memory and the metrics files
+add up (core/metrics.py). get_stats reads those totals, so it needs METRICS_ENABLED.
+"""
+import functools
+import json
+import os
+import time
+from hashlib import sha256
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+from core import metrics
+from core.timing import record_cache_lookup
+
+RESPONSE_CACHE_TIMEOUT = getattr(settings, "STORY_RESPONSE_CACHE_TIMEOUT", 300)
+
+# Totals when the statistics were last reset, next to the metrics files
+STATS_BASELINE_FILE = "cache-stats-baseline.json"
+
+def story_version_key(story_id):
+    """Returns the cache key holding the current version of a story"""
+    return f"core:story-version:{story_id}"
+
+def new_version():
+    """Returns a version different from every version the story had before (even before an eviction)"""
+    return time.time_ns()
+
+def get_story_version(story_id):
+    """Returns the current version of a story, starting one if the story has none yet"""
+    key = story_version_key(story_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+def _bump(story_id):
+    """Moves the story to a new version
+
+    A new version is set rather than incremented: incr is a read then a write on the file cache, so
+    two workers bumping at once could both write the same next version.
+    """
+    cache.set(story_version_key(story_id), new_version(), timeout=None)
+
+def bump_story_version(story_id):
+    """Invalidates every cached response of a story
+
+    The version is bumped right away and once more when the surrounding transaction commits, so a
+    response rendered from the old rows while the transaction was still open is never served.
+    """
+    _bump(story_id)
+    transaction.on_commit(lambda: _bump(story_id))
+
+def bump_story_versions(story_ids):
+    """Invalidates every cached response of the given stories"""
+    for story_id in set(story_ids):
+        bump_story_version(story_id)
+
+def response_cache_key(request, story_id):
+    """Returns the cache key of a response for the story's current version
+
+    The key covers the user (cached responses are never shared between users), the full path
+    with its query string and the negotiated media type.
+    """
+    variant = f"{request.get_full_path()}|{request.accepted_media_type}"
+    digest = sha256(variant.encode("utf-8")).hexdigest()
+    return f"core:story-response:{story_id}:{get_story_version(story_id)}:{request.user.pk}:{digest}"
+
+def lookup_totals():
+    """Returns (hits, misses) of every process since they started"""
+    cache_lookups = metrics.store.collect()["cache"]
+    hits = sum(lookups for (url_name, result), lookups in cache_lookups.items() if result == "hit")
+    misses = sum(lookups for (url_name, result), lookups in cache_lookups.items() if result == "miss")
+    return hits, misses
+
+def get_stats():
+    """Returns the hit/miss counters of the response cache since they were last reset"""
+    hits, misses = lookup_totals()
+    try:
+        baseline = json.loads((metrics.get_directory() / STATS_BASELINE_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        baseline = {}
+    # The baseline can be above the totals once a deployment empties the metrics directory
+    hits = max(hits - baseline.get("hits", 0), 0)
+    misses = max(misses - baseline.get("misses", 0), 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / lookups, 4) if lookups else None,
+    }
+
+def reset_stats():
+    """Sets the hit/miss counters back to zero (the metrics keep counting, the current totals become the baseline)"""
+    hits, misses = lookup_totals()
+    path = metrics.get_directory() / STATS_BASELINE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temporary_path.write_text(json.dumps({"hits": hits, "misses": misses}), encoding="utf-8")
+    os.replace(temporary_path, path)
+
+def lookup_response(request, story_id):
+    """Returns (cache key, cached response or None) for a story scoped GET, counting the hit or miss"""
+    key = response_cache_key(request, story_id)
+    cached = cache.get(key)
+    if cached is None:
+        record_cache_lookup(hit=False)
+        return key, None
+    record_cache_lookup(hit=True)
+    content, content_type = cached
+    return key, HttpResponse(content, content_type=content_type)
+
+def store_response(key, response):
+    """Stores a successful response under key once it has been rendered"""
+    if response.status_code == 200 and hasattr(response, "add_post_render_callback"):
+        def store(rendered_response):
+            cache.set(key, (rendered_response.content, rendered_response["Content-Type"]), RESPONSE_CACHE_TIMEOUT)
+        response.add_post_render_callback(store)
+
+def cache_story_response(view_method):
+    """Caches the successful responses of a story scoped GET method under the story's version
+
+    Only 200 responses are stored, once rendered; error responses (e.g. a story that does not
+    belong to the user) always go through the view. Works on the async views too (core/async_views.py),
+    the cache lookup then runs in a thread.
+    """
+    if iscoroutinefunction(view_method):
+        @functools.wraps(view_method)
+        async def async_wrapper(self, request, story_id, *args, **kwargs):
+            key, cached = await sync_to_async(lookup_response)(request, story_id)
+            if cached is not None:
+                return cached
+            response = await view_method(self, request, story_id, *args, **kwargs)
+            store_response(key, response)
+            return response
+        return async_wrapper
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, story_id, *args, **kwargs):
+        key, cached = lookup_response(request, story_id)
+        if cached is not None:
+            return cached
+        response = view_method(self, request, story_id, *args, **kwargs)
+        store_response(key, response)
+        return response
+    return wrapper
@@ -0,0 +1,66 @@
+"""
+Conditional GET support (ETag / If-None-Match and Last-Modified / If-Modified-Since) for story resources
+
+Every write to a story or one of its children moves the story's updated_at forward, so the
+story's id and updated_at identify the version of any resource under it. Validators are built
+from those two values (no serialization of the body) and Django's condition() answers
+304 Not Modified when the client already has that version.
+"""
+import functools
+from hashlib import sha256
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from core import models
+from core.cache import RESPONSE_CACHE_TIMEOUT, get_story_version
+
+def get_story_updated_at(request, story_id, **kwargs):
+    """Returns when the user's story last changed, or None when the story is not theirs
+
+    The timestamp is cached under the story's current version (a write moves the version on, so
+    it is never stale) and memoized on the request, as condition() asks for it twice.
+    """
+    if getattr(request, "_story_updated_at", None) is None:
+        key = f"core:story-updated-at:{story_id}:{get_story_version(story_id)}:{request.user.pk}"
+        updated_at = cache.get(key)
+        if updated_at is None:
+            updated_at = models.StoriesModel.objects.filter(
+                user=request.user, story_id=story_id,
+            ).values_list("updated_at", flat=True).first()
+            if updated_at is not None:
+                cache.set(key, updated_at, RESPONSE_CACHE_TIMEOUT)
+        request._story_updated_at = (updated_at,)
+    return request._story_updated_at[0]
+
+def story_etag(request, story_id, **kwargs):
+    """Returns the ETag of a story resource (it differs per path and media type)"""
+    updated_at = get_story_updated_at(request, story_id)
+    if updated_at is None:
+        return None
+    variant = f"{story_id}|{updated_at.isoformat()}|{request.get_full_path()}|{request.accepted_media_type}"
+    return sha256(variant.encode("utf-8")).hexdigest()[:32]
+
+def story_last_modified(request, story_id, **kwargs):
+    """Returns the Last-Modified date of a story resource"""
+    return get_story_updated_at(request, story_id)
+
+_story_condition = method_decorator(condition(etag_func=story_etag, last_modified_func=story_last_modified))
+
+def story_conditional_get(view_method):
+    """Decorator for the GET methods of the story views (sync, or async in core/async_views.py)
+
+    condition() calls story_etag and story_last_modified synchronously, so for an async method the
+    story's updated_at is read in the database thread first; they then find it memoized on the request.
+    """
+    conditional_method = _story_condition(view_method)
+    if not iscoroutinefunction(view_method):
+        return conditional_method
+
+    @functools.wraps(view_method)
+    async def wrapper(self, request, story_id, *args, **kwargs):
+        await sync_to_async(get_story_updated_at)(request, story_id)
+        return await conditional_method(self, request, story_id, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,233 @@
+"""
+Synthetic dataset generation (python manage.py generate_dataset)
+
+Fills the schema with users and stories shaped like real ones: every story has an incident with
+people, a VAKS, points, a script, links and characters. People, links and characters are drawn
+from shared pools with a skewed distribution, so a few records are attached to many stories
+(like the deduplicated records of real users) and most to a handful.
+
+Everything comes from one random.Random(seed), so the same options always produce the same data.
+Rows are written with bulk_create, batch_size stories (and all their children) per transaction,
+and the password hash is computed once for all the users.
+"""
+import datetime
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from core import models, search
+
+WORDS = (
+    "morning rain city station train window coffee letter friend stranger silence music street "
+    "market river bridge light shadow door key phone message laugh argument promise secret road "
+    "night summer winter garden school office hospital party dinner walk storm smile memory photo "
+    "voice crowd bus ticket book song dream mistake apology journey home family neighbour dog"
+).split()
+FIRST_NAMES = (
+    "Amelia Oliver Isla George Ava Noah Mia Arthur Ivy Leo Grace Oscar Freya Harry Lily Jack Sophia "
+    "Charlie Ella Theo Aisha Mohammed Priya Ravi Chen Mei Lucas Zara Omar Hannah"
+).split()
+LAST_NAMES = "Smith Jones Taylor Brown Williams Wilson Johnson Davies Patel Wright Khan Evans Thomas Roberts".split()
+PEOPLE_TYPES = ("friend", "family", "colleague", "stranger", "partner", "neighbour", "teacher")
+BODY_LANGUAGE = ("calm", "nervous", "excited", "angry", "tired", "confident", "distracted")
+
+class DatasetReport:
+    """Rows written so far, per model"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.rows = {}
+
+    def add(self, model_class, count):
+        """Counts rows written for a model"""
+        self.rows[model_class.__name__] = self.rows.get(model_class.__name__, 0) + count
+
+    @property
+    def total(self):
+        """Rows written for all models"""
+        return sum(self.rows.values())
+
+    @property
+    def seconds(self):
+        """Seconds since the generation started"""
+        return time.perf_counter() - self.started
+
+class DatasetGenerator:
+    """Generates users and their stories (see the module docstring)"""
+
+    def __init__(
+        self,
+        users,
+        stories_per_user,
+        points_per_story=5,
+        people_per_incident=3,
+        links_per_story=2,
+        characters_per_story=2,
+        pool_size=1000,
+        seed=0,
+        batch_size=2000,
+        password="Generated123",
+        email_prefix="generated",
+        progress=None,
+    ):
+        self.users = users
+        self.stories_per_user = stories_per_user
+        self.points_per_story = points_per_story
+        self.people_per_incident = people_per_incident
+        self.links_per_story = links_per_story
+        self.characters_per_story = characters_per_story
+        self.pool_size = pool_size
+        self.seed = seed
+        self.batch_size = batch_size
+        self.password = password
+        self.email_prefix = email_prefix
+        # Called with the report after every batch
+        self.progress = progress
+        self.random = random.Random(seed)
+        self.report = DatasetReport()
+        # Texts are slices of one long random word sequence (drawing every word is the slowest part)
+        self.corpus = self.random.choices(WORDS, k=100_000)
+
+    def email(self, number):
+        """Returns the email of the number-th generated user"""
+        return f"{self.email_prefix}-{self.seed}-{number}@example.com"
+
+    def already_generated(self):
+        """Checks whether users of this seed and prefix exist already"""
+        return models.UsersModel.objects.filter(email__startswith=f"{self.email_prefix}-{self.seed}-").exists()
+
+    def run(self):
+        """Generates the whole dataset and returns the report"""
+        # Maintaining the search index row by row slows bulk inserts down: it is rebuilt once at the end
+        search_available = search.is_available()
+        if search_available:
+            search.drop_index()
+
+        try:
+            people = self.create_pool(models.PeoplesModel, self.person_content)
+            links = self.create_pool(models.LinksModel, self.link_content)
+            characters = self.create_pool(models.CharactersModel, self.character_content)
+
+            password_hash = make_password(self.password)
+            users_per_batch = max(1, self.batch_size // self.stories_per_user)
+            for first in range(0, self.users, users_per_batch):
+                with transaction.atomic():
+                    users = self.create_users(range(first, min(first + users_per_batch, self.users)), password_hash)
+                    self.create_stories(users, people, links, characters)
+                if self.progress:
+                    self.progress(self.report)
+        finally:
+            # Also after a failure, so searching keeps working with what was written
+            if search_available:
+                search.rebuild_index()
+        return self.report
+
+    def bulk_create(self, model_class, records, **kwargs):
+        """Inserts the records with bulk_create and counts them"""
+        created = model_class.objects.bulk_create(records, batch_size=self.batch_size, **kwargs)
+        self.report.add(model_class, len(records))
+        return created
+
+    def text(self, words):
+        """Returns a sentence of random words"""
+        start = self.random.randrange(len(self.corpus) - words)
+        return " ".join(self.corpus[start:start + words]).capitalize()
+
+    def person_content(self, number):
+        """Returns the fields of the number-th shared person"""
+        return {"first_name": f"{self.random.choice(FIRST_NAMES)} {number}", "type": self.random.choice(PEOPLE_TYPES)}
+
+    def link_content(self, number):
+        """Returns the fields of the number-th shared link"""
+        return {"title": f"{self.text(3)} {number}", "description": self.text(8)}
+
+    def character_content(self, number):
+        """Returns the fields of the number-th shared character"""
+        return {"body_language": self.random.choice(BODY_LANGUAGE), "dialog": f"{self.text(20)} ({number})"}
+
+    def create_pool(self, model_class, content):
+        """Creates the shared records of a model, reusing the copies that already exist"""
+        records = self.bulk_create(
+            model_class,
+            [model_class.from_content(**content(number)) for number in range(self.pool_size)],
+            update_conflicts=True,
+            unique_fields=["content_hash"],
+            update_fields=["content_hash"],
+        )
+        return [record.pk for record in records]
+
+    def pick(self, pool, count):
+        """Picks count distinct ids from a pool, the first ones of the pool far more often"""
+        count = min(count, len(pool))
+        picked = set()
+        while len(picked) < count:
+            picked.add(pool[int(len(pool) * self.random.random() ** 3)])
+        return sorted(picked)
+
+    def create_users(self, numbers, password_hash):
+        """Creates the users with the given numbers (the password is hashed once for all of them)"""
+        cities = [city for city, label in models.UsersModel.CITY_CHOICES]
+        genders = [gender for gender, label in models.UsersModel.GENDER_CHOICES] + [None]
+        return self.bulk_create(models.UsersModel, [
+            models.UsersModel(
+                email=self.email(number),
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                date_of_birth=datetime.date(1950, 1, 1) + datetime.timedelta(days=self.random.randrange(20000)),
+                city=self.random.choice(cities),
+                gender=self.random.choice(genders),
+                password=password_hash,
+            )
+            for number in numbers
+        ])
+
+    def create_stories(self, users, people, links, characters):
+        """Creates the stories of the users with all their children"""
+        stories = self.bulk_create(models.StoriesModel, [
+            models.StoriesModel(user=user, title=self.text(self.random.randint(2, 6)))
+            for user in users
+            for _ in range(self.stories_per_user)
+        ])
+
+        base_time = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        incidents, vaks, points, scripts = [], [], [], []
+        people_incidents, story_links, story_characters = [], [], []
+        for story in stories:
+            incidents.append(models.IncidentsModel(
+                story_id=story.story_id,
+                incident_what=self.text(15),
+                incident_where=self.text(3),
+                incident_when=base_time + datetime.timedelta(minutes=self.random.randrange(2_000_000)),
+            ))
+            vaks.append(models.VAKSModel(
+                story_id=story.story_id,
+                sight=self.text(6), sound=self.text(6), smell=self.text(6),
+                taste=self.text(6), touch=self.text(6), emotion=self.text(3),
+            ))
+            scripts.append(models.ScriptsModel(story_id=story.story_id, content=self.text(200)))
+            points.extend(
+                models.PointsModel(story_id=story.story_id, content=self.text(12))
+                for _ in range(self.points_per_story)
+            )
+            people_incidents.extend(
+                models.PeopleIncidentModel(incident_id=story.story_id, person_id=person_id)
+                for person_id in self.pick(people, self.people_per_incident)
+            )
+            story_links.extend(
+                models.StoryLinkModel(story_id=story.story_id, link_id=link_id)
+                for link_id in self.pick(links, self.links_per_story)
+            )
+            story_characters.extend(
+                models.StoryCharactersModel(story_id=story.story_id, character_id=character_id)
+                for character_id in self.pick(characters, self.characters_per_story)
+            )
+
+        self.bulk_create(models.IncidentsModel, incidents)
+        self.bulk_create(models.VAKSModel, vaks)
+        self.bulk_create(models.ScriptsModel, scripts)
+        self.bulk_create(models.PointsModel, points)
+        self.bulk_create(models.PeopleIncidentModel, people_incidents)
+        self.bulk_create(models.StoryLinkModel, story_links)
+        self.bulk_create(models.StoryCharactersModel, story_characters)
@@ -0,0 +1,249 @@
+"""
+Bulk import of stories from newline delimited JSON
+
+Each line holds one story in the shape of the export (FullStorySerializer): the story's title
+plus its incident, people, vaks, points, script, links and characters. Lines are read one at a
+time and validated with the regular serializers; valid stories are buffered and written every
+batch_size stories with one bulk INSERT per table, each batch in its own transaction.
+
+A batch failing with an OperationalError (on SQLite, "database is locked" while another import
+writes) is retried STORIES_IMPORT_RETRIES times, waiting longer each time. If the database stays
+busy the import stops with DatabaseBusy rather than reporting valid lines as failed.
+"""
+import json
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, OperationalError, transaction
+
+from core import models, serializers
+
+# Single child records (None or missing means the story has none)
+SINGLE_CHILDREN = {
+    "incident": serializers.IncidentsSerializer,
+    "vaks": serializers.VAKSSerializer,
+    "script": serializers.ScriptsSerializer,
+}
+
+# Child lists (missing means an empty list)
+CHILD_LISTS = {
+    "people": serializers.PeopleSerializer,
+    "points": serializers.PointsSerializer,
+    "links": serializers.LinksSerializer,
+    "characters": serializers.CharactersSerializer,
+}
+
+class ImportReport:
+    """Progress and outcome of an import"""
+
+    def __init__(self, max_errors):
+        self.max_errors = max_errors
+        self.lines = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = {}
+
+    def add_error(self, line_number, errors):
+        """Records a line that could not be imported (only the first max_errors are kept)"""
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors[line_number] = errors
+
+    def as_dict(self):
+        """Returns the report as a dictionary for responses and logs"""
+        return {
+            "lines": self.lines,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+class DatabaseBusy(Exception):
+    """Raised when a batch could still not be written after its retries (the stories before it are imported)"""
+
+    def __init__(self, report):
+        super().__init__("The database is busy, the import was stopped")
+        self.report = report
+
+class StoryImporter:
+    """Imports stories for one user from an iterable of NDJSON lines (str or bytes)"""
+
+    def __init__(self, user, batch_size=None, max_errors=None, progress=None):
+        self.user = user
+        self.batch_size = batch_size or getattr(settings, "STORIES_IMPORT_BATCH_SIZE", 500)
+        self.report = ImportReport(max_errors or getattr(settings, "STORIES_IMPORT_MAX_ERRORS", 100))
+        # Called with the report after every batch
+        self.progress = progress
+        self.pending = []
+
+    def run(self, lines):
+        """Imports every line and returns the report"""
+        for line_number, line in enumerate(lines, start=1):
+            if isinstance(line, bytes):
+                line = line.decode("utf-8", errors="replace")
+            if not line.strip():
+                continue
+
+            self.report.lines += 1
+            record, errors = self.parse_line(line)
+            if errors:
+                self.report.add_error(line_number, errors)
+                continue
+
+            self.pending.append((line_number, record))
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+        self.flush()
+        return self.report
+
+    def parse_line(self, line):
+        """Returns (validated record, None) for a valid line or (None, errors)"""
+        try:
+            data = json.loads(line)
+        except ValueError as error:
+            return None, {"line": f"Invalid JSON❌: {error}"}
+        if not isinstance(data, dict):
+            return None, {"line": "Each line must be a JSON object❌"}
+
+        errors = {}
+        story = serializers.StorySerializer(data=data)
+        record = {"story": story.validated_data if story.is_valid() else None}
+        if story.errors:
+            errors.update(story.errors)
+
+        for name, serializer_class in SINGLE_CHILDREN.items():
+            record[name] = None
+            if data.get(name) is None:
+                continue
+            serializer = serializer_class(data=data[name])
+            if serializer.is_valid():
+                record[name] = serializer.validated_data
+            else:
+                errors[name] = serializer.errors
+
+        for name, serializer_class in CHILD_LISTS.items():
+            serializer = serializer_class(data=data.get(name) or [], many=True)
+            if serializer.is_valid():
+                record[name] = serializer.validated_data
+            else:
+                errors[name] = serializer.errors
+
+        if record["people"] and data.get("incident") is None:
+            errors["people"] = "People can only be imported together with an incident❌"
+
+        if errors:
+            return None, errors
+        return record, None
+
+    def flush(self):
+        """Writes the pending stories in one transaction (a failing batch is reported line by line)"""
+        if not self.pending:
+            return
+
+        batch, self.pending = self.pending, []
+        try:
+            self.write_batch_with_retries([record for line_number, record in batch])
+        except OperationalError:
+            raise DatabaseBusy(self.report)
+        except DatabaseError as error:
+            for line_number, record in batch:
+                self.report.add_error(line_number, {"database": f"Batch could not be saved❌: {error}"})
+        else:
+            self.report.imported += len(batch)
+
+        if self.progress:
+            self.progress(self.report)
+
+    def write_batch_with_retries(self, records):
+        """Writes a batch in its own transaction, trying again while it fails with an OperationalError"""
+        retries = getattr(settings, "STORIES_IMPORT_RETRIES", 3)
+        delay = getattr(settings, "STORIES_IMPORT_RETRY_DELAY", 0.1)
+        for attempt in range(retries + 1):
+            try:
+                with transaction.atomic():
+                    self.write_batch(records)
+                return
+            except OperationalError:
+                if attempt == retries:
+                    raise
+                time.sleep(delay * 2 ** attempt)
+
+    def write_batch(self, records):
+        """Inserts the stories of a batch and their children with one bulk INSERT per table"""
+        stories = models.StoriesModel.objects.bulk_create(
+            [models.StoriesModel(user=self.user, **record["story"]) for record in records]
+        )
+
+        incidents, vaks, points, scripts = [], [], [], []
+        for story, record in zip(stories, records):
+            if record["incident"]:
+                incidents.append(models.IncidentsModel(story=story, **record["incident"]))
+            if record["vaks"]:
+                vaks.append(models.VAKSModel(story=story, **record["vaks"]))
+            if record["script"]:
+                scripts.append(models.ScriptsModel(story=story, **record["script"]))
+            points.extend(models.PointsModel(story=story, **point) for point in record["points"])
+
+        models.IncidentsModel.objects.bulk_create(incidents)
+        models.VAKSModel.objects.bulk_create(vaks)
+        models.PointsModel.objects.bulk_create(points)
+        models.ScriptsModel.objects.bulk_create(scripts)
+
+        # Shared records: reuse the existing copies, insert the missing ones, then link them
+        people = self.resolve_shared(models.PeoplesModel, [record["people"] for record in records])
+        links = self.resolve_shared(models.LinksModel, [record["links"] for record in records])
+        characters = self.resolve_shared(models.CharactersModel, [record["characters"] for record in records])
+
+        # Stories with people always have an incident (checked in parse_line)
+        incidents_by_story = {incident.story_id: incident for incident in incidents}
+        models.PeopleIncidentModel.objects.bulk_create([
+            models.PeopleIncidentModel(person=person, incident=incidents_by_story[story.story_id])
+            for story, story_people in zip(stories, people)
+            for person in story_people
+        ])
+        models.StoryLinkModel.objects.bulk_create([
+            models.StoryLinkModel(story=story, link=link)
+            for story, story_links in zip(stories, links)
+            for link in story_links
+        ])
+        models.StoryCharactersModel.objects.bulk_create([
+            models.StoryCharactersModel(story=story, character=character)
+            for story, story_characters in zip(stories, characters)
+            for character in story_characters
+        ])
+
+    def resolve_shared(self, model_class, data_lists):
+        """Returns, for each story, its shared records (deduplicated by content hash)
+
+        Existing records are found with one IN query on the content hash and the missing ones are
+        inserted with one bulk INSERT for the whole batch.
+        """
+        hashes_lists = []
+        data_by_hash = {}
+        for data_list in data_lists:
+            hashes = []
+            for data in data_list:
+                content_hash = model_class.hash_for(data)
+                data_by_hash.setdefault(content_hash, data)
+                if content_hash not in hashes:
+                    hashes.append(content_hash)
+            hashes_lists.append(hashes)
+
+        if not data_by_hash:
+            return hashes_lists
+
+        records = model_class.objects.in_bulk(list(data_by_hash), field_name="content_hash")
+        created = model_class.objects.bulk_create(
+            [
+                model_class.from_content(**data)
+                for content_hash, data in data_by_hash.items()
+                if content_hash not in records
+            ],
+            update_conflicts=True,
+            unique_fields=["content_hash"],
+            update_fields=["content_hash"],
+        )
+        for record in created:
+            records[record.content_hash] = record
+        return [[records[content_hash] for content_hash in hashes] for hashes in hashes_lists]
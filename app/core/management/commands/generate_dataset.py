@@ -0,0 +1,56 @@
+"""
+Fills the database with a synthetic (but realistically shaped) dataset of users and stories
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dataset import DatasetGenerator
+
+class Command(BaseCommand):
+    help = "Generates users with stories, incidents, people, VAKS, points, scripts, links and characters (deterministic for a --seed)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10, help="Users to create")
+        parser.add_argument("--stories-per-user", type=int, default=10, help="Stories per user")
+        parser.add_argument("--points-per-story", type=int, default=5, help="Points per story")
+        parser.add_argument("--people-per-incident", type=int, default=3, help="People linked to each story's incident")
+        parser.add_argument("--links-per-story", type=int, default=2, help="Links attached to each story")
+        parser.add_argument("--characters-per-story", type=int, default=2, help="Characters attached to each story")
+        parser.add_argument("--pool-size", type=int, default=1000, help="Shared people, links and characters to draw from")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Stories written per transaction")
+        parser.add_argument("--password", default="Generated123", help="Password of every generated user")
+        parser.add_argument("--email-prefix", default="generated", help="Users get the email <prefix>-<seed>-<n>@example.com")
+
+    def handle(self, *args, **options):
+        if min(options["users"], options["stories_per_user"], options["batch_size"]) < 1:
+            raise CommandError("--users, --stories-per-user and --batch-size must be at least 1❌")
+
+        generator = DatasetGenerator(
+            users=options["users"],
+            stories_per_user=options["stories_per_user"],
+            points_per_story=options["points_per_story"],
+            people_per_incident=options["people_per_incident"],
+            links_per_story=options["links_per_story"],
+            characters_per_story=options["characters_per_story"],
+            pool_size=options["pool_size"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            password=options["password"],
+            email_prefix=options["email_prefix"],
+            progress=self.report_progress,
+        )
+        if generator.already_generated():
+            raise CommandError(
+                f"Users {generator.email('*')} already exist, pick another --seed or --email-prefix❌"
+            )
+
+        report = generator.run()
+        for model_name, rows in report.rows.items():
+            self.stdout.write(f"{model_name}: {rows}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {report.total} rows in {report.seconds:.1f}s ({report.total / report.seconds:.0f} rows/s)✅"
+        ))
+
+    def report_progress(self, report):
+        """Prints the progress after every batch"""
+        self.stdout.write(f"{report.total} rows written ({report.total / report.seconds:.0f} rows/s)")
@@ -0,0 +1,51 @@
+"""
+Imports stories for a user from a newline delimited JSON file (the format of api/stories/export/)
+"""
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importer import DatabaseBusy, StoryImporter
+
+class Command(BaseCommand):
+    help = "Imports stories for a user from a newline delimited JSON file ('-' reads standard input)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON file to import, or - for standard input")
+        parser.add_argument("--email", required=True, help="Email of the user the stories are imported for")
+        parser.add_argument("--batch-size", type=int, default=None, help="Stories written per transaction")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['email']} does not exist❌")
+
+        importer = StoryImporter(user, batch_size=options["batch_size"], progress=self.report_progress)
+        try:
+            if options["path"] == "-":
+                report = importer.run(sys.stdin)
+            else:
+                try:
+                    with open(options["path"], encoding="utf-8") as lines:
+                        report = importer.run(lines)
+                except OSError as error:
+                    raise CommandError(f"Could not read {options['path']}❌: {error}")
+        except DatabaseBusy as busy:
+            raise CommandError(
+                f"The database is busy, the import stopped after {busy.report.imported} stories❌"
+            )
+
+        for line_number, errors in report.errors.items():
+            self.stderr.write(f"Line {line_number}: {json.dumps(errors, default=str, ensure_ascii=False)}")
+        if report.failed > len(report.errors):
+            self.stderr.write(f"... and {report.failed - len(report.errors)} more failed lines")
+
+        style = self.style.SUCCESS if not report.failed else self.style.WARNING
+        self.stdout.write(style(f"Imported {report.imported} of {report.lines} stories ({report.failed} failed)"))
+
+    def report_progress(self, report):
+        """Prints the progress after every batch"""
+        self.stdout.write(f"{report.lines} lines read, {report.imported} stories imported, {report.failed} failed")
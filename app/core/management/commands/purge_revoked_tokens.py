@@ -0,0 +1,22 @@
+"""
+Deletes the revoked refresh tokens that have expired anyway
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.revocation import store
+
+class Command(BaseCommand):
+    help = "Deletes the expired rows of the refresh token revocation store in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "REVOCATION_PURGE_BATCH_SIZE", 1000),
+            help="Rows deleted per statement (short statements keep the table writable for the refreshes)",
+        )
+
+    def handle(self, *args, **options):
+        purged = store.purge(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{purged} expired revoked tokens purged✅"))
@@ -0,0 +1,20 @@
+"""
+Rebuilds the full-text search index of the stories
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core import search
+
+class Command(BaseCommand):
+    help = "Recreates the story search index triggers and reindexes every story"
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("Full-text search needs an SQLite database (FTS5)❌")
+
+        search.rebuild_index()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {search.SEARCH_TABLE}")
+            rows = cursor.fetchone()[0]
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt with {rows} rows✅"))
@@ -0,0 +1,47 @@
+"""
+Copies the primary SQLite database onto the local read replicas with SQLite's online backup API
+"""
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+def backup_database(source_path, target_path, pages=1024):
+    """Copies the source database file onto the target while both may be in use
+
+    The backup runs `pages` pages at a time, so writers on the source are only held up briefly.
+    """
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=pages)
+    finally:
+        target.close()
+        source.close()
+
+class Command(BaseCommand):
+    help = "Copies the primary SQLite database onto every read replica (once, or every --interval seconds)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=None, help="Keep syncing every INTERVAL seconds")
+
+    def handle(self, *args, **options):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            raise CommandError("No read replicas configured (set DJANGO_READ_REPLICAS)❌")
+
+        databases = settings.DATABASES
+        if any(databases[alias]["ENGINE"] != "django.db.backends.sqlite3" for alias in [DEFAULT_DB_ALIAS, *replicas]):
+            raise CommandError("sync_replicas only copies SQLite databases❌")
+
+        while True:
+            started = time.perf_counter()
+            for alias in replicas:
+                backup_database(databases[DEFAULT_DB_ALIAS]["NAME"], databases[alias]["NAME"])
+            self.stdout.write(f"Synced {len(replicas)} replica(s) in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,263 @@
+"""
+Per endpoint metrics in the Prometheus text format, added up across the worker processes
+
+MetricsMiddleware (core/middleware.py) records every request under its URL name (the name= of
+core/urls.py): requests per method and status code, a latency histogram, database queries and
+response cache hits and misses. Each process keeps its counters in memory and writes them to its
+own file in METRICS_DIRECTORY at most every METRICS_FLUSH_SECONDS, replacing the file in one
+rename; /api/metrics adds up the files of every process, so whichever worker answers returns the
+totals of all of them (the other workers' counters can be up to METRICS_FLUSH_SECONDS old).
+
+A file is named after the process id and a random id drawn when the process starts, so a process
+reusing the id of an exited one never overwrites its counters. When a process exits, its counters
+are added to metrics-exited.json and its own file is removed, under a lock that collect() shares, so
+the totals never go back and the directory does not grow with every worker restart. Only a process
+killed before its exit handlers run leaves its file behind; it is still added up.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: the files are read and merged without the lock
+    fcntl = None
+
+logger = logging.getLogger("core.metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Label of the requests that matched no URL pattern (e.g. 404s)
+UNRESOLVED = "unresolved"
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Counters of the processes that exited, and the lock guarding the merge into it
+EXITED_FILE = "metrics-exited.json"
+LOCK_FILE = "metrics.lock"
+
+def get_latency_buckets():
+    """Returns the upper bounds (seconds) of the latency histogram buckets"""
+    return tuple(getattr(settings, "METRICS_LATENCY_BUCKETS", DEFAULT_LATENCY_BUCKETS))
+
+def get_directory():
+    """Returns the directory holding the metrics files of the processes"""
+    return Path(getattr(settings, "METRICS_DIRECTORY", Path(settings.BASE_DIR) / "metrics"))
+
+def empty_metrics():
+    """Returns empty counters
+
+    requests: (url name, method, status code) -> count
+    latency: (url name, method) -> [count per bucket (the last one is +Inf), sum of the seconds]
+    queries: (url name, method) -> queries
+    cache: (url name, "hit" or "miss") -> lookups
+    """
+    return {"requests": {}, "latency": {}, "queries": {}, "cache": {}}
+
+def add_counters(totals, content, buckets):
+    """Adds the counters read from a file to the totals (a histogram with other buckets is left out)"""
+    for name, counters in totals.items():
+        if name == "latency" and tuple(content.get("buckets", ())) != buckets:
+            continue
+        for *key, value in content.get(name, []):
+            key = tuple(key)
+            if name == "latency":
+                total = counters.setdefault(key, [0] * (len(buckets) + 1) + [0.0])
+                counters[key] = [before + added for before, added in zip(total, value)]
+            else:
+                counters[key] = counters.get(key, 0) + value
+
+def serialize(metrics, buckets):
+    """Returns the content of a metrics file"""
+    return json.dumps({
+        "buckets": buckets,
+        **{name: [[*key, value] for key, value in counters.items()] for name, counters in metrics.items()},
+    })
+
+def write_file(path, content):
+    """Replaces a file in one rename, so it is never read half written"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_suffix(".tmp")
+    temporary_path.write_text(content, encoding="utf-8")
+    os.replace(temporary_path, path)
+
+class DirectoryLock:
+    """Lock on the metrics directory: shared while the files are added up, exclusive while they are merged"""
+
+    def __init__(self, exclusive):
+        self.exclusive = exclusive
+
+    def __enter__(self):
+        directory = get_directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        self.file = open(directory / LOCK_FILE, "a")
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+        return self
+
+    def __exit__(self, *exc_info):
+        # Closing the file releases the lock
+        self.file.close()
+
+class MetricsStore:
+    """Counters of the current process and the files sharing them with the other processes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Starts the counters of this process from zero (also after a fork: the parent's are not ours)"""
+        self.pid = os.getpid()
+        self.run_id = uuid.uuid4().hex[:12]
+        self.metrics = empty_metrics()
+        self.buckets = get_latency_buckets()
+        self.flushed = time.monotonic()
+
+    def record(self, url_name, method, status_code, seconds, queries, cache_hits, cache_misses):
+        """Adds a request to the counters"""
+        with self.lock:
+            if self.pid != os.getpid():
+                self.reset()
+            metrics = self.metrics
+            key = (url_name, method)
+            requests_key = (url_name, method, str(status_code))
+            metrics["requests"][requests_key] = metrics["requests"].get(requests_key, 0) + 1
+
+            latency = metrics["latency"].get(key)
+            if latency is None:
+                latency = metrics["latency"][key] = [0] * (len(self.buckets) + 1) + [0.0]
+            bucket = next((index for index, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+            latency[bucket] += 1
+            latency[-1] += seconds
+
+            metrics["queries"][key] = metrics["queries"].get(key, 0) + queries
+            for result, lookups in (("hit", cache_hits), ("miss", cache_misses)):
+                if lookups:
+                    cache_key = (url_name, result)
+                    metrics["cache"][cache_key] = metrics["cache"].get(cache_key, 0) + lookups
+
+            due = time.monotonic() - self.flushed >= getattr(settings, "METRICS_FLUSH_SECONDS", 5)
+        if due:
+            try:
+                self.flush()
+            except OSError:
+                # The request must not fail because of its metrics: they are written again next time
+                logger.exception("Could not write the metrics to %s", self.path())
+
+    def path(self):
+        """Returns the file of this process (of this start of it)"""
+        return get_directory() / f"metrics-{self.pid}-{self.run_id}.json"
+
+    def flush(self):
+        """Writes the counters of this process to its file"""
+        with self.lock:
+            if self.pid != os.getpid():
+                self.reset()
+            self.flushed = time.monotonic()
+            write_file(self.path(), serialize(self.metrics, self.buckets))
+
+    def collect(self):
+        """Returns the counters of every process (this one's are written first, so they are current)"""
+        self.flush()
+        buckets = get_latency_buckets()
+        totals = empty_metrics()
+        with DirectoryLock(exclusive=False):
+            for path in sorted(get_directory().glob("metrics-*.json")):
+                try:
+                    content = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    continue
+                add_counters(totals, content, buckets)
+        return totals
+
+    def close(self):
+        """Adds the counters of this process to the exited processes' file and removes its own (at exit)"""
+        with self.lock:
+            if self.pid != os.getpid():
+                # A forked process that recorded nothing
+                return
+            path = self.path()
+            if not self.metrics["requests"] and not path.exists():
+                return
+            exited_path = get_directory() / EXITED_FILE
+            try:
+                with DirectoryLock(exclusive=True):
+                    try:
+                        exited = json.loads(exited_path.read_text(encoding="utf-8"))
+                    except (OSError, ValueError):
+                        exited = {}
+                    # The exited processes' histogram restarts if the buckets changed
+                    totals = empty_metrics()
+                    add_counters(totals, exited, self.buckets)
+                    add_counters(totals, json.loads(serialize(self.metrics, self.buckets)), self.buckets)
+                    write_file(exited_path, serialize(totals, self.buckets))
+                    path.unlink(missing_ok=True)
+            except OSError:
+                logger.exception("Could not merge the metrics into %s", exited_path)
+                return
+            self.metrics = empty_metrics()
+
+store = MetricsStore()
+atexit.register(store.close)
+
+def escape(value):
+    """Escapes a label value"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def labels(**values):
+    """Formats a label set"""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in values.items()) + "}"
+
+def render_metrics(metrics):
+    """Returns the counters in the Prometheus text exposition format"""
+    buckets = get_latency_buckets()
+    lines = [
+        "# HELP api_requests_total Requests handled, by URL name, method and status code.",
+        "# TYPE api_requests_total counter",
+    ]
+    for (url_name, method, status_code), count in sorted(metrics["requests"].items()):
+        lines.append(f"api_requests_total{labels(url_name=url_name, method=method, status=status_code)} {count}")
+
+    lines += [
+        "# HELP api_request_duration_seconds Time taken to handle a request, by URL name and method.",
+        "# TYPE api_request_duration_seconds histogram",
+    ]
+    for (url_name, method), latency in sorted(metrics["latency"].items()):
+        cumulative = 0
+        for bound, count in zip((*map(repr, buckets), "+Inf"), latency[:-1]):
+            cumulative += count
+            lines.append(f"api_request_duration_seconds_bucket{labels(url_name=url_name, method=method, le=bound)} {cumulative}")
+        lines.append(f"api_request_duration_seconds_sum{labels(url_name=url_name, method=method)} {latency[-1]!r}")
+        lines.append(f"api_request_duration_seconds_count{labels(url_name=url_name, method=method)} {cumulative}")
+
+    lines += [
+        "# HELP api_db_queries_total Database queries run by the requests, by URL name and method.",
+        "# TYPE api_db_queries_total counter",
+    ]
+    for (url_name, method), queries in sorted(metrics["queries"].items()):
+        lines.append(f"api_db_queries_total{labels(url_name=url_name, method=method)} {queries}")
+
+    lines += [
+        "# HELP api_response_cache_lookups_total Story response cache lookups, by URL name and result (hit or miss).",
+        "# TYPE api_response_cache_lookups_total counter",
+    ]
+    for (url_name, result), lookups in sorted(metrics["cache"].items()):
+        lines.append(f"api_response_cache_lookups_total{labels(url_name=url_name, result=result)} {lookups}")
+
+    lines += [
+        "# HELP api_response_cache_hit_ratio Share of the story response cache lookups that were hits, by URL name.",
+        "# TYPE api_response_cache_hit_ratio gauge",
+    ]
+    for url_name in sorted({url_name for url_name, result in metrics["cache"]}):
+        hits = metrics["cache"].get((url_name, "hit"), 0)
+        lookups = hits + metrics["cache"].get((url_name, "miss"), 0)
+        lines.append(f"api_response_cache_hit_ratio{labels(url_name=url_name)} {hits / lookups!r}")
+    return "\n".join(lines) + "\n"
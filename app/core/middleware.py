@@ -0,0 +1,314 @@
+"""
+Middleware for the core application
+"""
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import reverse
+
+from core import metrics, nplusone, profiling, routers, timing
+
+timing_logger = logging.getLogger("core.timing")
+nplusone_logger = logging.getLogger("core.nplusone")
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+class ReplicaRoutingMiddleware:
+    """Sends the reads of safe requests to the read replicas (see core/routers.py)
+
+    Unsafe requests read and write on the primary and make their client sticky to the primary
+    for a while, so its next reads see what it wrote. Does nothing when there are no replicas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not routers.get_replicas():
+            return self.get_response(request)
+
+        identity = routers.get_request_identity(request)
+        if request.method in SAFE_METHODS:
+            with routers.use_replicas(not routers.is_sticky(identity)):
+                return self.get_response(request)
+
+        response = self.get_response(request)
+        routers.mark_sticky(identity)
+        return response
+
+    async def __acall__(self, request):
+        if not routers.get_replicas():
+            return await self.get_response(request)
+
+        identity = routers.get_request_identity(request)
+        if request.method in SAFE_METHODS:
+            with routers.use_replicas(not routers.is_sticky(identity)):
+                return await self.get_response(request)
+
+        response = await self.get_response(request)
+        routers.mark_sticky(identity)
+        return response
+
+class RequestTimingMiddleware:
+    """Measures a sample of the requests: queries, time in the database, the view, rendering and in total
+
+    A measured request gets a Server-Timing header (REQUEST_TIMING_HEADER) and is logged by the
+    "core.timing" logger, with the measures as structured fields, when it took at least
+    REQUEST_TIMING_LOG_THRESHOLD_MS. REQUEST_TIMING_SAMPLE_RATE is the fraction of the requests
+    measured, the others go straight through. Queries run while a streaming response is sent
+    (e.g. the export) happen after the measure and are not counted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            # An async handler would run the synchronous hooks in a thread
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+
+    def is_sampled(self):
+        """Draws whether the current request is measured"""
+        sample_rate = getattr(settings, "REQUEST_TIMING_SAMPLE_RATE", 0)
+        return sample_rate >= 1 or (sample_rate > 0 and random.random() < sample_rate)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.is_sampled():
+            return self.get_response(request)
+
+        with timing.time_request() as request_timing:
+            response = self.get_response(request)
+        self.report(request, response, request_timing)
+        return response
+
+    async def __acall__(self, request):
+        if not self.is_sampled():
+            return await self.get_response(request)
+
+        with timing.time_request() as request_timing:
+            response = await self.get_response(request)
+        self.report(request, response, request_timing)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.mark_view_started()
+        return None
+
+    def process_template_response(self, request, response):
+        # Called between the view and the rendering of DRF (template) responses
+        self.mark_view_ended(response)
+        return response
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.mark_view_started()
+        return None
+
+    async def aprocess_template_response(self, request, response):
+        self.mark_view_ended(response)
+        return response
+
+    def mark_view_started(self):
+        """Records when the view of the measured request starts"""
+        request_timing = timing.get_current_timing()
+        if request_timing is not None:
+            request_timing.view_started = time.perf_counter()
+
+    def mark_view_ended(self, response):
+        """Records when the view of the measured request returned and when its response is rendered"""
+        request_timing = timing.get_current_timing()
+        if request_timing is not None:
+            request_timing.view_ended = time.perf_counter()
+            response.add_post_render_callback(request_timing.rendered)
+
+    def report(self, request, response, request_timing):
+        """Adds the Server-Timing header to the response and logs the measures"""
+        if getattr(settings, "REQUEST_TIMING_HEADER", True):
+            response["Server-Timing"] = request_timing.server_timing()
+
+        durations = request_timing.durations()
+        if durations["total"] < getattr(settings, "REQUEST_TIMING_LOG_THRESHOLD_MS", 0) or not timing_logger.isEnabledFor(logging.INFO):
+            return
+        resolver_match = getattr(request, "resolver_match", None)
+        timing_logger.info(
+            "%s %s %s %.2fms (%d queries %.2fms, view %.2fms, render %.2fms)",
+            request.method, request.path, response.status_code, durations["total"],
+            request_timing.queries, durations["db"], durations["view"], durations["render"],
+            extra={
+                "http_method": request.method,
+                "http_path": request.path,
+                "http_status": response.status_code,
+                "url_name": resolver_match.url_name if resolver_match else None,
+                "db_queries": request_timing.queries,
+                "db_ms": round(durations["db"], 3),
+                "view_ms": round(durations["view"], 3),
+                "render_ms": round(durations["render"], 3),
+                "total_ms": round(durations["total"], 3),
+            },
+        )
+
+class NPlusOneMiddleware:
+    """Checks requests for statements run more than NPLUSONE_THRESHOLD times (see core/nplusone.py)
+
+    NPLUSONE_MODE "raise" checks every request and raises NPlusOneError (the test runner turns it
+    on, so the test fails), "log" checks a sample of the requests (NPLUSONE_SAMPLE_RATE) and logs a
+    warning from the "core.nplusone" logger, with the offenders as structured fields. None is off.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def get_mode(self):
+        """Returns the mode the current request is checked in (None when it is not checked)"""
+        mode = getattr(settings, "NPLUSONE_MODE", None)
+        if mode == "log":
+            sample_rate = getattr(settings, "NPLUSONE_SAMPLE_RATE", 0)
+            if sample_rate < 1 and (sample_rate <= 0 or random.random() >= sample_rate):
+                return None
+        return mode
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        mode = self.get_mode()
+        if mode is None:
+            return self.get_response(request)
+
+        with nplusone.detect_queries() as detector:
+            response = self.get_response(request)
+        self.report(request, response, detector, mode)
+        return response
+
+    async def __acall__(self, request):
+        mode = self.get_mode()
+        if mode is None:
+            return await self.get_response(request)
+
+        with nplusone.detect_queries() as detector:
+            response = await self.get_response(request)
+        self.report(request, response, detector, mode)
+        return response
+
+    def report(self, request, response, detector, mode):
+        """Raises or logs the offenders of the request"""
+        offenders = detector.offenders()
+        if not offenders:
+            return
+        resolver_match = getattr(request, "resolver_match", None)
+        view = resolver_match.view_name if resolver_match else request.path
+        if mode == "raise":
+            raise nplusone.NPlusOneError(detector.report(view))
+        nplusone_logger.warning(
+            "N+1 queries in %s %s: %s",
+            request.method, request.path, detector.report(view),
+            extra={
+                "http_method": request.method,
+                "http_path": request.path,
+                "http_status": response.status_code,
+                "url_name": resolver_match.url_name if resolver_match else None,
+                "nplusone_threshold": detector.threshold,
+                "nplusone_offenders": [
+                    {"shape": shape, "count": count, "caller": caller} for shape, count, caller in offenders
+                ],
+            },
+        )
+
+class MetricsMiddleware:
+    """Adds every request to the metrics of its URL name, served at /api/metrics (see core/metrics.py)
+
+    First in MIDDLEWARE, so the latency covers the whole middleware chain. METRICS_ENABLED turns it off.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, "METRICS_ENABLED", True):
+            return self.get_response(request)
+
+        with timing.time_request() as request_timing:
+            response = self.get_response(request)
+        self.record(request, response, request_timing)
+        return response
+
+    async def __acall__(self, request):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            return await self.get_response(request)
+
+        with timing.time_request() as request_timing:
+            response = await self.get_response(request)
+        self.record(request, response, request_timing)
+        return response
+
+    def record(self, request, response, request_timing):
+        """Adds the request to the metrics"""
+        resolver_match = getattr(request, "resolver_match", None)
+        metrics.store.record(
+            resolver_match.view_name if resolver_match else metrics.UNRESOLVED,
+            request.method,
+            response.status_code,
+            request_timing.durations()["total"] / 1000,
+            request_timing.queries,
+            request_timing.cache_hits,
+            request_timing.cache_misses,
+        )
+
+class ProfilingMiddleware:
+    """Profiles the requests of staff users asking for it with ?profile=1 or X-Profile: 1 (see core/profiling.py)
+
+    The profile's URL is returned in the X-Profile-Url header; a request that could not be profiled
+    (rate limited, another profile running) gets an X-Profile-Skipped header instead. Requests of
+    other users are served as if nothing had been asked. PROFILING_ENABLED turns it off.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, "PROFILING_ENABLED", True) or not profiling.is_requested(request):
+            return self.get_response(request)
+        user = profiling.get_staff_user(request)
+        if user is None:
+            return self.get_response(request)
+
+        response, profile_id, skipped = profiling.profile_request(request, user, self.get_response)
+        if profile_id is not None:
+            response["X-Profile-Url"] = request.build_absolute_uri(reverse("profile-details", args=[profile_id]))
+        else:
+            response["X-Profile-Skipped"] = skipped
+        return response
+
+    async def __acall__(self, request):
+        # cProfile and tracemalloc would also measure every other request running on the event loop
+        response = await self.get_response(request)
+        if getattr(settings, "PROFILING_ENABLED", True) and profiling.is_requested(request):
+            response["X-Profile-Skipped"] = "async"
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_delete_mediamodel'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='storiesmodel',
+            index=models.Index(fields=['user', 'created_at', 'story_id'], name='story_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Adds the content hash columns (nullable until they are backfilled)"""
+
+    dependencies = [
+        ('core', '0006_storiesmodel_user_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='peoplesmodel',
+            name='content_hash',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='linksmodel',
+            name='content_hash',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='charactersmodel',
+            name='content_hash',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+    ]
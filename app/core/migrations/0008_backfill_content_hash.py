@@ -0,0 +1,83 @@
+import hashlib
+import unicodedata
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+BATCH_SIZE = 1000
+
+def make_content_hash(*values):
+    """Copy of core.models.make_content_hash as it was when this migration was written
+
+    Kept here so the migration keeps producing these hashes whatever happens to the model code.
+    """
+    normalized_values = (unicodedata.normalize("NFC", str(value)).strip() for value in values)
+    return hashlib.sha256("\x1f".join(normalized_values).encode("utf-8")).hexdigest()
+
+# model, identifying fields, junction model, junction field pointing at the model, other junction field
+CONTENT_HASHED_MODELS = [
+    ("PeoplesModel", ("first_name", "type"), "PeopleIncidentModel", "person", "incident"),
+    ("LinksModel", ("title", "description"), "StoryLinkModel", "link", "story"),
+    ("CharactersModel", ("body_language", "dialog"), "StoryCharactersModel", "character", "story"),
+]
+
+def backfill_hashes(model):
+    """Fills in the content hashes in primary key order, BATCH_SIZE records at a time"""
+    fields = model.hash_fields
+    last_pk = 0
+    while True:
+        batch = list(model.objects.filter(pk__gt=last_pk).order_by("pk")[:BATCH_SIZE])
+        if not batch:
+            return
+        for record in batch:
+            record.content_hash = make_content_hash(*(getattr(record, field) for field in fields))
+        model.objects.bulk_update(batch, ["content_hash"])
+        last_pk = batch[-1].pk
+
+def merge_duplicates(model, junction_model, junction_field, other_field):
+    """Keeps the oldest record of every content hash, moving the junction records of the copies onto it"""
+    duplicate_groups = (
+        model.objects.values("content_hash")
+        .annotate(copies=Count("pk"), keep=Min("pk"))
+        .filter(copies__gt=1)
+        .order_by()
+    )
+    for group in duplicate_groups.iterator():
+        keep = group["keep"]
+        copies = list(
+            model.objects.filter(content_hash=group["content_hash"]).exclude(pk=keep).values_list("pk", flat=True)
+        )
+
+        # Re-point the junction records, dropping the ones that would now be duplicates
+        linked = set(
+            junction_model.objects.filter(**{f"{junction_field}_id": keep}).values_list(f"{other_field}_id", flat=True)
+        )
+        for junction in junction_model.objects.filter(**{f"{junction_field}_id__in": copies}).order_by("pk"):
+            other_id = getattr(junction, f"{other_field}_id")
+            if other_id in linked:
+                junction.delete()
+            else:
+                setattr(junction, f"{junction_field}_id", keep)
+                junction.save(update_fields=[junction_field])
+                linked.add(other_id)
+
+        model.objects.filter(pk__in=copies).delete()
+
+def forwards(apps, schema_editor):
+    for model_name, fields, junction_model_name, junction_field, other_field in CONTENT_HASHED_MODELS:
+        model = apps.get_model("core", model_name)
+        model.hash_fields = fields
+        backfill_hashes(model)
+        merge_duplicates(model, apps.get_model("core", junction_model_name), junction_field, other_field)
+
+
+class Migration(migrations.Migration):
+    """Backfills the content hashes and merges records that turn out to be duplicates"""
+
+    dependencies = [
+        ('core', '0007_add_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Makes the backfilled content hashes required and unique (indexed)"""
+
+    dependencies = [
+        ('core', '0008_backfill_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='peoplesmodel',
+            name='content_hash',
+            field=models.CharField(editable=False, max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='linksmodel',
+            name='content_hash',
+            field=models.CharField(editable=False, max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='charactersmodel',
+            name='content_hash',
+            field=models.CharField(editable=False, max_length=64, unique=True),
+        ),
+    ]
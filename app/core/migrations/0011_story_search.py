@@ -0,0 +1,160 @@
+from django.db import migrations
+
+# The SQL of core/search.py as it was when this migration was written, copied so the migration does
+# not change with that module (python manage.py rebuild_search_index recreates the current one)
+CREATE_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_storysearch USING fts5(story_id UNINDEXED, content, tokenize = 'unicode61 remove_diacritics 2')",
+    "DROP TRIGGER IF EXISTS core_storiesmodel_search_insert",
+    "DROP TRIGGER IF EXISTS core_storiesmodel_search_update",
+    "DROP TRIGGER IF EXISTS core_storiesmodel_search_delete",
+    """CREATE TRIGGER core_storiesmodel_search_insert AFTER INSERT ON core_storiesmodel BEGIN
+        INSERT INTO core_storysearch (rowid, story_id, content) VALUES (NEW.story_id * 8 + 1, NEW.story_id, NEW.title);
+    END""",
+    """CREATE TRIGGER core_storiesmodel_search_update AFTER UPDATE OF title ON core_storiesmodel BEGIN
+        DELETE FROM core_storysearch WHERE rowid = OLD.story_id * 8 + 1;
+        INSERT INTO core_storysearch (rowid, story_id, content) VALUES (NEW.story_id * 8 + 1, NEW.story_id, NEW.title);
+    END""",
+    """CREATE TRIGGER core_storiesmodel_search_delete AFTER DELETE ON core_storiesmodel BEGIN
+        DELETE FROM core_storysearch WHERE rowid = OLD.story_id * 8 + 1;
+    END""",
+    "DROP TRIGGER IF EXISTS core_incidentsmodel_search_insert",
+    "DROP TRIGGER IF EXISTS core_incidentsmodel_search_update",
+    "DROP TRIGGER IF EXISTS core_incidentsmodel_search_delete",
+    """CREATE TRIGGER core_incidentsmodel_search_insert AFTER INSERT ON core_incidentsmodel BEGIN
+        INSERT INTO core_storysearch (rowid, story_id, content) VALUES (NEW.story_id * 8 + 2, NEW.story_id, NEW.incident_what || ' ' || NEW.incident_where);
+    END""",
+    """CREATE TRIGGER core_incidentsmodel_search_update AFTER UPDATE OF incident_what, incident_where ON core_incidentsmodel BEGIN
+        DELETE FROM core_storysearch WHERE rowid = OLD.story_id * 8 + 2;
+        INSERT INTO core_storysearch (rowid, story_id, content) VALUES (NEW.story_id * 8 + 2, NEW.story_id, NEW.incident_what || ' ' || NEW.incident_where);
+    END""",
+    """CREATE TRIGGER core_incidentsmodel_search_delete AFTER DELETE ON core_incidentsmodel BEGIN
+        DELETE FROM core_storysearch WHERE rowid = OLD.story_id * 8 + 2;
+    END""",
+    "DROP TRIGGER IF EXISTS core_vaksmodel_search_insert",
+    "DROP TRIGGER IF EXISTS core_vaksmodel_search_update",
+    "DROP TRIGGER IF EXISTS core_vaksmodel_search_delete",
+    """CREATE TRIGGER core_vaksmodel_search_insert AFTER INSERT ON core_vaksmodel BEGIN
+        INSERT INTO core_storysearch (rowid, story_id, content) VALUES (NEW.vaks_id * 8 + 3, NEW.story_id, NEW.sight || ' ' || NEW.sound || ' ' || NEW.smell || ' ' || NEW.taste || ' ' || NEW.touch || ' ' || NEW.emotion);
+    END""",
+    """CREATE TRIGGER core_vaksmodel_search_update AFTER UPDATE OF story_id, sight, sound, smell, taste, touch, emotion ON core_vaksmodel BEGIN
+        DELETE FROM core_storysearch WHERE rowid = OLD.vaks_id * 8 + 3;
+        INSERT INTO core_storysearch (rowid, story_id, content) VALUES (NEW.vaks_id * 8 + 3, NEW.story_id, NEW.sight || ' ' || NEW.sound || ' ' || NEW.smell || ' ' || NEW.taste || ' ' || NEW.touch || ' ' || NEW.emotion);
+    END""",
+    """CREATE TRIGGER core_vaksmodel_search_delete AFTER DELETE ON core_vaksmodel BEGIN
+        DELETE FROM core_storysearch WHERE rowid = OLD.vaks_id * 8 + 3;
+    END""",
+    "DROP TRIGGER IF EXISTS core_pointsmodel_search_insert",
+    "DROP TRIGGER IF EXISTS core_pointsmodel_search_update",
+    "DROP TRIGGER IF EXISTS core_pointsmodel_search_delete",
+    """CREATE TRIGGER core_pointsmodel_search_insert AFTER INSERT ON core_pointsmodel BEGIN
+        INSERT INTO core_storysearch (rowid, story_id, content) VALUES (NEW.point_id * 8 + 4, NEW.story_id, NEW.content);
+    END""",
+    """CREATE TRIGGER core_pointsmodel_search_update AFTER UPDATE OF story_id, content ON core_pointsmodel BEGIN
+        DELETE FROM core_storysearch WHERE rowid = OLD.point_id * 8 + 4;
+        INSERT INTO core_storysearch (rowid, story_id, content) VALUES (NEW.point_id * 8 + 4, NEW.story_id, NEW.content);
+    END""",
+    """CREATE TRIGGER core_pointsmodel_search_delete AFTER DELETE ON core_pointsmodel BEGIN
+        DELETE FROM core_storysearch WHERE rowid = OLD.point_id * 8 + 4;
+    END""",
+    "DROP TRIGGER IF EXISTS core_scriptsmodel_search_insert",
+    "DROP TRIGGER IF EXISTS core_scriptsmodel_search_update",
+    "DROP TRIGGER IF EXISTS core_scriptsmodel_search_delete",
+    """CREATE TRIGGER core_scriptsmodel_search_insert AFTER INSERT ON core_scriptsmodel BEGIN
+        INSERT INTO core_storysearch (rowid, story_id, content) VALUES (NEW.script_id * 8 + 5, NEW.story_id, NEW.content);
+    END""",
+    """CREATE TRIGGER core_scriptsmodel_search_update AFTER UPDATE OF story_id, content ON core_scriptsmodel BEGIN
+        DELETE FROM core_storysearch WHERE rowid = OLD.script_id * 8 + 5;
+        INSERT INTO core_storysearch (rowid, story_id, content) VALUES (NEW.script_id * 8 + 5, NEW.story_id, NEW.content);
+    END""",
+    """CREATE TRIGGER core_scriptsmodel_search_delete AFTER DELETE ON core_scriptsmodel BEGIN
+        DELETE FROM core_storysearch WHERE rowid = OLD.script_id * 8 + 5;
+    END""",
+    "DROP TRIGGER IF EXISTS core_storycharactersmodel_search_insert",
+    "DROP TRIGGER IF EXISTS core_storycharactersmodel_search_update",
+    "DROP TRIGGER IF EXISTS core_storycharactersmodel_search_delete",
+    """CREATE TRIGGER core_storycharactersmodel_search_insert AFTER INSERT ON core_storycharactersmodel BEGIN
+        INSERT INTO core_storysearch (rowid, story_id, content) VALUES (NEW.id * 8 + 6, NEW.story_id, (SELECT dialog FROM core_charactersmodel WHERE character_id = NEW.character_id));
+    END""",
+    """CREATE TRIGGER core_storycharactersmodel_search_update AFTER UPDATE OF story_id, character_id ON core_storycharactersmodel BEGIN
+        DELETE FROM core_storysearch WHERE rowid = OLD.id * 8 + 6;
+        INSERT INTO core_storysearch (rowid, story_id, content) VALUES (NEW.id * 8 + 6, NEW.story_id, (SELECT dialog FROM core_charactersmodel WHERE character_id = NEW.character_id));
+    END""",
+    """CREATE TRIGGER core_storycharactersmodel_search_delete AFTER DELETE ON core_storycharactersmodel BEGIN
+        DELETE FROM core_storysearch WHERE rowid = OLD.id * 8 + 6;
+    END""",
+    "DROP TRIGGER IF EXISTS core_charactersmodel_search_update",
+    """CREATE TRIGGER core_charactersmodel_search_update AFTER UPDATE OF dialog ON core_charactersmodel BEGIN
+        UPDATE core_storysearch SET content = NEW.dialog
+        WHERE rowid IN (SELECT id * 8 + 6 FROM core_storycharactersmodel WHERE character_id = NEW.character_id);
+    END""",
+]
+
+REBUILD_SQL = [
+    "DELETE FROM core_storysearch",
+    """INSERT INTO core_storysearch (rowid, story_id, content)
+        SELECT story_id * 8 + 1, story_id, title FROM core_storiesmodel""",
+    """INSERT INTO core_storysearch (rowid, story_id, content)
+        SELECT story_id * 8 + 2, story_id, incident_what || ' ' || incident_where FROM core_incidentsmodel""",
+    """INSERT INTO core_storysearch (rowid, story_id, content)
+        SELECT vaks_id * 8 + 3, story_id, core_vaksmodel.sight || ' ' || core_vaksmodel.sound || ' ' || core_vaksmodel.smell || ' ' || core_vaksmodel.taste || ' ' || core_vaksmodel.touch || ' ' || core_vaksmodel.emotion FROM core_vaksmodel""",
+    """INSERT INTO core_storysearch (rowid, story_id, content)
+        SELECT point_id * 8 + 4, story_id, content FROM core_pointsmodel""",
+    """INSERT INTO core_storysearch (rowid, story_id, content)
+        SELECT script_id * 8 + 5, story_id, content FROM core_scriptsmodel""",
+    """INSERT INTO core_storysearch (rowid, story_id, content)
+        SELECT story_character.id * 8 + 6, story_character.story_id, shared_character.dialog
+        FROM core_storycharactersmodel AS story_character
+        INNER JOIN core_charactersmodel AS shared_character ON shared_character.character_id = story_character.character_id""",
+    "INSERT INTO core_storysearch (core_storysearch) VALUES ('optimize')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS core_storiesmodel_search_insert",
+    "DROP TRIGGER IF EXISTS core_storiesmodel_search_update",
+    "DROP TRIGGER IF EXISTS core_storiesmodel_search_delete",
+    "DROP TRIGGER IF EXISTS core_incidentsmodel_search_insert",
+    "DROP TRIGGER IF EXISTS core_incidentsmodel_search_update",
+    "DROP TRIGGER IF EXISTS core_incidentsmodel_search_delete",
+    "DROP TRIGGER IF EXISTS core_vaksmodel_search_insert",
+    "DROP TRIGGER IF EXISTS core_vaksmodel_search_update",
+    "DROP TRIGGER IF EXISTS core_vaksmodel_search_delete",
+    "DROP TRIGGER IF EXISTS core_pointsmodel_search_insert",
+    "DROP TRIGGER IF EXISTS core_pointsmodel_search_update",
+    "DROP TRIGGER IF EXISTS core_pointsmodel_search_delete",
+    "DROP TRIGGER IF EXISTS core_scriptsmodel_search_insert",
+    "DROP TRIGGER IF EXISTS core_scriptsmodel_search_update",
+    "DROP TRIGGER IF EXISTS core_scriptsmodel_search_delete",
+    "DROP TRIGGER IF EXISTS core_storycharactersmodel_search_insert",
+    "DROP TRIGGER IF EXISTS core_storycharactersmodel_search_update",
+    "DROP TRIGGER IF EXISTS core_storycharactersmodel_search_delete",
+    "DROP TRIGGER IF EXISTS core_charactersmodel_search_update",
+    "DROP TABLE IF EXISTS core_storysearch",
+]
+
+def run_sql(schema_editor, statements):
+    """Runs the statements on SQLite only (FTS5), other databases have no search index"""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+def create_search_index(apps, schema_editor):
+    """Creates the FTS5 table and its triggers, then indexes the existing stories"""
+    run_sql(schema_editor, CREATE_SQL + REBUILD_SQL)
+
+def drop_search_index(apps, schema_editor):
+    """Drops the FTS5 table and its triggers"""
+    run_sql(schema_editor, DROP_SQL)
+
+
+class Migration(migrations.Migration):
+    """Adds the full-text search index of the stories"""
+
+    dependencies = [
+        ('core', '0010_add_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Adds the refresh token revocation store (core/revocation.py)"""
+
+    dependencies = [
+        ('core', '0011_story_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedTokensModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True)),
+                ('family', models.CharField(max_length=255)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('revoked_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -1,7 +1,11 @@
 """
 Database models
 """
+import hashlib
+import unicodedata
+
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -82,12 +86,104 @@ class UsersModel(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"{self.email} - {self.get_full_name()}"
 
+def make_content_hash(*values):
+    """Returns the sha256 hex digest identifying a record by its identifying field values
+
+    Values are unicode (NFC) normalized and stripped of surrounding whitespace first, so the same
+    content sent slightly differently maps to the same record.
+    """
+    normalized_values = (unicodedata.normalize("NFC", str(value)).strip() for value in values)
+    return hashlib.sha256("\x1f".join(normalized_values).encode("utf-8")).hexdigest()
+
+class ContentHashedManager(models.Manager):
+    """Manager for records shared between stories and deduplicated by their content hash"""
+
+    def get_or_create_by_content(self, **data):
+        """Returns (record, created) for the data with one indexed lookup on the content hash"""
+        return self.get_or_create(content_hash=self.model.hash_for(data), defaults=data)
+
+class ContentHashedModel(models.Model):
+    """Abstract model for records shared between stories (people, links, characters)
+
+    content_hash is a unique, indexed hash of the hash_fields so finding an existing copy of a
+    record is a single index lookup instead of a scan over its (free text) columns.
+    """
+    content_hash = models.CharField(max_length=64, unique=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Fields identifying a record, set by each model
+    hash_fields = ()
+
+    objects = ContentHashedManager()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def hash_for(cls, data):
+        """Returns the content hash for a dictionary holding the hash_fields"""
+        return make_content_hash(*(data[field] for field in cls.hash_fields))
+
+    @classmethod
+    def from_content(cls, **data):
+        """Builds an unsaved record with its content hash set (for bulk_create, which skips save)"""
+        return cls(content_hash=cls.hash_for(data), **data)
+
+    def save(self, *args, **kwargs):
+        """Keeps the content hash in step with the identifying fields"""
+        self.content_hash = self.hash_for({field: getattr(self, field) for field in self.hash_fields})
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "content_hash"}
+        super().save(*args, **kwargs)
+
+class StoriesQuerySet(models.QuerySet):
+    """Queryset for stories"""
+
+    def touch(self):
+        """Marks the stories as modified now (a single UPDATE, used when one of their children changes)"""
+        return self.update(updated_at=timezone.now())
+
+    def with_children(self):
+        """Loads every story's incident, people, VAKS, points, script, links and characters up front
+
+        Costs a fixed number of queries (one for the stories and incidents, one per child table)
+        however many children each story has.
+        """
+        return self.select_related("incidentsmodel").prefetch_related(
+            models.Prefetch(
+                "incidentsmodel__peopleincidentmodel_set",
+                queryset=PeopleIncidentModel.objects.select_related("person").order_by("person_id"),
+            ),
+            models.Prefetch("vaksmodel_set", queryset=VAKSModel.objects.order_by("vaks_id")),
+            models.Prefetch("pointsmodel_set", queryset=PointsModel.objects.order_by("point_id")),
+            models.Prefetch("scriptsmodel_set", queryset=ScriptsModel.objects.order_by("script_id")),
+            models.Prefetch(
+                "storylinkmodel_set",
+                queryset=StoryLinkModel.objects.select_related("link").order_by("link_id"),
+            ),
+            models.Prefetch(
+                "storycharactersmodel_set",
+                queryset=StoryCharactersModel.objects.select_related("character").order_by("character_id"),
+            ),
+        )
+
 class StoriesModel(models.Model):
     """Database stories model for stories in the system"""
     user = models.ForeignKey(UsersModel, on_delete=models.CASCADE)
     story_id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Also moved forward whenever one of the story's children changes (see core/signals.py)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = StoriesQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Backs the keyset pagination of the stories list (newest first per user)
+            models.Index(fields=["user", "created_at", "story_id"], name="story_user_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.created_at}"
@@ -98,16 +194,19 @@ class IncidentsModel(models.Model):
     incident_what = models.TextField()
     incident_where = models.CharField(max_length=255)
     incident_when = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Incident for {self.story.title} - {self.incident_where}"
 
-class PeoplesModel(models.Model):
+class PeoplesModel(ContentHashedModel):
     """Database people model for people within the incidents for stories (the WHO)"""
     person_id = models.AutoField(primary_key=True)
     first_name = models.CharField(max_length=255)
     type = models.CharField(max_length=255)
 
+    hash_fields = ("first_name", "type")
+
     def __str__(self):
         return f"{self.first_name} - {self.type}"
 
@@ -121,18 +220,21 @@ class VAKSModel(models.Model):
     taste = models.TextField()
     touch = models.TextField()
     emotion = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
 
 class PointsModel(models.Model):
     """Database points model for different points of a story"""
     story = models.ForeignKey(StoriesModel, on_delete=models.CASCADE)
     point_id = models.AutoField(primary_key=True)
     content = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
 
 class ScriptsModel(models.Model):
     """Database scripts model for a story's script"""
     story = models.ForeignKey(StoriesModel, on_delete=models.CASCADE)
     script_id = models.AutoField(primary_key=True)
     content = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
 
 # class MediaModel(models.Model):
 #     """Database media model for a story's media"""
@@ -141,18 +243,22 @@ class ScriptsModel(models.Model):
 #     type = models.CharField(max_length=255)
 #     media_url = models.SlugField()
 
-class LinksModel(models.Model):
+class LinksModel(ContentHashedModel):
     """Database links model for a story's links"""
     link_id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=255)
     description = models.CharField(max_length=255)
 
-class CharactersModel(models.Model):
+    hash_fields = ("title", "description")
+
+class CharactersModel(ContentHashedModel):
     """Database characters model for a story's links"""
     character_id = models.AutoField(primary_key=True)
     body_language = models.CharField(max_length=255)
     dialog = models.TextField()
 
+    hash_fields = ("body_language", "dialog")
+
 # Junction models (they turn what would be many-to-many relationships to 2 x one-to-many relationships)
 class PeopleIncidentModel(models.Model):
     """Database people and incident junction model"""
@@ -172,6 +278,19 @@ class StoryCharactersModel(models.Model):
     story = models.ForeignKey(StoriesModel, on_delete=models.CASCADE)
     character = models.ForeignKey(CharactersModel, on_delete=models.CASCADE)
 
+# Refresh token revocation (see core/revocation.py)
+class RevokedTokensModel(models.Model):
+    """Database model of the revoked refresh tokens, and of the token families revoked after a reuse"""
+    # The token's jti, or "family:<family>" for a whole family
+    jti = models.CharField(max_length=255, unique=True)
+    family = models.CharField(max_length=255)
+    # When the revoked token(s) expire anyway, after which the row can be purged
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.jti} - {self.expires_at}"
+
 """
 Notes for myself:
 -
@@ -0,0 +1,139 @@
+"""
+N+1 query detection: the same statement run again and again, e.g. once per row of a list
+
+Inside detect_queries() every query is normalized to its shape (literals, placeholders and IN lists
+replaced, whitespace collapsed) and counted; a shape run more than the threshold times is an
+offender, reported with the line of the project code that ran it (the first repetition past the
+threshold) and the view of the request. NPlusOneMiddleware (core/middleware.py) checks the requests:
+"raise" mode (turned on by the test runner, core/testing.py) raises NPlusOneError so the test
+fails, "log" mode logs a warning from the "core.nplusone" logger for a sample of the requests.
+Like core/timing.py, the execute wrapper is added to every connection when it is created
+(CoreConfig.ready) and finds the detector of the current request through a context variable.
+"""
+import os
+import re
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Detector of the request (or test block) being checked in the current context
+_current_detector = ContextVar("core_nplusone_detector", default=None)
+
+STRING_LITERAL = re.compile(r"'(?:''|[^'])*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+# Transaction bookkeeping repeated by every atomic block, not by a loop over rows
+IGNORED_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+# Frames of these files (the detector and the middleware wrapping every request) are skipped when
+# looking for the code that ran a query
+SKIPPED_FILES = {
+    os.path.abspath(os.path.join(os.path.dirname(__file__), name))
+    for name in ("nplusone.py", "timing.py", "middleware.py")
+}
+
+class NPlusOneError(Exception):
+    """Raised in "raise" mode when a request runs the same statement more than the threshold times"""
+
+def normalize_sql(sql):
+    """Returns the shape of a statement: its SQL without the values that change between rows"""
+    shape = STRING_LITERAL.sub("?", sql.replace("%s", "?"))
+    shape = NUMBER_LITERAL.sub("?", shape)
+    shape = PLACEHOLDER_LIST.sub("(...)", shape)
+    return WHITESPACE.sub(" ", shape).strip()
+
+def find_caller():
+    """Returns "file:line in function" of the innermost project frame running the query (None if there is none)
+
+    Queries of async views run in a sync_to_async thread, whose stack does not reach the view.
+    """
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base_dir)
+            and "site-packages" not in filename
+            and os.path.abspath(filename) not in SKIPPED_FILES
+        ):
+            return f"{os.path.relpath(filename, base_dir)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+class QueryShapeDetector:
+    """Counts the queries of a request (or test block) by shape and finds the repeated ones"""
+
+    def __init__(self, threshold, parent=None):
+        self.threshold = threshold
+        self.parent = parent
+        self.counts = {}
+        self.callers = {}
+
+    def record(self, sql):
+        """Counts a query here and in the enclosing detectors"""
+        if sql.lstrip().upper().startswith(IGNORED_PREFIXES):
+            return
+        shape = normalize_sql(sql)
+        detector = self
+        while detector is not None:
+            detector.count(shape)
+            detector = detector.parent
+
+    def count(self, shape):
+        """Counts a shape, remembering where it was run from when it first goes past the threshold"""
+        count = self.counts[shape] = self.counts.get(shape, 0) + 1
+        if count == self.threshold + 1:
+            self.callers[shape] = find_caller()
+
+    def offenders(self):
+        """Returns (shape, count, caller) of the shapes run more than the threshold times, most run first"""
+        return sorted(
+            ((shape, count, self.callers.get(shape)) for shape, count in self.counts.items() if count > self.threshold),
+            key=lambda offender: -offender[1],
+        )
+
+    def report(self, view=None):
+        """Describes the offenders"""
+        offenders = self.offenders()
+        lines = [f"{len(offenders)} statement(s) run more than {self.threshold} times" + (f" by {view}" if view else "")]
+        for shape, count, caller in offenders:
+            lines.append(f"  {count}x at {caller or 'unknown line'}: {shape}")
+        return "\n".join(lines)
+
+def get_threshold():
+    """Returns how many runs of one statement shape are allowed"""
+    return getattr(settings, "NPLUSONE_THRESHOLD", 10)
+
+@contextmanager
+def detect_queries(threshold=None):
+    """Counts the queries run inside the block by shape (see QueryShapeDetector), also in the enclosing blocks"""
+    detector = QueryShapeDetector(get_threshold() if threshold is None else threshold, _current_detector.get())
+    token = _current_detector.set(detector)
+    try:
+        yield detector
+    finally:
+        _current_detector.reset(token)
+
+@contextmanager
+def assert_no_n_plus_one(threshold=None):
+    """Raises NPlusOneError when a statement shape is run more than the threshold times inside the block"""
+    with detect_queries(threshold) as detector:
+        yield detector
+    if detector.offenders():
+        raise NPlusOneError(detector.report())
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting the query in the current detector"""
+    detector = _current_detector.get()
+    if detector is not None:
+        detector.record(sql)
+    return execute(sql, params, many, context)
+
+def install_query_detector(sender=None, connection=None, **kwargs):
+    """Adds record_query to a database connection (connection_created receiver)"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,131 @@
+"""
+Pagination classes for the core application
+"""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
+
+class StoryCursorPagination:
+    """Keyset (cursor) pagination over (created_at, story_id), newest stories first
+
+    Each page is fetched with a WHERE clause on the last seen (created_at, story_id) pair
+    instead of an OFFSET, so reading page N costs the same as reading page 1 (it walks the
+    (user, created_at, story_id) index on the stories table).
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = getattr(settings, "STORIES_PAGE_SIZE", 50)
+    max_page_size = getattr(settings, "STORIES_MAX_PAGE_SIZE", 200)
+    invalid_cursor_message = "Invalid cursor❌"
+
+    def paginate_queryset(self, queryset, request):
+        """Returns one page of the queryset (a list) for the cursor in the request"""
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        """Async version of paginate_queryset (for the async views)"""
+        return self.set_page([story async for story in self.get_page_queryset(queryset, request)])
+
+    def get_page_queryset(self, queryset, request):
+        """Returns the queryset of the page's rows (plus one to find out whether there is a next page)"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            reverse, position = self.cursor
+
+        if position is not None:
+            created_at, story_id = position
+            if reverse:
+                queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, story_id__gt=story_id))
+            else:
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, story_id__lt=story_id))
+
+        if reverse:
+            queryset = queryset.order_by("created_at", "story_id")
+        else:
+            queryset = queryset.order_by("-created_at", "-story_id")
+
+        # Fetch one extra row to find out whether there is a page after this one
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        """Trims the fetched rows to the page and works out the next/previous links"""
+        reverse, position = self.cursor if self.cursor is not None else (False, None)
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_query_params(self, request):
+        """Returns the query parameters of a DRF request or a plain Django request"""
+        return getattr(request, "query_params", request.GET)
+
+    def get_page_size(self, request):
+        """Returns the page size asked for by the client, capped at max_page_size"""
+        try:
+            page_size = int(self.get_query_params(request)[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        """Returns the link to the next (older) page or None"""
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(reverse=False, position=self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        """Returns the link to the previous (newer) page or None"""
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(reverse=True, position=self.get_position(self.page[0]))
+
+    def get_position(self, story):
+        """Returns the (created_at, story_id) pair used as the cursor for a story (instance or .values() row)"""
+        if isinstance(story, dict):
+            return story["created_at"], story["story_id"]
+        return story.created_at, story.story_id
+
+    def encode_cursor(self, reverse, position):
+        """Builds an opaque cursor and returns the url pointing at it"""
+        created_at, story_id = position
+        raw = f"{int(reverse)}|{created_at.isoformat()}|{story_id}"
+        cursor = urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """Returns (reverse, (created_at, story_id)) for the cursor in the request or None"""
+        encoded = self.get_query_params(request).get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            raw = urlsafe_b64decode(encoded.encode("ascii")).decode("ascii")
+            reverse, created_at, story_id = raw.split("|")
+            created_at = parse_datetime(created_at)
+            if created_at is None or reverse not in ("0", "1"):
+                raise ValueError
+            return reverse == "1", (created_at, int(story_id))
+        except (BinasciiError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
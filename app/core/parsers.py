@@ -0,0 +1,38 @@
+"""
+Parsers for the core application
+"""
+import codecs
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser, get_encoding
+
+from core.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+
+class ORJSONParser(JSONParser):
+    """JSON parser built on orjson (falls back to DRF's parser without orjson or for non UTF-8 bodies)
+
+    Like DRF's strict parser, NaN and Infinity are rejected.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Parses the request body into Python data"""
+        if orjson is None or codecs.lookup(get_encoding(parser_context or {})).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+class MessagePackParser(BaseParser):
+    """MessagePack parser (Content-Type: application/msgpack)"""
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Parses the request body into Python data"""
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError) as exc:
+            raise ParseError("MessagePack parse error - %s" % str(exc))
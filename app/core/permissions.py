@@ -0,0 +1,16 @@
+"""
+Permissions of the core application
+"""
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from rest_framework.permissions import BasePermission
+
+class HasMetricsToken(BasePermission):
+    """Allows the request when it sends METRICS_TOKEN as a Bearer token (nobody is allowed while it is not set)"""
+    message = "The metrics need the METRICS_TOKEN Bearer token (refused while it is not configured)"
+
+    def has_permission(self, request, view):
+        token = getattr(settings, "METRICS_TOKEN", None)
+        if not token:
+            return False
+        return constant_time_compare(request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}")
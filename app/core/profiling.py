@@ -0,0 +1,150 @@
+"""
+On demand profiling of a request, for staff users
+
+A staff user (UsersModel.is_staff, authenticated by JWT or session) asks for a profile with
+?profile=1 or an "X-Profile: 1" header. ProfilingMiddleware (core/middleware.py) then runs the
+request under cProfile and tracemalloc, stores the profile (functions by cumulative time) and the
+allocation summary (lines that allocated the most memory) in the cache under a random id for
+PROFILING_RESULT_SECONDS, and returns its URL in the X-Profile-Url header; api/profiles/<id>/
+serves it to staff users.
+
+Profiling slows a request down several times, so it is rate limited: PROFILING_RATE_LIMIT
+profiles per user every PROFILING_RATE_WINDOW_SECONDS, and one profile at a time per process
+(tracemalloc traces the whole process). A request that cannot be profiled is served normally
+with an X-Profile-Skipped header giving the reason.
+"""
+import cProfile
+import io
+import pstats
+import secrets
+import threading
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import APIException
+
+from core.authentication import ClaimsJWTAuthentication
+
+jwt_authentication = ClaimsJWTAuthentication()
+
+# One profile at a time in the process
+_profiling_lock = threading.Lock()
+
+def is_requested(request):
+    """Checks whether the request asks to be profiled"""
+    value = request.GET.get("profile") or request.headers.get("X-Profile")
+    return value is not None and value.lower() not in ("", "0", "false", "no")
+
+def get_staff_user(request):
+    """Returns the staff user who sent the request (session or JWT access token), None otherwise"""
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        try:
+            authenticated = jwt_authentication.authenticate(request)
+        except APIException:
+            return None
+        user = authenticated[0] if authenticated else None
+    return user if user is not None and user.is_staff else None
+
+def rate_key(user):
+    """Returns the cache key counting the user's profiles in the current window"""
+    window = getattr(settings, "PROFILING_RATE_WINDOW_SECONDS", 600)
+    return f"core:profile-rate:{user.pk}:{int(time.time() // window)}", window
+
+def take_rate_slot(user):
+    """Counts a profile for the user and checks it is within PROFILING_RATE_LIMIT"""
+    key, window = rate_key(user)
+    cache.add(key, 0, timeout=window)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # The counter expired in between: this is the first profile of a new window
+        cache.set(key, 1, timeout=window)
+        count = 1
+    return count <= getattr(settings, "PROFILING_RATE_LIMIT", 10)
+
+def result_key(profile_id):
+    """Returns the cache key of a stored profile"""
+    return f"core:profile:{profile_id}"
+
+def get_profile(profile_id):
+    """Returns a stored profile (None when it does not exist or has expired)"""
+    return cache.get(result_key(profile_id))
+
+def profile_request(request, user, get_response):
+    """Runs get_response(request) under cProfile and tracemalloc and stores the result
+
+    Returns (response, profile id, None), or (response, None, reason) when it was not profiled.
+    """
+    if not _profiling_lock.acquire(blocking=False):
+        return get_response(request), None, "busy"
+    try:
+        if take_rate_slot(user):
+            response, seconds, profiler, snapshot, peak_memory = run_profiled(request, get_response)
+        else:
+            response = None
+    finally:
+        _profiling_lock.release()
+    if response is None:
+        return get_response(request), None, "rate-limited"
+
+    profile_id = secrets.token_urlsafe(16)
+    cache.set(
+        result_key(profile_id),
+        summarize(request, response, user, seconds, profiler, snapshot, peak_memory),
+        getattr(settings, "PROFILING_RESULT_SECONDS", 3600),
+    )
+    return response, profile_id, None
+
+def run_profiled(request, get_response):
+    """Returns the response, its duration in seconds, the profiler, the memory snapshot and the peak memory"""
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        response = get_response(request)
+    finally:
+        profiler.disable()
+        seconds = time.perf_counter() - started
+        snapshot = tracemalloc.take_snapshot()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+    return response, seconds, profiler, snapshot, peak_memory
+
+def summarize(request, response, user, seconds, profiler, snapshot, peak_memory):
+    """Returns the stored form of a profile"""
+    lines = getattr(settings, "PROFILING_TOP_LINES", 40)
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(lines)
+
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ])
+    allocations = [
+        {"line": str(statistic.traceback), "size_bytes": statistic.size, "count": statistic.count}
+        for statistic in snapshot.statistics("lineno")[:lines]
+    ]
+
+    return {
+        "method": request.method,
+        "path": request.get_full_path(),
+        "status_code": response.status_code,
+        "user_id": user.pk,
+        "created_at": time.time(),
+        "duration_ms": round(seconds * 1000, 3),
+        "function_calls": stats.total_calls,
+        "peak_memory_bytes": peak_memory,
+        "profile": stream.getvalue(),
+        "allocations": allocations,
+    }
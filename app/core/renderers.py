@@ -0,0 +1,119 @@
+"""
+Renderers for the core application
+"""
+from django.utils.http import parse_header_parameters
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional, DRF's renderer is used without it
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional, application/msgpack is only offered with it
+    msgpack = None
+
+# Keys kept by the compact envelope (the stories list's pagination links)
+PAGINATION_KEYS = ("next", "previous")
+
+def wants_compact_envelope(accepted_media_type, renderer_context):
+    """Checks whether the client asked for the compact envelope
+
+    Either with a media type parameter (Accept: application/json; envelope=compact) or with the
+    ?envelope=compact query parameter.
+    """
+    if accepted_media_type:
+        base_media_type, params = parse_header_parameters(accepted_media_type)
+        if params.get("envelope") == "compact":
+            return True
+    request = renderer_context.get("request")
+    return request is not None and request.query_params.get("envelope") == "compact"
+
+def compact_envelope(data, status_code):
+    """Strips the message keys of a response body, leaving the bare data
+
+    The views answer with bodies such as {"Points retrieved successfully✅": [...]}: the entries
+    holding a plain string are messages, the others are the data.
+        * a single data entry is returned bare ([...]), several as a list, none as no body
+        * the stories list keeps its links: {"results": [...], "next": ..., "previous": ...}
+        * errors (4xx/5xx) become {"errors": <details, or the message when there are none>}
+    """
+    if not isinstance(data, dict):
+        return data
+
+    values = [value for key, value in data.items() if key not in PAGINATION_KEYS and not isinstance(value, str)]
+    if status_code >= 400:
+        details = values or [value for value in data.values() if isinstance(value, str)]
+        return {"errors": details[0] if len(details) == 1 else details}
+    if any(key in data for key in PAGINATION_KEYS):
+        return {
+            "results": values[0] if len(values) == 1 else values,
+            **{key: data.get(key) for key in PAGINATION_KEYS},
+        }
+    if not values:
+        return None
+    return values[0] if len(values) == 1 else values
+
+class CompactEnvelopeMixin:
+    """Renders the compact envelope of the response data when the client asks for it"""
+
+    def apply_envelope(self, data, accepted_media_type, renderer_context):
+        """Returns the data to render (compacted for clients asking for the compact envelope)"""
+        renderer_context = renderer_context or {}
+        response = renderer_context.get("response")
+        if response is None or not wants_compact_envelope(accepted_media_type, renderer_context):
+            return data
+        return compact_envelope(data, response.status_code)
+
+class ORJSONRenderer(CompactEnvelopeMixin, JSONRenderer):
+    """JSON renderer built on orjson, with the same output as DRF's JSONRenderer
+
+    orjson encodes dictionaries, lists, strings and numbers natively; datetimes, dates and times
+    are handed back to DRF's encoder (like Decimal and lazy strings) so they keep DRF's format,
+    e.g. "Z" instead of "+00:00". Indented output (?format=api, "application/json; indent=4"),
+    data orjson cannot encode and a missing orjson all fall back to DRF's renderer.
+    """
+    encoder = JSONEncoder()
+
+    if orjson is not None:
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Renders data into JSON bytes"""
+        data = self.apply_envelope(data, accepted_media_type, renderer_context)
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder.default, option=self.options)
+        except orjson.JSONEncodeError:
+            # e.g. integers over 64 bits, which the standard library encodes
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping of \u2028 and \u2029 as DRF (JSON stays a strict javascript subset)
+        if b"\xe2\x80" in ret:
+            ret = ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+        return ret
+
+class MessagePackRenderer(CompactEnvelopeMixin, BaseRenderer):
+    """MessagePack renderer (Accept: application/msgpack or ?format=msgpack)
+
+    Values MessagePack has no type for (datetimes, dates, Decimal, ...) are converted like in
+    JSON, so both formats carry the same data.
+    """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Renders data into MessagePack bytes"""
+        data = self.apply_envelope(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=self.encoder.default, use_bin_type=True, datetime=False)
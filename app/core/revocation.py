@@ -0,0 +1,181 @@
+"""
+Refresh token revocation: an in-memory Bloom filter in front of RevokedTokensModel
+
+Refresh tokens are rotated (ROTATE_REFRESH_TOKENS): a refresh revokes the token it was given and
+returns a new one of the same family (the "family" claim, the jti of the refresh token issued at
+login). A revoked token presented again was copied by someone, so its whole family is revoked and
+the user has to log in again.
+
+Checking a token must not cost more as the table grows. Every process keeps a Bloom filter of the
+revoked keys (a few bits per key, no false negatives): a key the filter has not seen, which is
+nearly every refresh, is accepted without a query, and only a possible match is looked up on
+the unique jti index. The filter takes the rows added since its last sync (increasing ids, SQLite's
+AUTOINCREMENT) at most every REVOCATION_SYNC_SECONDS, and is rebuilt from the unexpired rows every
+REVOCATION_REBUILD_SECONDS or once it holds more keys than it was sized for. Revoking the token
+being rotated is an INSERT on the unique jti, so a token cannot be refreshed twice even between
+syncs; a family revoked in another process is seen within REVOCATION_SYNC_SECONDS.
+
+Only refresh tokens are revoked, access tokens stay valid until they expire. A row is needed until
+the tokens it revokes expire: python manage.py purge_revoked_tokens deletes the expired rows in batches.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from core import models
+
+logger = logging.getLogger("core.revocation")
+
+# Claim holding the refresh token's family, copied by every rotation
+FAMILY_CLAIM = "family"
+
+def family_key(family):
+    """Returns the key revoking a whole family"""
+    return f"family:{family}"
+
+def token_family(token):
+    """Returns the family of a refresh token (its own jti for tokens issued without the claim)"""
+    return token.payload.get(FAMILY_CLAIM) or token[jwt_settings.JTI_CLAIM]
+
+class BloomFilter:
+    """Set of strings in a fixed bit array: no false negatives, about error_rate false positives up to capacity keys"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, key):
+        """Returns the bits of a key (double hashing of one 128 bit digest)"""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + number * second) % self.size for number in range(self.hashes)]
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(key))
+
+class RevocationStore:
+    """Per-process Bloom filter of the revoked keys, backed by RevokedTokensModel"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drops the filter, the next check rebuilds it from the table"""
+        with self.lock:
+            self.bloom = None
+            self.last_id = 0
+            self.synced_at = 0.0
+            self.built_at = 0.0
+
+    def sync(self):
+        """Brings the filter up to date with the table (lock held)"""
+        now = time.monotonic()
+        if (
+            self.bloom is None
+            or self.bloom.count > self.bloom.capacity
+            or now - self.built_at >= getattr(settings, "REVOCATION_REBUILD_SECONDS", 3600)
+        ):
+            rows = models.RevokedTokensModel.objects.filter(expires_at__gt=timezone.now())
+            # Sized for twice the current rows, so it is not rebuilt again right away
+            self.bloom = BloomFilter(
+                max(getattr(settings, "REVOCATION_BLOOM_CAPACITY", 100000), 2 * rows.count()),
+                getattr(settings, "REVOCATION_BLOOM_ERROR_RATE", 0.001),
+            )
+            self.last_id = 0
+            self.built_at = now
+        elif now - self.synced_at < getattr(settings, "REVOCATION_SYNC_SECONDS", 1):
+            return
+        else:
+            rows = models.RevokedTokensModel.objects.filter(id__gt=self.last_id)
+
+        for row_id, jti in rows.values_list("id", "jti").iterator(chunk_size=2000):
+            self.bloom.add(jti)
+            self.last_id = max(self.last_id, row_id)
+        self.synced_at = now
+
+    def revoked(self, jti, family):
+        """Returns "family" when the token's family is revoked, "token" when the token is, None otherwise"""
+        keys = [family_key(family), jti]
+        with self.lock:
+            self.sync()
+            candidates = [key for key in keys if key in self.bloom]
+        if not candidates:
+            return None
+        found = set(models.RevokedTokensModel.objects.filter(jti__in=candidates).values_list("jti", flat=True))
+        if keys[0] in found:
+            return "family"
+        return "token" if jti in found else None
+
+    def add(self, jti, family, expires_at):
+        """Stores a revoked key, returns False when it was already revoked"""
+        try:
+            with transaction.atomic():
+                models.RevokedTokensModel.objects.create(jti=jti, family=family, expires_at=expires_at)
+        except IntegrityError:
+            return False
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+        return True
+
+    def revoke_family(self, family):
+        """Revokes every refresh token of a family (they all expire within REFRESH_TOKEN_LIFETIME)"""
+        self.add(family_key(family), family, timezone.now() + jwt_settings.REFRESH_TOKEN_LIFETIME)
+
+    def purge(self, batch_size=1000):
+        """Deletes the rows of the expired tokens batch_size rows at a time and returns how many were deleted"""
+        now = timezone.now()
+        purged = 0
+        while True:
+            ids = list(
+                models.RevokedTokensModel.objects.filter(expires_at__lte=now).values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return purged
+            purged += models.RevokedTokensModel.objects.filter(id__in=ids).delete()[0]
+
+store = RevocationStore()
+
+def reused(token, family):
+    """Revokes the family of a refresh token presented again after its rotation"""
+    logger.warning(
+        "Refresh token reused, its family is revoked",
+        extra={"token_family": family, "user_id": token.payload.get(jwt_settings.USER_ID_CLAIM)},
+    )
+    store.revoke_family(family)
+
+def check_token(token):
+    """Raises TokenError when the refresh token or its family is revoked"""
+    family = token_family(token)
+    revoked = store.revoked(token[jwt_settings.JTI_CLAIM], family)
+    if revoked == "token":
+        reused(token, family)
+    if revoked is not None:
+        raise TokenError(_("Token is blacklisted"))
+
+def revoke_token(token):
+    """Revokes a refresh token, raises TokenError when it already was (a concurrent reuse)"""
+    family = token_family(token)
+    if not store.add(token[jwt_settings.JTI_CLAIM], family, datetime_from_epoch(token["exp"])):
+        reused(token, family)
+        raise TokenError(_("Token is blacklisted"))
@@ -0,0 +1,105 @@
+"""
+Database routing between the primary ("default") database and its read replicas
+
+Reads made while handling a safe request (GET, HEAD, OPTIONS) go to a replica, everything else
+goes to the primary. A client that has just written reads from the primary for
+DATABASE_REPLICA_STICKY_SECONDS afterwards, so it always sees its own writes even while the
+replicas are behind. The flag is kept in the cache shared by the workers (CACHES in settings.py),
+so the write and the next read can be handled by different workers. ReplicaRoutingMiddleware
+(core/middleware.py) decides per request.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from core.authentication import ClaimsJWTAuthentication
+
+# Whether the reads of the current request (or task) may use a replica
+_replica_reads = ContextVar("core_replica_reads", default=False)
+
+jwt_authentication = ClaimsJWTAuthentication()
+
+def get_replicas():
+    """Returns the aliases of the configured read replicas"""
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+def replica_reads_enabled():
+    """Checks whether reads are currently sent to the replicas"""
+    return _replica_reads.get()
+
+@contextmanager
+def use_replicas(enabled=True):
+    """Sends the reads made inside the block to the replicas (or to the primary if enabled is False)"""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+def get_request_identity(request):
+    """Returns who made the request, without touching the database (None for anonymous requests)
+
+    The user id comes from the JWT access token (its signature is checked, it is not looked up, and
+    DRF's authentication reuses the decoded token); requests without one (e.g. the admin) fall back
+    to their session cookie.
+    """
+    try:
+        validated_token = jwt_authentication.get_request_token(request)
+    except (InvalidToken, TokenError):
+        return None
+    if validated_token is not None:
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        return f"user:{user_id}" if user_id is not None else None
+
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session_key:
+        return f"session:{sha256(session_key.encode('utf-8')).hexdigest()}"
+    return None
+
+def sticky_key(identity):
+    """Returns the cache key flagging a client that has written recently"""
+    return f"core:db-sticky:{identity}"
+
+def mark_sticky(identity):
+    """Sends the client's reads to the primary for the next DATABASE_REPLICA_STICKY_SECONDS"""
+    if identity is not None:
+        cache.set(sticky_key(identity), True, getattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 5))
+
+def is_sticky(identity):
+    """Checks whether the client has written within the sticky window"""
+    return identity is not None and cache.get(sticky_key(identity), False)
+
+class ReplicaRouter:
+    """Routes reads to a random replica when replica_reads_enabled(), everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if not replicas or not replica_reads_enabled():
+            return None
+        # Reads inside a transaction on the primary must see that transaction (e.g. the export snapshot)
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary, they are never migrated themselves
+        if db in get_replicas():
+            return False
+        return None
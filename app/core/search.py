@@ -0,0 +1,210 @@
+"""
+Full-text search over the user's stories (SQLite FTS5)
+
+The core_storysearch virtual table holds one row per searchable record: the story title, the
+incident, the VAKS, every point, the script and every character attached to a story. Its rowid
+is record id * 8 + source, so any record's row is found through the rowid index; SQL triggers
+keep the rows in step with every insert, update and delete, including bulk ones that skip model
+signals.
+
+On SQLite, a migration that remakes one of the indexed tables (e.g. altering a column) drops its
+triggers: after every migrate, restore_triggers() (a post_migrate receiver) rebuilds the index when
+one of them is missing.
+"""
+import html
+
+from django.conf import settings
+from django.db import connection, transaction
+
+SEARCH_TABLE = "core_storysearch"
+
+# Source of a row (rowid % 8)
+SOURCE_TITLE = 1
+SOURCE_INCIDENT = 2
+SOURCE_VAKS = 3
+SOURCE_POINT = 4
+SOURCE_SCRIPT = 5
+SOURCE_CHARACTER = 6
+
+SOURCE_NAMES = {
+    SOURCE_TITLE: "title",
+    SOURCE_INCIDENT: "incident",
+    SOURCE_VAKS: "vaks",
+    SOURCE_POINT: "point",
+    SOURCE_SCRIPT: "script",
+    SOURCE_CHARACTER: "character",
+}
+
+# Marks put around the matches by SQLite (private use characters), swapped for the highlight once the text is escaped
+MATCH_START = "\ue000"
+MATCH_END = "\ue001"
+
+VAKS_CONTENT = "{0}.sight || ' ' || {0}.sound || ' ' || {0}.smell || ' ' || {0}.taste || ' ' || {0}.touch || ' ' || {0}.emotion"
+
+# table, source, id column, content expression (on NEW/OLD), columns whose update changes the row
+INDEXED_TABLES = [
+    ("core_storiesmodel", SOURCE_TITLE, "story_id", "{0}.title", "title"),
+    ("core_incidentsmodel", SOURCE_INCIDENT, "story_id", "{0}.incident_what || ' ' || {0}.incident_where", "incident_what, incident_where"),
+    ("core_vaksmodel", SOURCE_VAKS, "vaks_id", VAKS_CONTENT, "story_id, sight, sound, smell, taste, touch, emotion"),
+    ("core_pointsmodel", SOURCE_POINT, "point_id", "{0}.content", "story_id, content"),
+    ("core_scriptsmodel", SOURCE_SCRIPT, "script_id", "{0}.content", "story_id, content"),
+    (
+        "core_storycharactersmodel", SOURCE_CHARACTER, "id",
+        "(SELECT dialog FROM core_charactersmodel WHERE character_id = {0}.character_id)",
+        "story_id, character_id",
+    ),
+]
+
+def trigger_sql(table, source, id_column, content, update_columns):
+    """Returns the statements (re)creating the insert, update and delete triggers of a table"""
+    insert_row = (
+        f"INSERT INTO {SEARCH_TABLE} (rowid, story_id, content) "
+        f"VALUES (NEW.{id_column} * 8 + {source}, NEW.story_id, {content.format('NEW')});"
+    )
+    delete_row = f"DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.{id_column} * 8 + {source};"
+    return [
+        f"DROP TRIGGER IF EXISTS {table}_search_insert",
+        f"DROP TRIGGER IF EXISTS {table}_search_update",
+        f"DROP TRIGGER IF EXISTS {table}_search_delete",
+        f"CREATE TRIGGER {table}_search_insert AFTER INSERT ON {table} BEGIN {insert_row} END",
+        f"CREATE TRIGGER {table}_search_update AFTER UPDATE OF {update_columns} ON {table} BEGIN {delete_row} {insert_row} END",
+        f"CREATE TRIGGER {table}_search_delete AFTER DELETE ON {table} BEGIN {delete_row} END",
+    ]
+
+CREATE_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(story_id UNINDEXED, content, tokenize = 'unicode61 remove_diacritics 2')",
+    *(sql for table in INDEXED_TABLES for sql in trigger_sql(*table)),
+    # A character is shared between stories: its rows are refreshed for every story it is attached to
+    "DROP TRIGGER IF EXISTS core_charactersmodel_search_update",
+    f"""CREATE TRIGGER core_charactersmodel_search_update AFTER UPDATE OF dialog ON core_charactersmodel BEGIN
+        UPDATE {SEARCH_TABLE} SET content = NEW.dialog
+        WHERE rowid IN (SELECT id * 8 + {SOURCE_CHARACTER} FROM core_storycharactersmodel WHERE character_id = NEW.character_id);
+    END""",
+]
+
+TRIGGER_NAMES = [
+    *(f"{table}_search_{action}" for table, *_ in INDEXED_TABLES for action in ("insert", "update", "delete")),
+    "core_charactersmodel_search_update",
+]
+
+DROP_SQL = [
+    *(f"DROP TRIGGER IF EXISTS {name}" for name in TRIGGER_NAMES),
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+]
+
+# Fills the index from the tables
+REBUILD_SQL = [
+    f"DELETE FROM {SEARCH_TABLE}",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, story_id, content)
+        SELECT story_id * 8 + {SOURCE_TITLE}, story_id, title FROM core_storiesmodel""",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, story_id, content)
+        SELECT story_id * 8 + {SOURCE_INCIDENT}, story_id, incident_what || ' ' || incident_where FROM core_incidentsmodel""",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, story_id, content)
+        SELECT vaks_id * 8 + {SOURCE_VAKS}, story_id, {VAKS_CONTENT.format("core_vaksmodel")} FROM core_vaksmodel""",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, story_id, content)
+        SELECT point_id * 8 + {SOURCE_POINT}, story_id, content FROM core_pointsmodel""",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, story_id, content)
+        SELECT script_id * 8 + {SOURCE_SCRIPT}, story_id, content FROM core_scriptsmodel""",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, story_id, content)
+        SELECT story_character.id * 8 + {SOURCE_CHARACTER}, story_character.story_id, shared_character.dialog
+        FROM core_storycharactersmodel AS story_character
+        INNER JOIN core_charactersmodel AS shared_character ON shared_character.character_id = story_character.character_id""",
+    f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')",
+]
+
+SEARCH_SQL = f"""
+    SELECT {SEARCH_TABLE}.rowid, {SEARCH_TABLE}.story_id, story.title,
+           snippet({SEARCH_TABLE}, 1, %s, %s, '…', %s), bm25({SEARCH_TABLE}) AS rank
+    FROM {SEARCH_TABLE}
+    INNER JOIN core_storiesmodel AS story ON story.story_id = {SEARCH_TABLE}.story_id
+    WHERE {SEARCH_TABLE} MATCH %s AND story.user_id = %s
+    ORDER BY rank
+    LIMIT %s
+"""
+
+def is_available(using=connection):
+    """Full-text search needs SQLite (FTS5)"""
+    return using.vendor == "sqlite"
+
+def rebuild_index(using=connection):
+    """Creates the index and its triggers if they are missing, then fills it again from the tables
+
+    Runs in one transaction, so searches keep seeing the old index until the new one is complete.
+    """
+    with transaction.atomic(using=using.alias), using.cursor() as cursor:
+        for sql in CREATE_SQL + REBUILD_SQL:
+            cursor.execute(sql)
+
+def restore_triggers(using=connection):
+    """Rebuilds the index if some of its triggers are missing, returns whether it did
+
+    The rows changed while a trigger was missing were not indexed, so the whole index is filled
+    again, not only the triggers. Does nothing when the index itself does not exist (its migration
+    is not applied).
+    """
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s OR type = 'trigger'", [SEARCH_TABLE],
+        )
+        names = {name for (name,) in cursor.fetchall()}
+    if SEARCH_TABLE not in names or names.issuperset(TRIGGER_NAMES):
+        return False
+    rebuild_index(using)
+    return True
+
+def drop_index(using=connection):
+    """Drops the index and its triggers"""
+    with transaction.atomic(using=using.alias), using.cursor() as cursor:
+        for sql in DROP_SQL:
+            cursor.execute(sql)
+
+def build_match_query(text):
+    """Turns free text into an FTS5 query matching every word (the last one as a prefix)
+
+    Each word is quoted, so FTS5 operators and punctuation typed by the user are searched for
+    literally instead of being parsed.
+    """
+    words = [word.replace('"', '""') for word in text.split()]
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+def highlight(snippet, highlight_start, highlight_end):
+    """Returns the snippet as HTML: the user's text escaped, the matches wrapped in the highlight"""
+    return (
+        html.escape(snippet)
+        .replace(MATCH_START, highlight_start)
+        .replace(MATCH_END, highlight_end)
+    )
+
+def search_stories(user, text, limit):
+    """Returns the user's stories matching the text, best match first, with highlighted snippets"""
+    match_query = build_match_query(text)
+    if match_query is None:
+        return []
+
+    highlight_start, highlight_end = getattr(settings, "STORY_SEARCH_HIGHLIGHT", ("<mark>", "</mark>"))
+    snippet_tokens = getattr(settings, "STORY_SEARCH_SNIPPET_TOKENS", 12)
+    max_matches = getattr(settings, "STORY_SEARCH_MAX_MATCHES", 500)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SEARCH_SQL,
+            [MATCH_START, MATCH_END, snippet_tokens, match_query, user.pk, max_matches],
+        )
+        rows = cursor.fetchall()
+
+    # Rows come best first, so the first row of a story gives its rank
+    results = {}
+    for rowid, story_id, title, snippet, rank in rows:
+        if story_id not in results:
+            if len(results) == limit:
+                continue
+            results[story_id] = {"story_id": story_id, "title": title, "rank": rank, "matches": []}
+        results[story_id]["matches"].append({
+            "source": SOURCE_NAMES[rowid % 8],
+            "snippet": highlight(snippet, highlight_start, highlight_end),
+        })
+    return list(results.values())
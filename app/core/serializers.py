@@ -3,9 +3,28 @@ Contains all serializers for the core application
 """
 from rest_framework import serializers
 from core import models
+from core.signals import stories_changed
 from django.contrib.auth import authenticate
+from django.utils import timezone
+from django.utils.functional import cached_property
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.authtoken.models import Token
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from core.authentication import ClaimsRefreshToken, add_user_claims
+from core.revocation import FAMILY_CLAIM
+
+def validate_unique_content(serializer, model_class, data):
+    """Rejects updates of a shared record that would give it the same content as another record"""
+    if serializer.instance is None:
+        return data
+
+    content = {field: data.get(field, getattr(serializer.instance, field)) for field in model_class.hash_fields}
+    duplicate = model_class.objects.filter(content_hash=model_class.hash_for(content)).exclude(pk=serializer.instance.pk)
+    if duplicate.exists():
+        raise serializers.ValidationError("A record with the same details already exists❌")
+    return data
 
 # User model serializers
 class RegisterUserSerializer(serializers.ModelSerializer):
@@ -87,6 +106,46 @@ class UserProfileSerializer(serializers.Serializer):
 
         return instance
 
+# Token serializers (JWT login and refresh)
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login issuing tokens that carry the user claims, so requests are authenticated without a query"""
+    token_class = ClaimsRefreshToken
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Token refresh giving the new tokens the user's current claims (e.g. is_staff after a change)
+
+    With ROTATE_REFRESH_TOKENS and BLACKLIST_AFTER_ROTATION the given token is revoked, and presenting
+    it again revokes its whole family (core/revocation.py).
+    """
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        """TokenRefreshSerializer.validate with one user query and one signature check
+
+        The new tokens take the claims of the user loaded for the activity check, so the given token
+        is not signed again and passed to super().validate, which would verify it and load the user again.
+        """
+        refresh = self.token_class(attrs["refresh"])
+        user = get_user_model()._default_manager.filter(
+            **{jwt_settings.USER_ID_FIELD: refresh.payload.get(jwt_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+        # Tokens issued before the families start their own
+        refresh.payload.setdefault(FAMILY_CLAIM, refresh[jwt_settings.JTI_CLAIM])
+        add_user_claims(refresh, user)
+
+        data = {"access": str(refresh.access_token)}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data["refresh"] = str(refresh)
+        return data
+
 # Stories serializers
 class StorySerializer(serializers.Serializer):
     """Serializer for stories model"""
@@ -135,12 +194,72 @@ class IncidentsSerializer(serializers.Serializer):
         instance.save()
         return instance
 
+class PeopleListSerializer(serializers.ListSerializer):
+    """List serializer to add many people to an incident at once"""
+
+    def create(self, validated_data):
+        """Attaches the people to the incident, creating the ones that do not exist yet
+
+        Existing people are resolved with one IN query on their content hash, missing people are
+        inserted with one bulk INSERT and the junction records with another (people already
+        linked are skipped). The people newly linked to the incident are kept in self.linked_people.
+        """
+        incident = self.context.get("incident")
+
+        if not incident:
+            raise serializers.ValidationError({"incident": "Incident must be provided to add people to❌"})
+
+        # The same person may be sent more than once in a batch
+        people_data = {}
+        for person_data in validated_data:
+            people_data.setdefault(models.PeoplesModel.hash_for(person_data), person_data)
+
+        # Resolve the people that already exist with one indexed IN lookup on their content hash
+        people = models.PeoplesModel.objects.in_bulk(people_data, field_name="content_hash")
+
+        # Insert the missing people (ON CONFLICT so a concurrent insert of the same person is reused)
+        missing_people = [
+            models.PeoplesModel.from_content(**person_data)
+            for content_hash, person_data in people_data.items()
+            if content_hash not in people
+        ]
+        created_people = models.PeoplesModel.objects.bulk_create(
+            missing_people,
+            update_conflicts=True,
+            unique_fields=["content_hash"],
+            update_fields=["content_hash"],
+        )
+        for person in created_people:
+            people[person.content_hash] = person
+
+        # Link everyone to the incident, skipping links that already exist
+        people = [people[key] for key in people_data]
+        already_linked = set(
+            models.PeopleIncidentModel.objects.filter(incident=incident, person__in=people).values_list("person_id", flat=True)
+        )
+        self.linked_people = [person for person in people if person.person_id not in already_linked]
+        models.PeopleIncidentModel.objects.bulk_create(
+            [models.PeopleIncidentModel(person=person, incident=incident) for person in self.linked_people],
+            ignore_conflicts=True,
+        )
+
+        # Bulk inserts do not send model signals, so the story is marked as changed here
+        stories_changed([incident.story_id])
+        return people
+
 class PeopleSerializer(serializers.Serializer):
     """Serializer for peoples model"""
     person_id = serializers.IntegerField(read_only=True)
     first_name = serializers.CharField(max_length=255)
     type = serializers.CharField(max_length=255)
 
+    class Meta:
+        list_serializer_class = PeopleListSerializer
+
+    def validate(self, data):
+        """Ensure an update does not turn the person into a copy of another person"""
+        return validate_unique_content(self, models.PeoplesModel, data)
+
     def create(self, validated_data):
         """Function to create an object within the model"""
         return models.PeoplesModel.objects.create(**validated_data)
@@ -188,12 +307,48 @@ class VAKSSerializer(serializers.Serializer):
         instance.save()
         return instance
 
+class PointsListSerializer(serializers.ListSerializer):
+    """List serializer to create and update many points of a story at once"""
+
+    def create(self, validated_data):
+        """Creates all points with a single bulk INSERT"""
+        story = self.context.get("story")
+
+        if not story:
+            raise serializers.ValidationError({"Story": "Story must be provided to save the points to❌"})
+        points = models.PointsModel.objects.bulk_create(
+            [models.PointsModel(story=story, **point_data) for point_data in validated_data]
+        )
+
+        # Bulk inserts do not send model signals, so the story is marked as changed here
+        stories_changed([story.story_id])
+        return points
+
+    def update(self, instance, validated_data):
+        """Updates the points (instance) with a single bulk UPDATE, matching them by point_id"""
+        points = {point.point_id: point for point in instance}
+        now = timezone.now()
+        for point_data in validated_data:
+            point = points[point_data["point_id"]]
+            point.content = point_data.get("content", point.content)
+            # bulk_update does not apply auto_now
+            point.updated_at = now
+
+        models.PointsModel.objects.bulk_update(points.values(), ["content", "updated_at"])
+
+        # Bulk updates do not send model signals, so the stories are marked as changed here
+        stories_changed(point.story_id for point in points.values())
+        return list(points.values())
+
 class PointsSerializer(serializers.Serializer):
     """Serializer for Points model"""
     story = serializers.PrimaryKeyRelatedField(read_only=True)
     point_id = serializers.IntegerField(read_only=True)
     content = serializers.CharField()
 
+    class Meta:
+        list_serializer_class = PointsListSerializer
+
     def create(self, validated_data):
         """Function to create an object within the model"""
         story = self.context.get("story")
@@ -209,6 +364,15 @@ class PointsSerializer(serializers.Serializer):
         instance.save()
         return instance
 
+class PointUpdateSerializer(PointsSerializer):
+    """Serializer for one item of a bulk points update (the point is picked by its point_id, its content is optional)"""
+    point_id = serializers.IntegerField()
+    content = serializers.CharField(required=False)
+
+class PointIdsSerializer(serializers.Serializer):
+    """Serializer for the list of points to delete in a bulk points delete"""
+    point_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
 class ScriptsSerializer(serializers.Serializer):
     """Serializer for script model"""
     story = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -255,6 +419,10 @@ class LinksSerializer(serializers.Serializer):
     title = serializers.CharField(max_length=255)
     description = serializers.CharField(max_length=255)
 
+    def validate(self, data):
+        """Ensure an update does not turn the link into a copy of another link"""
+        return validate_unique_content(self, models.LinksModel, data)
+
     def create(self, validated_data):
         """Function to create an object within the model"""
         return models.LinksModel.objects.create(**validated_data)
@@ -273,6 +441,10 @@ class CharactersSerializer(serializers.Serializer):
     body_language = serializers.CharField(max_length=255)
     dialog = serializers.CharField()
 
+    def validate(self, data):
+        """Ensure an update does not turn the character into a copy of another character"""
+        return validate_unique_content(self, models.CharactersModel, data)
+
     def create(self, validated_data):
         """Function to create object within the model"""
         return models.CharactersModel.objects.create(**validated_data)
@@ -285,6 +457,121 @@ class CharactersSerializer(serializers.Serializer):
         instance.save()
         return instance
 
+class FullStorySerializer(StorySerializer):
+    """Read only serializer for a story with everything that belongs to it
+
+    Expects a story loaded with StoriesModel.objects.with_children() so that no extra
+    queries are made while serializing.
+    """
+    incident = IncidentsSerializer(source="incidentsmodel", read_only=True)
+    people = serializers.SerializerMethodField()
+    vaks = serializers.SerializerMethodField()
+    points = serializers.SerializerMethodField()
+    script = serializers.SerializerMethodField()
+    links = serializers.SerializerMethodField()
+    characters = serializers.SerializerMethodField()
+
+    def get_people(self, story):
+        """People involved in the story's incident"""
+        try:
+            incident = story.incidentsmodel
+        except models.IncidentsModel.DoesNotExist:
+            return []
+        people = [people_incident.person for people_incident in incident.peopleincidentmodel_set.all()]
+        return PeopleSerializer(people, many=True).data
+
+    def get_vaks(self, story):
+        """The story's VAKS (a story has at most one)"""
+        vaks = next(iter(story.vaksmodel_set.all()), None)
+        return VAKSSerializer(vaks).data if vaks else None
+
+    def get_points(self, story):
+        """The story's points"""
+        return PointsSerializer(story.pointsmodel_set.all(), many=True).data
+
+    def get_script(self, story):
+        """The story's script (a story has at most one)"""
+        script = next(iter(story.scriptsmodel_set.all()), None)
+        return ScriptsSerializer(script).data if script else None
+
+    def get_links(self, story):
+        """Links attached to the story"""
+        links = [story_link.link for story_link in story.storylinkmodel_set.all()]
+        return LinksSerializer(links, many=True).data
+
+    def get_characters(self, story):
+        """Characters attached to the story"""
+        characters = [story_character.character for story_character in story.storycharactersmodel_set.all()]
+        return CharactersSerializer(characters, many=True).data
+
+# Fast read path
+class ValuesSerializer:
+    """Serializes .values() rows into the same dictionaries as a read only use of a Serializer
+
+    Building a model instance per row and running every field's to_representation is most of
+    the cost of the list endpoints. Instead the queryset is asked for exactly the serializer's
+    columns as dictionaries, and only the fields whose output differs from the database value
+    (e.g. DateTimeField) are converted. Keys come out in the serializer's field order, so the
+    rendered JSON is byte for byte the same as serializer_class(instances, many=True).data.
+    """
+    # Fields whose representation of a database value is the value itself
+    passthrough_fields = (serializers.CharField, serializers.IntegerField, serializers.PrimaryKeyRelatedField)
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def fields(self):
+        """The serializer's readable fields"""
+        return [field for field in self.serializer_class().fields.values() if not field.write_only]
+
+    @cached_property
+    def columns(self):
+        """The .values() arguments, in the serializer's field order"""
+        return [field.source.replace(".", "__") for field in self.fields]
+
+    @cached_property
+    def renamed(self):
+        """Whether some fields are serialized under another name than their column"""
+        return [field.field_name for field in self.fields] != self.columns
+
+    @cached_property
+    def converters(self):
+        """(key, to_representation) of the fields that need converting"""
+        return [
+            (field.field_name, field.to_representation)
+            for field in self.fields
+            if not isinstance(field, self.passthrough_fields)
+        ]
+
+    def values(self, queryset):
+        """Returns the queryset as .values() rows holding the serializer's columns"""
+        return queryset.values(*self.columns)
+
+    def to_representation(self, row):
+        """Turns one .values() row into the serializer's output"""
+        # A new dictionary, the row may still be needed as it is (e.g. for a pagination cursor)
+        if self.renamed:
+            row = {field.field_name: row[column] for field, column in zip(self.fields, self.columns)}
+        else:
+            row = dict(row)
+        for key, to_representation in self.converters:
+            if row[key] is not None:
+                row[key] = to_representation(row[key])
+        return row
+
+    def serialize(self, rows):
+        """Turns .values() rows into the serializer's output"""
+        if not self.renamed and not self.converters:
+            return list(rows)
+        return [self.to_representation(row) for row in rows]
+
+story_rows = ValuesSerializer(StorySerializer)
+people_rows = ValuesSerializer(PeopleSerializer)
+points_rows = ValuesSerializer(PointsSerializer)
+links_rows = ValuesSerializer(LinksSerializer)
+characters_rows = ValuesSerializer(CharactersSerializer)
+
 # Junction models serializers
 class PeopleIncidentSerializer(serializers.Serializer):
     """Serializer for the people and incident junction model"""
@@ -0,0 +1,84 @@
+"""
+Signal receivers for the core application
+"""
+from django.db import connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import models, search
+from core.authentication import user_cache
+from core.cache import bump_story_version, bump_story_versions
+
+# Models whose rows belong to exactly one story (the story itself, its children and the junction records)
+STORY_SCOPED_MODELS = (
+    models.StoriesModel,
+    models.IncidentsModel,
+    models.VAKSModel,
+    models.PointsModel,
+    models.ScriptsModel,
+    models.PeopleIncidentModel,
+    models.StoryLinkModel,
+    models.StoryCharactersModel,
+)
+
+def get_story_id(instance):
+    """Returns the id of the story a story scoped record belongs to"""
+    if isinstance(instance, models.PeopleIncidentModel):
+        # The incident's primary key is its story's id
+        return instance.incident_id
+    return instance.story_id
+
+def stories_changed(story_ids):
+    """Moves the stories' updated_at forward and invalidates their cached responses"""
+    story_ids = set(story_ids)
+    if story_ids:
+        models.StoriesModel.objects.filter(story_id__in=story_ids).touch()
+        bump_story_versions(story_ids)
+
+def invalidate_story_responses(sender, instance, **kwargs):
+    """Marks the story a record belongs to as changed"""
+    if sender is models.StoriesModel:
+        # The story's own updated_at is kept by auto_now
+        bump_story_version(instance.story_id)
+    else:
+        stories_changed([get_story_id(instance)])
+
+for model in STORY_SCOPED_MODELS:
+    post_save.connect(invalidate_story_responses, sender=model)
+    post_delete.connect(invalidate_story_responses, sender=model)
+
+@receiver([post_save, post_delete], sender=models.PeoplesModel)
+def invalidate_person_stories(sender, instance, **kwargs):
+    """People are shared between incidents, so every story they appear in is invalidated"""
+    stories_changed(
+        models.PeopleIncidentModel.objects.filter(person_id=instance.person_id).values_list("incident_id", flat=True)
+    )
+
+@receiver([post_save, post_delete], sender=models.LinksModel)
+def invalidate_link_stories(sender, instance, **kwargs):
+    """Links are shared between stories, so every story they appear in is invalidated"""
+    stories_changed(
+        models.StoryLinkModel.objects.filter(link_id=instance.link_id).values_list("story_id", flat=True)
+    )
+
+@receiver([post_save, post_delete], sender=models.CharactersModel)
+def invalidate_character_stories(sender, instance, **kwargs):
+    """Characters are shared between stories, so every story they appear in is invalidated"""
+    stories_changed(
+        models.StoryCharactersModel.objects.filter(character_id=instance.character_id).values_list("story_id", flat=True)
+    )
+
+@receiver([post_save, post_delete], sender=models.UsersModel)
+def invalidate_cached_user(sender, instance, signal, **kwargs):
+    """Drops a changed user from the per-process user cache, and disables the claims of a deleted or inactive one (core/authentication.py)"""
+    user_cache.invalidate(instance.pk)
+    if signal is post_delete or not instance.is_active:
+        user_cache.disable(instance.pk)
+    else:
+        user_cache.enable(instance.pk)
+
+def restore_search_triggers(sender, using, **kwargs):
+    """Puts back the search triggers a migration remaking an indexed table dropped (connected in apps.py)"""
+    connection = connections[using]
+    if search.is_available(connection):
+        search.restore_triggers(connection)
@@ -0,0 +1,59 @@
+"""
+Test runner of the project (TEST_RUNNER in settings.py)
+"""
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from core import metrics
+
+def create_user(email, is_staff=False):
+    """Creates a user for the tests"""
+    user = get_user_model().objects.create_user(
+        email=email,
+        first_name="TestFirstname",
+        last_name="TestLastname",
+        date_of_birth="2003-10-18",
+        city="london",
+        password="Testpass123",
+    )
+    if is_staff:
+        user.is_staff = True
+        user.save()
+    return user
+
+class CoreTestRunner(DiscoverRunner):
+    """Runs the tests with the N+1 query check in "raise" mode, and the metrics files and the cache in temporary directories
+
+    In "raise" mode a request repeating a statement fails its test; the test data is small, so the
+    check uses NPLUSONE_TEST_THRESHOLD instead of the production threshold.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.saved_settings = (settings.NPLUSONE_MODE, settings.NPLUSONE_THRESHOLD, settings.METRICS_DIRECTORY)
+        self.metrics_directory = tempfile.mkdtemp(prefix="test-metrics-")
+        settings.NPLUSONE_MODE = "raise"
+        settings.NPLUSONE_THRESHOLD = getattr(settings, "NPLUSONE_TEST_THRESHOLD", 3)
+        settings.METRICS_DIRECTORY = self.metrics_directory
+        self.cache_directory = tempfile.mkdtemp(prefix="test-cache-")
+        self.cache_settings = override_settings(CACHES={
+            "default":{
+                "BACKEND":"django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION":self.cache_directory,
+            },
+        })
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        # The counters of the test requests must not be written to the real directory at exit
+        metrics.store.reset()
+        settings.NPLUSONE_MODE, settings.NPLUSONE_THRESHOLD, settings.METRICS_DIRECTORY = self.saved_settings
+        shutil.rmtree(self.metrics_directory, ignore_errors=True)
+        self.cache_settings.disable()
+        shutil.rmtree(self.cache_directory, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
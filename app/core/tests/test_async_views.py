@@ -0,0 +1,192 @@
+"""
+This file tests the async read endpoints return the same responses as the synchronous ones
+"""
+import json
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.test import AsyncClient, Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import models
+from core.renderers import msgpack
+from core.testing import create_user
+
+class ValidScenariosAsyncViewsTests(TestCase):
+    """This class is built to compare the async read endpoints with the synchronous ones"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("async@example.com")
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.client = Client()
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+        incident = models.IncidentsModel.objects.create(
+            story=self.story,
+            incident_what="Test what",
+            incident_where="Test where",
+            incident_when=timezone.now(),
+        )
+        self.person = models.PeoplesModel.objects.create(first_name="Async person", type="friend")
+        models.PeopleIncidentModel.objects.create(person=self.person, incident=incident)
+        models.VAKSModel.objects.create(story=self.story, sight="a", sound="b", smell="c", taste="d", touch="e", emotion="f")
+        self.point = models.PointsModel.objects.create(story=self.story, content="Test point")
+        models.ScriptsModel.objects.create(story=self.story, content="Test script")
+        self.link = models.LinksModel.objects.create(title="Async link", description="Test link")
+        models.StoryLinkModel.objects.create(story=self.story, link=self.link)
+        self.character = models.CharactersModel.objects.create(body_language="calm", dialog="Async line")
+        models.StoryCharactersModel.objects.create(story=self.story, character=self.character)
+
+    def url_pairs(self, story_id):
+        """Returns (synchronous url, async url) for every read endpoint"""
+        detail_args = {
+            "story-people-details": [story_id, self.person.person_id],
+            "story-point-details": [story_id, self.point.point_id],
+            "story-link-details": [story_id, self.link.link_id],
+            "story-character-details": [story_id, self.character.character_id],
+        }
+        names = [
+            "story-details", "story-full", "story-incident", "story-people", "story-vaks", "story-points",
+            "story-script", "story-links", "story-characters", *detail_args,
+        ]
+        pairs = [(reverse("stories"), reverse("async-stories"))]
+        for name in names:
+            args = detail_args.get(name, [story_id])
+            pairs.append((reverse(name, args=args), reverse(f"async-{name}", args=args)))
+        return pairs
+
+    def test_async_responses_match_sync_responses(self):
+        """Test every async endpoint returns the same status and body as its synchronous version"""
+        for sync_url, async_url in self.url_pairs(self.story.story_id):
+            # Act
+            sync_response = self.client.get(sync_url, **self.headers)
+            async_response = self.client.get(async_url, **self.headers)
+
+            # Assert
+            with self.subTest(url=async_url):
+                self.assertEqual(async_response.status_code, 200)
+                self.assertEqual(async_response.status_code, sync_response.status_code)
+                self.assertEqual(json.loads(async_response.content), json.loads(sync_response.content))
+
+    def test_compact_envelope_matches_sync_response(self):
+        """Test the async endpoints apply the compact envelope like the synchronous ones"""
+        for sync_url, async_url in self.url_pairs(self.story.story_id):
+            # Act
+            sync_response = self.client.get(sync_url, {"envelope": "compact"}, **self.headers)
+            async_response = self.client.get(async_url, {"envelope": "compact"}, **self.headers)
+
+            # Assert
+            with self.subTest(url=async_url):
+                self.assertEqual(json.loads(async_response.content), json.loads(sync_response.content))
+
+    @skipUnless(msgpack, "msgpack is not installed")
+    def test_msgpack_matches_sync_response(self):
+        """Test the async endpoints answer MessagePack with the same bytes as the synchronous ones"""
+        for sync_url, async_url in self.url_pairs(self.story.story_id):
+            # Act
+            sync_response = self.client.get(sync_url, HTTP_ACCEPT="application/msgpack", **self.headers)
+            async_response = self.client.get(async_url, HTTP_ACCEPT="application/msgpack", **self.headers)
+
+            # Assert
+            with self.subTest(url=async_url):
+                self.assertEqual(async_response["Content-Type"], sync_response["Content-Type"])
+                self.assertEqual(async_response.content, sync_response.content)
+
+    def test_current_etag_is_not_modified(self):
+        """Test an async story resource has an ETag and answers 304 to it"""
+        # Arrange
+        url = reverse("async-story-points", args=[self.story.story_id])
+        etag = self.client.get(url, **self.headers)["ETag"]
+
+        # Act
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.headers)
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_repeated_request_is_served_from_the_cache(self):
+        """Test an async story resource is cached, and a write invalidates it"""
+        # Arrange
+        url = reverse("async-story-points", args=[self.story.story_id])
+        self.client.get(url, **self.headers)
+
+        # Act
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, **self.headers)
+        self.client.post(
+            reverse("story-points", args=[self.story.story_id]), {"content": "New point"}, **self.headers,
+        )
+        changed = self.client.get(url, **self.headers)
+
+        # Assert
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(len(json.loads(changed.content)["Points retrieved successfully✅"]), 2)
+
+    async def test_full_story_with_async_client(self):
+        """Test the async aggregate is served on the event loop by the async test client"""
+        # Arrange
+        client = AsyncClient()
+
+        # Act
+        response = await client.get(
+            reverse("async-story-full", args=[self.story.story_id]),
+            headers={"Authorization": self.headers["HTTP_AUTHORIZATION"]},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        actual = json.loads(response.content)["Full story retrieved successfully✅"]
+        self.assertEqual(actual["people"][0]["first_name"], "Async person")
+        self.assertEqual(actual["characters"][0]["dialog"], "Async line")
+
+class InvalidScenariosAsyncViewsTests(TestCase):
+    """This class is built to test the async endpoints authenticate and scope like the synchronous ones"""
+
+    def setUp(self):
+        self.owner = create_user("async-owner@example.com")
+        self.story = models.StoriesModel.objects.create(user=self.owner, title="Private story")
+        self.client = Client()
+
+    def test_missing_token_is_unauthorized(self):
+        """Test a request without a token is rejected"""
+        # Act
+        response = self.client.get(reverse("async-story-details", args=[self.story.story_id]))
+
+        # Assert
+        self.assertEqual(response.status_code, 401)
+
+    def test_invalid_token_is_unauthorized(self):
+        """Test a request with a tampered token gets the same 401 as the synchronous endpoint"""
+        # Act
+        sync_response = self.client.get(
+            reverse("story-details", args=[self.story.story_id]),
+            HTTP_AUTHORIZATION="Bearer not.a.token",
+        )
+        response = self.client.get(
+            reverse("async-story-details", args=[self.story.story_id]),
+            HTTP_AUTHORIZATION="Bearer not.a.token",
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], sync_response["WWW-Authenticate"])
+        self.assertEqual(json.loads(response.content), json.loads(sync_response.content))
+
+    def test_other_users_story_is_not_found(self):
+        """Test the errors match the synchronous endpoints for another user's story"""
+        # Arrange
+        intruder = create_user("async-intruder@example.com")
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(intruder)}"}
+
+        for name in ("story-details", "story-full", "story-incident", "story-points", "story-script", "story-people"):
+            # Act
+            sync_response = self.client.get(reverse(name, args=[self.story.story_id]), **headers)
+            async_response = self.client.get(reverse(f"async-{name}", args=[self.story.story_id]), **headers)
+
+            # Assert
+            with self.subTest(name=name):
+                self.assertEqual(async_response.status_code, 404)
+                self.assertEqual(json.loads(async_response.content), json.loads(sync_response.content))
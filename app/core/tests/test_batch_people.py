@@ -0,0 +1,112 @@
+"""
+This file tests adding many people to a story's incident in one request
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import models
+from django.contrib.auth import get_user_model
+
+class ValidScenariosBatchPeopleTests(TestCase):
+    """This class is built to test the batched people attachment"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="batchpeople@example.com",
+            first_name="TestFirstname",
+            last_name="TestLastname",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+        self.incident = models.IncidentsModel.objects.create(
+            story=self.story,
+            incident_what="Test what",
+            incident_where="Test where",
+            incident_when=timezone.now(),
+        )
+        self.url = reverse("story-people", args=[self.story.story_id])
+
+    def test_adding_a_cast_costs_a_fixed_number_of_queries(self):
+        """Test a 50 person cast is attached with a constant number of queries"""
+        # Arrange
+        input_data = [{"first_name": f"Person {number}", "type": "friend"} for number in range(50)]
+
+        # Act
+        # Constant whatever the cast size (one of them moves the story's updated_at forward)
+        with self.assertNumQueries(8):
+            response = self.client.post(self.url, input_data, format="json")
+
+        # Assert
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(models.PeopleIncidentModel.objects.filter(incident=self.incident).count(), 50)
+
+    def test_existing_people_are_reused_and_duplicates_ignored(self):
+        """Test people that already exist are linked instead of created again"""
+        # Arrange
+        existing = models.PeoplesModel.objects.create(first_name="Alice", type="friend")
+        models.PeopleIncidentModel.objects.create(person=existing, incident=self.incident)
+        input_data = [
+            {"first_name": "Alice", "type": "friend"},
+            {"first_name": "Bob", "type": "friend"},
+            {"first_name": "Bob", "type": "friend"},
+            {"first_name": "Alice", "type": "enemy"},
+        ]
+
+        # Act
+        response = self.client.post(self.url, input_data, format="json")
+
+        # Assert
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(models.PeoplesModel.objects.count(), 3)
+        self.assertEqual(models.PeopleIncidentModel.objects.filter(incident=self.incident).count(), 3)
+        self.assertEqual(response.data["People data"][0]["person_id"], existing.person_id)
+
+    def test_single_person_keeps_the_original_response(self):
+        """Test posting one person still returns the single person response"""
+        # Act
+        response = self.client.post(self.url, {"first_name": "Carol", "type": "friend"}, format="json")
+
+        # Assert
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["Success✅"], "Person successfully added to the incident")
+        self.assertEqual(response.data["Person data"]["first_name"], "Carol")
+
+class InvalidScenariosBatchPeopleTests(TestCase):
+    """This class is built to test invalid batches of people"""
+
+    def test_invalid_person_rejects_the_whole_batch(self):
+        """Test nothing is written when one person in the batch is invalid"""
+        # Arrange
+        user = get_user_model().objects.create_user(
+            email="batchpeopleinvalid@example.com",
+            first_name="TestFirstname",
+            last_name="TestLastname",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        story = models.StoriesModel.objects.create(user=user, title="Test story")
+        models.IncidentsModel.objects.create(
+            story=story, incident_what="Test what", incident_where="Test where", incident_when=timezone.now(),
+        )
+
+        # Act
+        response = client.post(
+            reverse("story-people", args=[story.story_id]),
+            [{"first_name": "Dave", "type": "friend"}, {"first_name": "Eve"}],
+            format="json",
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data["Errors❌:"]), [1])
+        self.assertFalse(models.PeoplesModel.objects.exists())
@@ -0,0 +1,141 @@
+"""
+This file tests creating, updating and deleting many points of a story at once
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import models
+from django.contrib.auth import get_user_model
+
+class ValidScenariosBulkPointsTests(TestCase):
+    """This class is built to test the bulk operations of the points endpoint"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="bulkpoints@example.com",
+            first_name="TestFirstname",
+            last_name="TestLastname",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+        self.url = reverse("story-points", args=[self.story.story_id])
+
+    def test_creating_many_points_uses_one_insert(self):
+        """Test a list of points is created with a single INSERT"""
+        # Arrange
+        input_data = [{"content": f"Point {number}"} for number in range(50)]
+
+        # Act
+        # story lookup, savepoint, INSERT, story updated_at, release savepoint
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, input_data, format="json")
+
+        # Assert
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(models.PointsModel.objects.filter(story=self.story).count(), 50)
+        self.assertTrue(all(point["point_id"] for point in response.data["Points created successfully✅"]))
+
+    def test_single_and_many_points_are_created_alike(self):
+        """Test a single point and a list of points are both answered 201 Created"""
+        # Act
+        single = self.client.post(self.url, {"content": "Single point"}, format="json")
+        many = self.client.post(self.url, [{"content": "Listed point"}], format="json")
+
+        # Assert
+        self.assertEqual(single.status_code, 201)
+        self.assertEqual(many.status_code, 201)
+
+    def test_updating_many_points(self):
+        """Test PATCH with a list of points updates each of them"""
+        # Arrange
+        points = [models.PointsModel.objects.create(story=self.story, content=f"Old {number}") for number in range(3)]
+        input_data = [{"point_id": point.point_id, "content": f"New {point.point_id}"} for point in points]
+
+        # Act
+        response = self.client.patch(self.url, input_data, format="json")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        for point in points:
+            point.refresh_from_db()
+            self.assertEqual(point.content, f"New {point.point_id}")
+
+    def test_updating_points_without_content_keeps_it(self):
+        """Test PATCH items without a content keep the point's content"""
+        # Arrange
+        points = [models.PointsModel.objects.create(story=self.story, content=f"Old {number}") for number in range(2)]
+        input_data = [{"point_id": points[0].point_id}, {"point_id": points[1].point_id, "content": "New"}]
+
+        # Act
+        response = self.client.patch(self.url, input_data, format="json")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        points[0].refresh_from_db()
+        points[1].refresh_from_db()
+        self.assertEqual(points[0].content, "Old 0")
+        self.assertEqual(points[1].content, "New")
+
+    def test_deleting_many_points(self):
+        """Test DELETE with a list of ids deletes those points only"""
+        # Arrange
+        points = [models.PointsModel.objects.create(story=self.story, content=f"Point {number}") for number in range(3)]
+
+        # Act
+        response = self.client.delete(self.url, {"point_ids": [points[0].point_id, points[1].point_id, 999]}, format="json")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["Points not found"], [999])
+        self.assertEqual(list(models.PointsModel.objects.filter(story=self.story)), [points[2]])
+
+class InvalidScenariosBulkPointsTests(TestCase):
+    """This class is built to test invalid bulk requests to the points endpoint"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="bulkpointsinvalid@example.com",
+            first_name="TestFirstname",
+            last_name="TestLastname",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+        self.url = reverse("story-points", args=[self.story.story_id])
+
+    def test_invalid_items_are_reported_by_index(self):
+        """Test nothing is created and errors are keyed by the index of the invalid item"""
+        # Arrange
+        input_data = [{"content": "Fine"}, {}, {"content": "Also fine"}, {"content": ""}]
+
+        # Act
+        response = self.client.post(self.url, input_data, format="json")
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data["Errors❌"]), {1, 3})
+        self.assertFalse(models.PointsModel.objects.exists())
+
+    def test_updating_a_point_of_another_story_is_rejected(self):
+        """Test PATCH reports points that are not in the story"""
+        # Arrange
+        other_story = models.StoriesModel.objects.create(user=self.user, title="Other story")
+        point = models.PointsModel.objects.create(story=other_story, content="Untouched")
+
+        # Act
+        response = self.client.patch(self.url, [{"point_id": point.point_id, "content": "Changed"}], format="json")
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(0, response.data["Errors❌"])
+        point.refresh_from_db()
+        self.assertEqual(point.content, "Untouched")
@@ -0,0 +1,87 @@
+"""
+This file tests that the people, links and characters lists do not make a query per record
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import models
+from django.contrib.auth import get_user_model
+
+class ValidScenariosCollectionQueriesTests(TestCase):
+    """This class is built to keep the query count of the collection reads flat"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="collections@example.com",
+            first_name="TestFirstname",
+            last_name="TestLastname",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+        self.incident = models.IncidentsModel.objects.create(
+            story=self.story,
+            incident_what="Test what",
+            incident_where="Test where",
+            incident_when=timezone.now(),
+        )
+
+    def add_children(self, count):
+        """Adds count people, links and characters to the story"""
+        # People, links and characters are shared and unique by content, so every call adds new ones
+        start = models.PeoplesModel.objects.count()
+        for number in range(start, start + count):
+            person = models.PeoplesModel.objects.create(first_name=f"Person {number}", type="friend")
+            models.PeopleIncidentModel.objects.create(person=person, incident=self.incident)
+            link = models.LinksModel.objects.create(title=f"Link {number}", description="Test link")
+            models.StoryLinkModel.objects.create(story=self.story, link=link)
+            character = models.CharactersModel.objects.create(body_language="calm", dialog=f"Line {number}")
+            models.StoryCharactersModel.objects.create(story=self.story, character=character)
+
+    def test_collection_reads_are_one_query(self):
+        """Test each collection read is a single join query however many records it returns"""
+        # Arrange
+        urls = {
+            reverse("story-people", args=[self.story.story_id]): "People involved in this incident (the WHO)",
+            reverse("story-links", args=[self.story.story_id]): "Links",
+            reverse("story-characters", args=[self.story.story_id]): "Characters",
+        }
+
+        for count in (1, 25):
+            self.add_children(count if count == 1 else count - 1)
+            for url, key in urls.items():
+                # Act
+                # Nothing cached: the story's updated_at (conditional GET validators) and the read
+                cache.clear()
+                with self.subTest(url=url, count=count), self.assertNumQueries(2):
+                    response = self.client.get(url)
+
+                # Assert
+                self.assertEqual(len(response.data[key]), count)
+
+    def test_other_users_people_are_not_listed(self):
+        """Test the people list of another user's story is not found"""
+        # Arrange
+        self.add_children(1)
+        intruder = get_user_model().objects.create_user(
+            email="collections-intruder@example.com",
+            first_name="Intruder",
+            last_name="User",
+            date_of_birth="2003-10-18",
+            city="derby",
+            password="Testpass123",
+        )
+        self.client.force_authenticate(user=intruder)
+
+        # Act
+        response = self.client.get(reverse("story-people", args=[self.story.story_id]))
+
+        # Assert
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,121 @@
+"""
+This file tests the ETag / Last-Modified support of the story endpoints
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models
+from django.contrib.auth import get_user_model
+
+class ValidScenariosConditionalRequestsTests(TestCase):
+    """This class is built to test conditional GET requests on story resources"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="conditional@example.com",
+            first_name="TestFirstname",
+            last_name="TestLastname",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+        self.script = models.ScriptsModel.objects.create(story=self.story, content="First draft")
+        self.url = reverse("story-script", args=[self.story.story_id])
+
+    def test_get_returns_validators(self):
+        """Test a story resource is returned with an ETag and a Last-Modified date"""
+        # Act
+        response = self.client.get(self.url)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+    def test_matching_etag_returns_not_modified(self):
+        """Test a request with the current ETag gets an empty 304 response"""
+        # Arrange
+        etag = self.client.get(self.url)["ETag"]
+
+        # Act
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_child_write_changes_story_etag(self):
+        """Test writing a child moves the story's updated_at and every resource's ETag"""
+        # Arrange
+        details_url = reverse("story-details", args=[self.story.story_id])
+        details_etag = self.client.get(details_url)["ETag"]
+        script_etag = self.client.get(self.url)["ETag"]
+        updated_at = models.StoriesModel.objects.get(pk=self.story.pk).updated_at
+
+        # Act
+        self.client.patch(self.url, {"content": "Second draft"}, format="json")
+
+        # Assert
+        self.assertGreater(models.StoriesModel.objects.get(pk=self.story.pk).updated_at, updated_at)
+        self.assertEqual(self.client.get(details_url, HTTP_IF_NONE_MATCH=details_etag).status_code, status.HTTP_200_OK)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=script_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], script_etag)
+
+    def test_resources_of_a_story_have_different_etags(self):
+        """Test two resources of the same story do not share an ETag"""
+        # Arrange
+        points_url = reverse("story-points", args=[self.story.story_id])
+
+        # Act
+        script_etag = self.client.get(self.url)["ETag"]
+        points_etag = self.client.get(points_url)["ETag"]
+
+        # Assert
+        self.assertNotEqual(script_etag, points_etag)
+
+class InvalidScenariosConditionalRequestsTests(TestCase):
+    """This class is built to test conditional GET requests cannot reveal other users' stories"""
+
+    def test_etag_of_another_users_story_is_not_found(self):
+        """Test a conditional request for another user's story is a 404, not a 304"""
+        # Arrange
+        owner = get_user_model().objects.create_user(
+            email="conditional-owner@example.com",
+            first_name="Owner",
+            last_name="User",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        story = models.StoriesModel.objects.create(user=owner, title="Private story")
+        models.ScriptsModel.objects.create(story=story, content="Private draft")
+        url = reverse("story-script", args=[story.story_id])
+        owner_client = APIClient()
+        owner_client.force_authenticate(user=owner)
+        etag = owner_client.get(url)["ETag"]
+
+        intruder = get_user_model().objects.create_user(
+            email="conditional-intruder@example.com",
+            first_name="Intruder",
+            last_name="User",
+            date_of_birth="2003-10-18",
+            city="derby",
+            password="Testpass123",
+        )
+        client = APIClient()
+        client.force_authenticate(user=intruder)
+
+        # Act
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,103 @@
+"""
+This file tests the content hash deduplication of people, links and characters
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import models
+from django.contrib.auth import get_user_model
+
+class ValidScenariosContentHashTests(TestCase):
+    """This class is built to test that shared records are deduplicated by their content hash"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="contenthash@example.com",
+            first_name="TestFirstname",
+            last_name="TestLastname",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+
+    def test_content_hash_follows_the_identifying_fields(self):
+        """Test the hash is set on save and normalizes surrounding whitespace"""
+        # Arrange
+        link = models.LinksModel.objects.create(title="Title", description="Description")
+
+        # Act
+        actual = models.LinksModel.hash_for({"title": " Title ", "description": "Description"})
+
+        # Assert
+        self.assertEqual(actual, link.content_hash)
+
+    def test_existing_record_is_found_with_one_query(self):
+        """Test looking up an existing record by content is a single query"""
+        # Arrange
+        character = models.CharactersModel.objects.create(body_language="calm", dialog="A long line of dialog")
+
+        # Act
+        with self.assertNumQueries(1):
+            actual, created = models.CharactersModel.objects.get_or_create_by_content(
+                body_language="calm", dialog="A long line of dialog",
+            )
+
+        # Assert
+        self.assertFalse(created)
+        self.assertEqual(actual, character)
+
+    def test_posting_the_same_link_twice_reuses_it(self):
+        """Test the links endpoint links an existing link instead of creating a copy"""
+        # Arrange
+        url = reverse("story-links", args=[self.story.story_id])
+        other_story = models.StoriesModel.objects.create(user=self.user, title="Other story")
+
+        # Act
+        self.client.post(url, {"title": "Title", "description": "Description"}, format="json")
+        self.client.post(
+            reverse("story-links", args=[other_story.story_id]),
+            {"title": "Title", "description": "Description "},
+            format="json",
+        )
+
+        # Assert
+        self.assertEqual(models.LinksModel.objects.count(), 1)
+        self.assertEqual(models.StoryLinkModel.objects.count(), 2)
+
+class InvalidScenariosContentHashTests(TestCase):
+    """This class is built to test updates that would create duplicate shared records"""
+
+    def test_update_into_a_duplicate_is_rejected(self):
+        """Test updating a character to the content of another character fails validation"""
+        # Arrange
+        user = get_user_model().objects.create_user(
+            email="contenthashinvalid@example.com",
+            first_name="TestFirstname",
+            last_name="TestLastname",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        story = models.StoriesModel.objects.create(user=user, title="Test story")
+        models.CharactersModel.objects.create(body_language="calm", dialog="Taken")
+        character = models.CharactersModel.objects.create(body_language="calm", dialog="Free")
+        models.StoryCharactersModel.objects.create(story=story, character=character)
+
+        # Act
+        response = client.patch(
+            reverse("story-character-details", args=[story.story_id, character.character_id]),
+            {"dialog": "Taken"},
+            format="json",
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        character.refresh_from_db()
+        self.assertEqual(character.dialog, "Free")
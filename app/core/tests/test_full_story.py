@@ -0,0 +1,131 @@
+"""
+This file tests the full story aggregate endpoint
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import models
+from django.contrib.auth import get_user_model
+
+class ValidScenariosFullStoryTests(TestCase):
+    """This class is built to test retrieving a story with all of its children"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="fullstory@example.com",
+            first_name="TestFirstname",
+            last_name="TestLastname",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+        self.incident = models.IncidentsModel.objects.create(
+            story=self.story,
+            incident_what="Test what",
+            incident_where="Test where",
+            incident_when=timezone.now(),
+        )
+        models.VAKSModel.objects.create(
+            story=self.story, sight="a", sound="b", smell="c", taste="d", touch="e", emotion="f",
+        )
+        models.ScriptsModel.objects.create(story=self.story, content="Test script")
+
+    def add_children(self, count):
+        """Adds count people, points, links and characters to the story"""
+        # People, links and characters are shared and unique by content, so every call adds new ones
+        start = models.PeoplesModel.objects.count()
+        for number in range(start, start + count):
+            person = models.PeoplesModel.objects.create(first_name=f"Person {number}", type="friend")
+            models.PeopleIncidentModel.objects.create(person=person, incident=self.incident)
+            models.PointsModel.objects.create(story=self.story, content=f"Point {number}")
+            link = models.LinksModel.objects.create(title=f"Link {number}", description="Test link")
+            models.StoryLinkModel.objects.create(story=self.story, link=link)
+            character = models.CharactersModel.objects.create(body_language="calm", dialog=f"Line {number}")
+            models.StoryCharactersModel.objects.create(story=self.story, character=character)
+
+    def test_full_story_contains_every_child(self):
+        """Test the aggregate returns the story with all of its children"""
+        # Arrange
+        self.add_children(2)
+
+        # Act
+        response = self.client.get(reverse("story-full", args=[self.story.story_id]))
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        actual = response.data["Full story retrieved successfully✅"]
+        self.assertEqual(actual["title"], "Test story")
+        self.assertEqual(actual["incident"]["incident_where"], "Test where")
+        self.assertEqual(actual["vaks"]["sight"], "a")
+        self.assertEqual(actual["script"]["content"], "Test script")
+        self.assertEqual(len(actual["people"]), 2)
+        self.assertEqual(len(actual["points"]), 2)
+        self.assertEqual(len(actual["links"]), 2)
+        self.assertEqual(len(actual["characters"]), 2)
+
+    def test_query_count_does_not_grow_with_children(self):
+        """Test the aggregate costs the same number of queries for small and large stories"""
+        # Arrange
+        url = reverse("story-full", args=[self.story.story_id])
+        self.add_children(1)
+
+        # Act / Assert
+        # The story's updated_at (conditional GET validators) plus the 7 queries of the aggregate
+        with self.assertNumQueries(8):
+            self.client.get(url)
+
+        self.add_children(20)
+        with self.assertNumQueries(8):
+            self.client.get(url)
+
+    def test_story_without_children(self):
+        """Test a bare story returns empty children"""
+        # Arrange
+        story = models.StoriesModel.objects.create(user=self.user, title="Bare story")
+
+        # Act
+        response = self.client.get(reverse("story-full", args=[story.story_id]))
+
+        # Assert
+        actual = response.data["Full story retrieved successfully✅"]
+        self.assertIsNone(actual["incident"])
+        self.assertIsNone(actual["vaks"])
+        self.assertEqual(actual["people"], [])
+
+class InvalidScenariosFullStoryTests(TestCase):
+    """This class is built to test the full story endpoint for stories the user does not own"""
+
+    def test_other_users_story_is_not_found(self):
+        """Test another user's story returns 404"""
+        # Arrange
+        owner = get_user_model().objects.create_user(
+            email="owner@example.com",
+            first_name="Owner",
+            last_name="User",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        intruder = get_user_model().objects.create_user(
+            email="intruder@example.com",
+            first_name="Intruder",
+            last_name="User",
+            date_of_birth="2003-10-18",
+            city="derby",
+            password="Testpass123",
+        )
+        story = models.StoriesModel.objects.create(user=owner, title="Private story")
+        client = APIClient()
+        client.force_authenticate(user=intruder)
+
+        # Act
+        response = client.get(reverse("story-full", args=[story.story_id]))
+
+        # Assert
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,98 @@
+"""
+This file tests the synthetic dataset generator (generate_dataset command)
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core import models, search
+
+def generate(**options):
+    """Runs generate_dataset with small defaults and returns its output"""
+    out = StringIO()
+    options = {"users": 3, "stories_per_user": 4, "pool_size": 5, "seed": 7, **options}
+    call_command("generate_dataset", stdout=out, **options)
+    return out.getvalue()
+
+class ValidScenariosGenerateDatasetTests(TestCase):
+    """This class is built to test the generated dataset is complete and deterministic"""
+
+    def test_generates_every_table(self):
+        """Test every story gets an incident, VAKS, script, points, people, links and characters"""
+        # Act
+        generate(points_per_story=2, people_per_incident=3, links_per_story=2, characters_per_story=1)
+
+        # Assert
+        stories = models.StoriesModel.objects.filter(user__email__startswith="generated-7-")
+        self.assertEqual(models.UsersModel.objects.filter(email__startswith="generated-7-").count(), 3)
+        self.assertEqual(stories.count(), 12)
+        self.assertEqual(models.IncidentsModel.objects.filter(story__in=stories).count(), 12)
+        self.assertEqual(models.VAKSModel.objects.filter(story__in=stories).count(), 12)
+        self.assertEqual(models.ScriptsModel.objects.filter(story__in=stories).count(), 12)
+        self.assertEqual(models.PointsModel.objects.filter(story__in=stories).count(), 24)
+        self.assertEqual(models.PeopleIncidentModel.objects.filter(incident__story__in=stories).count(), 36)
+        self.assertEqual(models.StoryLinkModel.objects.filter(story__in=stories).count(), 24)
+        self.assertEqual(models.StoryCharactersModel.objects.filter(story__in=stories).count(), 12)
+
+    def test_people_are_shared_between_incidents(self):
+        """Test the pool people are linked to several incidents"""
+        # Act
+        generate(people_per_incident=2)
+
+        # Assert
+        self.assertLessEqual(models.PeoplesModel.objects.count(), 5)
+        self.assertEqual(models.PeopleIncidentModel.objects.count(), 24)
+
+    def test_users_can_log_in_with_the_password(self):
+        """Test the pre-hashed password is a valid password of every user"""
+        # Act
+        generate(password="Secret123")
+
+        # Assert
+        users = models.UsersModel.objects.filter(email__startswith="generated-7-")
+        self.assertTrue(all(user.check_password("Secret123") for user in users))
+
+    def test_same_seed_generates_same_data(self):
+        """Test two runs with the same seed generate the same stories"""
+        # Arrange
+        generate()
+        first_titles = list(models.StoriesModel.objects.order_by("story_id").values_list("title", flat=True))
+        first_scripts = list(models.ScriptsModel.objects.order_by("script_id").values_list("content", flat=True))
+        models.UsersModel.objects.filter(email__startswith="generated-7-").delete()
+
+        # Act
+        generate()
+
+        # Assert
+        self.assertEqual(list(models.StoriesModel.objects.order_by("story_id").values_list("title", flat=True)), first_titles)
+        self.assertEqual(list(models.ScriptsModel.objects.order_by("script_id").values_list("content", flat=True)), first_scripts)
+
+    def test_generated_stories_are_searchable(self):
+        """Test the search index is rebuilt after the generation"""
+        # Act
+        generate()
+
+        # Assert
+        story = models.StoriesModel.objects.first()
+        results = search.search_stories(story.user, story.title.split()[0], limit=50)
+        self.assertIn(story.story_id, [result["story_id"] for result in results])
+
+class InvalidScenariosGenerateDatasetTests(TestCase):
+    """This class is built to test the generator refuses bad options"""
+
+    def test_same_seed_twice_is_refused(self):
+        """Test generating the same users again fails instead of clashing on their emails"""
+        # Arrange
+        generate()
+
+        # Assert
+        with self.assertRaises(CommandError):
+            generate()
+
+    def test_no_users_is_refused(self):
+        """Test --users 0 is rejected"""
+        # Assert
+        with self.assertRaises(CommandError):
+            generate(users=0)
@@ -0,0 +1,149 @@
+"""
+This file tests the orjson renderer and parser against DRF's JSON renderer and parser
+"""
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core import models, parsers, renderers
+from django.contrib.auth import get_user_model
+
+PAYLOAD = {
+    "title": "Ünïcode “story” ✅ with a line separator \u2028 and a paragraph separator \u2029",
+    "created_at": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+    "local_time": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2))),
+    "naive": datetime.datetime(2024, 5, 1, 12, 30),
+    "date_of_birth": datetime.date(2003, 10, 18),
+    "time": datetime.time(9, 15),
+    "amount": Decimal("12.50"),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "lazy": gettext_lazy("Story"),
+    "errors": {3: ["Invalid JSON"], 10: ["Missing title"]},
+    "points": [{"point_id": 1, "content": "Point", "score": 1.5, "done": True, "story": None}],
+}
+
+class ValidScenariosORJSONRendererTests(SimpleTestCase):
+    """This class is built to test the orjson renderer gives the same bytes as DRF's"""
+
+    def test_renders_like_drf(self):
+        """Test datetimes, dates, decimals, unicode, int keys and line separators match DRF's output"""
+        # Act
+        rendered = renderers.ORJSONRenderer().render(PAYLOAD)
+
+        # Assert
+        self.assertEqual(rendered, JSONRenderer().render(PAYLOAD))
+
+    def test_indented_output_falls_back_to_drf(self):
+        """Test an indent asked for in the media type renders like DRF"""
+        # Act
+        rendered = renderers.ORJSONRenderer().render(PAYLOAD, "application/json; indent=4")
+
+        # Assert
+        self.assertEqual(rendered, JSONRenderer().render(PAYLOAD, "application/json; indent=4"))
+
+    def test_unsupported_data_falls_back_to_drf(self):
+        """Test integers orjson cannot encode are rendered by DRF"""
+        # Arrange
+        data = {"big": 2 ** 70}
+
+        # Act
+        rendered = renderers.ORJSONRenderer().render(data)
+
+        # Assert
+        self.assertEqual(rendered, JSONRenderer().render(data))
+
+    def test_missing_orjson_falls_back_to_drf(self):
+        """Test the renderer and parser keep working without orjson"""
+        # Act
+        with mock.patch.object(renderers, "orjson", None), mock.patch.object(parsers, "orjson", None):
+            rendered = renderers.ORJSONRenderer().render(PAYLOAD)
+            parsed = parsers.ORJSONParser().parse(io.BytesIO(b'{"title": "Story"}'))
+
+        # Assert
+        self.assertEqual(rendered, JSONRenderer().render(PAYLOAD))
+        self.assertEqual(parsed, {"title": "Story"})
+
+class ValidScenariosORJSONParserTests(SimpleTestCase):
+    """This class is built to test the orjson parser reads what DRF's parser reads"""
+
+    def test_parses_like_drf(self):
+        """Test a rendered payload parses back to the same data as with DRF's parser"""
+        # Arrange
+        body = JSONRenderer().render(PAYLOAD)
+
+        # Act
+        parsed = parsers.ORJSONParser().parse(io.BytesIO(body))
+
+        # Assert
+        self.assertEqual(parsed, JSONParser().parse(io.BytesIO(body)))
+
+    def test_non_utf8_body_falls_back_to_drf(self):
+        """Test a body sent in another charset is decoded with that charset"""
+        # Arrange
+        body = '{"title": "Café"}'.encode("latin-1")
+
+        # Act
+        parsed = parsers.ORJSONParser().parse(io.BytesIO(body), parser_context={"encoding": "latin-1"})
+
+        # Assert
+        self.assertEqual(parsed, {"title": "Café"})
+
+class InvalidScenariosORJSONParserTests(SimpleTestCase):
+    """This class is built to test the orjson parser rejects invalid JSON like DRF"""
+
+    def test_invalid_json_raises_parse_error(self):
+        """Test a malformed body raises ParseError"""
+        # Assert
+        with self.assertRaises(ParseError):
+            parsers.ORJSONParser().parse(io.BytesIO(b'{"title": '))
+
+    def test_nan_is_rejected(self):
+        """Test NaN is rejected like DRF's strict parser does"""
+        # Assert
+        with self.assertRaises(ParseError):
+            parsers.ORJSONParser().parse(io.BytesIO(b'{"score": NaN}'))
+
+class ValidScenariosJSONEndpointTests(TestCase):
+    """This class is built to test the API reads and writes JSON through orjson"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="json@example.com",
+            first_name="TestFirstname",
+            last_name="TestLastname",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="JSON story")
+
+    def test_json_request_and_response(self):
+        """Test a JSON POST is parsed and the response dates are rendered like DRF's"""
+        # Arrange
+        url = reverse("story-incident", args=[self.story.story_id])
+        incident_when = timezone.now().replace(microsecond=0)
+
+        # Act
+        response = self.client.post(
+            url,
+            {"incident_what": "Ünïcode", "incident_where": "Here", "incident_when": incident_when.isoformat()},
+            format="json",
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
@@ -0,0 +1,211 @@
+"""
+This file tests the per endpoint metrics and their Prometheus endpoint
+"""
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import models
+from core.metrics import DEFAULT_LATENCY_BUCKETS, labels, store
+from core.testing import create_user
+
+class MetricsTestCase(TestCase):
+    """Runs each test with empty counters in a directory of its own"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp(prefix="test-metrics-")
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.directory = Path(directory)
+        settings_override = override_settings(
+            METRICS_ENABLED=True,
+            METRICS_DIRECTORY=directory,
+            METRICS_LATENCY_BUCKETS=DEFAULT_LATENCY_BUCKETS,
+            METRICS_TOKEN="scrape-secret",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        store.reset()
+        cache.clear()
+
+        self.user = create_user("metrics@example.com")
+        self.client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+
+    def get_metrics(self, **headers):
+        """Returns the response of the metrics endpoint (sent with the token unless other headers are given)"""
+        return Client().get(reverse("metrics"), headers=headers or {"Authorization": "Bearer scrape-secret"})
+
+class ValidScenariosMetricsTests(MetricsTestCase):
+    """This class is built to test requests are counted per URL name and exposed to Prometheus"""
+
+    def test_requests_are_counted_per_url_name(self):
+        """Test the requests, their latency and their queries are counted under their URL name"""
+        # Arrange
+        self.client.get(reverse("stories"))
+        self.client.get(reverse("stories"))
+        self.client.get(reverse("story-details", args=[999999]))
+
+        # Act
+        response = self.get_metrics()
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        text = response.content.decode()
+        self.assertIn('api_requests_total{url_name="stories",method="GET",status="200"} 2', text)
+        self.assertIn('api_requests_total{url_name="story-details",method="GET",status="404"} 1', text)
+        self.assertIn('api_request_duration_seconds_bucket{url_name="stories",method="GET",le="+Inf"} 2', text)
+        self.assertIn('api_request_duration_seconds_count{url_name="stories",method="GET"} 2', text)
+        self.assertRegex(text, r'api_db_queries_total\{url_name="stories",method="GET"\} [1-9]')
+
+    def test_cache_hit_ratio_per_url_name(self):
+        """Test the story response cache lookups and their hit ratio are exposed per URL name"""
+        # Arrange
+        url = reverse("story-points", args=[self.story.story_id])
+        self.client.get(url)
+        self.client.get(url)
+
+        # Act
+        text = self.get_metrics().content.decode()
+
+        # Assert
+        self.assertIn('api_response_cache_lookups_total{url_name="story-points",result="hit"} 1', text)
+        self.assertIn('api_response_cache_lookups_total{url_name="story-points",result="miss"} 1', text)
+        self.assertIn('api_response_cache_hit_ratio{url_name="story-points"} 0.5', text)
+
+    def test_counters_of_every_process_are_added_up(self):
+        """Test the files written by the other worker processes are added to this process' counters"""
+        # Arrange
+        other_process = {
+            "buckets": list(DEFAULT_LATENCY_BUCKETS),
+            "requests": [["stories", "GET", "200", 3]],
+            "latency": [["stories", "GET", [0] * len(DEFAULT_LATENCY_BUCKETS) + [3, 60.0]]],
+            "queries": [["stories", "GET", 6]],
+            "cache": [],
+        }
+        (self.directory / "metrics-999999.json").write_text(json.dumps(other_process))
+        self.client.get(reverse("stories"))
+
+        # Act
+        text = self.get_metrics().content.decode()
+
+        # Assert
+        self.assertIn('api_requests_total{url_name="stories",method="GET",status="200"} 4', text)
+        self.assertIn('api_request_duration_seconds_bucket{url_name="stories",method="GET",le="10.0"} 1', text)
+        self.assertIn('api_request_duration_seconds_bucket{url_name="stories",method="GET",le="+Inf"} 4', text)
+        self.assertIn('api_request_duration_seconds_count{url_name="stories",method="GET"} 4', text)
+        self.assertTrue(store.path().exists())
+
+    def test_exiting_process_merges_its_counters(self):
+        """Test at exit a process adds its counters to the exited processes' file and removes its own"""
+        # Arrange
+        self.client.get(reverse("stories"))
+        before = self.get_metrics().content.decode()
+        path = store.path()
+
+        # Act
+        store.close()
+        store.reset()
+        self.client.get(reverse("stories"))
+        store.close()
+        store.reset()
+
+        # Assert
+        self.assertFalse(path.exists())
+        self.assertEqual([file.name for file in self.directory.glob("metrics-*.json")], ["metrics-exited.json"])
+        self.assertIn('api_requests_total{url_name="stories",method="GET",status="200"} 1', before)
+        self.assertIn('api_requests_total{url_name="stories",method="GET",status="200"} 2', self.get_metrics().content.decode())
+
+    def test_restarted_process_gets_a_file_of_its_own(self):
+        """Test a process starting again with the same id does not overwrite the counters of the previous one"""
+        # Arrange
+        self.client.get(reverse("stories"))
+        store.flush()
+        previous_path = store.path()
+
+        # Act
+        store.reset()
+        text = self.get_metrics().content.decode()
+
+        # Assert
+        self.assertNotEqual(store.path(), previous_path)
+        self.assertTrue(previous_path.exists())
+        self.assertIn('api_requests_total{url_name="stories",method="GET",status="200"} 1', text)
+
+    def test_unresolved_requests_share_one_label(self):
+        """Test requests matching no URL are counted under one label instead of their path"""
+        # Arrange
+        self.client.get("/api/does-not-exist/")
+
+        # Act
+        text = self.get_metrics().content.decode()
+
+        # Assert
+        self.assertIn('api_requests_total{url_name="unresolved",method="GET",status="404"} 1', text)
+        self.assertNotIn("does-not-exist", text)
+
+    def test_metrics_with_token(self):
+        """Test the metrics are served to a scraper sending the configured token"""
+        # Act
+        response = self.get_metrics(Authorization="Bearer scrape-secret")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+
+    def test_label_values_are_escaped(self):
+        """Test quotes, backslashes and new lines in label values are escaped"""
+        # Assert
+        self.assertEqual(labels(url_name='a"b\\c\nd'), '{url_name="a\\"b\\\\c\\nd"}')
+
+class InvalidScenariosMetricsTests(MetricsTestCase):
+    """This class is built to test the metrics are protected and tolerate bad files"""
+
+    def test_metrics_without_token(self):
+        """Test the metrics are refused when the configured token is missing or wrong"""
+        # Act
+        missing = Client().get(reverse("metrics"))
+        wrong = self.get_metrics(Authorization="Bearer wrong-secret")
+
+        # Assert
+        self.assertEqual(missing.status_code, 403)
+        self.assertEqual(wrong.status_code, 403)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_without_configured_token(self):
+        """Test the metrics are refused to everyone, JWT users included, while METRICS_TOKEN is not set"""
+        # Act
+        response = Client().get(reverse("metrics"))
+        jwt_response = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}").get(reverse("metrics"))
+
+        # Assert
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(jwt_response.status_code, 403)
+
+    def test_unreadable_and_mismatched_files_are_skipped(self):
+        """Test a corrupt file is skipped and a histogram with other buckets is left out"""
+        # Arrange
+        (self.directory / "metrics-999998.json").write_text("{not json")
+        other_buckets = {
+            "buckets": [1.0],
+            "requests": [["stories", "GET", "200", 3]],
+            "latency": [["stories", "GET", [3, 0, 0.5]]],
+            "queries": [],
+            "cache": [],
+        }
+        (self.directory / "metrics-999999.json").write_text(json.dumps(other_buckets))
+        self.client.get(reverse("stories"))
+
+        # Act
+        response = self.get_metrics()
+
+        # Assert
+        text = response.content.decode()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('api_requests_total{url_name="stories",method="GET",status="200"} 4', text)
+        self.assertIn('api_request_duration_seconds_count{url_name="stories",method="GET"} 1', text)
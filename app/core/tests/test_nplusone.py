@@ -0,0 +1,150 @@
+"""
+This file tests the N+1 query detector and its middleware
+"""
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import models
+from core.middleware import NPlusOneMiddleware
+from core.nplusone import NPlusOneError, assert_no_n_plus_one, detect_queries, normalize_sql
+from core.testing import create_user
+
+def read_story_owners(request=None):
+    """Reads the owner of every story one query at a time (an N+1)"""
+    for story in models.StoriesModel.objects.all():
+        story.user.email
+    return HttpResponse()
+
+class ValidScenariosNPlusOneTests(TestCase):
+    """This class is built to test repeated statements are detected and reported"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        for number in range(5):
+            user = create_user(f"owner{number}@example.com")
+            models.StoriesModel.objects.create(user=user, title=f"Story {number}")
+
+    def test_sql_is_normalized_to_its_shape(self):
+        """Test values, placeholders and IN lists are removed from the shape of a statement"""
+        # Act
+        shapes = {
+            normalize_sql("SELECT * FROM story WHERE id = 1 AND title = 'it''s'"),
+            normalize_sql("SELECT *  FROM story\nWHERE id = %s AND title = %s"),
+            normalize_sql("SELECT * FROM story WHERE id = 25 AND title = 'other'"),
+        }
+        in_lists = {normalize_sql("SELECT 1 WHERE id IN (%s, %s)"), normalize_sql("SELECT 1 WHERE id IN (%s,%s,%s)")}
+
+        # Assert
+        self.assertEqual(shapes, {"SELECT * FROM story WHERE id = ? AND title = ?"})
+        self.assertEqual(in_lists, {"SELECT ? WHERE id IN (...)"})
+
+    def test_repeated_statement_is_reported_with_its_line(self):
+        """Test a statement run once per row is an offender reported with the line that ran it"""
+        # Act
+        with self.assertRaises(NPlusOneError) as raised:
+            with assert_no_n_plus_one(threshold=3):
+                read_story_owners()
+
+        # Assert
+        self.assertIn("5x at core/tests/test_nplusone.py:", str(raised.exception))
+        self.assertIn("in read_story_owners", str(raised.exception))
+
+    def test_nested_blocks_count_the_same_queries(self):
+        """Test the queries of an inner block are counted by the enclosing block too"""
+        # Act
+        with detect_queries(threshold=3) as outer:
+            with detect_queries(threshold=10) as inner:
+                read_story_owners()
+
+        # Assert
+        self.assertEqual(len(outer.offenders()), 1)
+        self.assertEqual(inner.offenders(), [])
+        self.assertEqual(outer.counts, inner.counts)
+
+    @override_settings(NPLUSONE_MODE="raise", NPLUSONE_THRESHOLD=3)
+    def test_raise_mode_fails_the_request(self):
+        """Test the middleware raises in "raise" mode"""
+        # Act
+        with self.assertRaises(NPlusOneError):
+            NPlusOneMiddleware(read_story_owners)(self.factory.get("/api/stories/"))
+
+    @override_settings(NPLUSONE_MODE="log", NPLUSONE_THRESHOLD=3, NPLUSONE_SAMPLE_RATE=1.0)
+    def test_log_mode_logs_the_offenders(self):
+        """Test the middleware logs the offenders as structured fields in "log" mode"""
+        # Act
+        with self.assertLogs("core.nplusone", level="WARNING") as logs:
+            response = NPlusOneMiddleware(read_story_owners)(self.factory.get("/api/stories/"))
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        offenders = logs.records[0].nplusone_offenders
+        self.assertEqual(len(offenders), 1)
+        self.assertEqual(offenders[0]["count"], 5)
+        self.assertIn("read_story_owners", offenders[0]["caller"])
+
+    def test_story_endpoints_do_not_repeat_statements(self):
+        """Test the story endpoints read their children without one query per row"""
+        # Arrange
+        user = create_user("nplusone@example.com")
+        story = models.StoriesModel.objects.create(user=user, title="Test story")
+        incident = models.IncidentsModel.objects.create(
+            story=story, incident_what="Test what", incident_where="Test where", incident_when=timezone.now(),
+        )
+        for number in range(5):
+            models.StoriesModel.objects.create(user=user, title=f"Test story {number}")
+            person = models.PeoplesModel.objects.create(first_name=f"Person {number}", type="friend")
+            models.PeopleIncidentModel.objects.create(person=person, incident=incident)
+            models.PointsModel.objects.create(story=story, content=f"Point {number}")
+            link = models.LinksModel.objects.create(title=f"Link {number}", description="Test link")
+            models.StoryLinkModel.objects.create(story=story, link=link)
+            character = models.CharactersModel.objects.create(body_language="calm", dialog=f"Line {number}")
+            models.StoryCharactersModel.objects.create(story=story, character=character)
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+        # Act
+        responses = []
+        for url in [reverse("stories")] + [
+            reverse(name, args=[story.story_id])
+            for name in ("story-full", "story-people", "story-points", "story-links", "story-characters")
+        ]:
+            with assert_no_n_plus_one(threshold=3):
+                responses.append(client.get(url))
+
+        # Assert
+        self.assertEqual([response.status_code for response in responses], [200] * 6)
+
+class InvalidScenariosNPlusOneTests(TestCase):
+    """This class is built to test requests that are not checked or have nothing to report"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        user = create_user("owner@example.com")
+        models.StoriesModel.objects.create(user=user, title="Story")
+
+    @override_settings(NPLUSONE_MODE="raise", NPLUSONE_THRESHOLD=3)
+    def test_statements_under_threshold_pass(self):
+        """Test a statement run up to the threshold is not an offender"""
+        # Act
+        response = NPlusOneMiddleware(read_story_owners)(self.factory.get("/api/stories/"))
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(NPLUSONE_MODE="log", NPLUSONE_THRESHOLD=0, NPLUSONE_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_checked(self):
+        """Test requests left out of the sample are not checked in "log" mode"""
+        # Act
+        with self.assertNoLogs("core.nplusone", level="WARNING"):
+            NPlusOneMiddleware(read_story_owners)(self.factory.get("/api/stories/"))
+
+    @override_settings(NPLUSONE_MODE=None, NPLUSONE_THRESHOLD=0)
+    def test_disabled_check_does_nothing(self):
+        """Test no request is checked when the mode is None"""
+        # Act
+        response = NPlusOneMiddleware(read_story_owners)(self.factory.get("/api/stories/"))
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,148 @@
+"""
+This file tests the on demand profiling of staff requests
+"""
+import json
+
+from django.core.cache import cache
+from django.test import AsyncClient, Client, TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import models, profiling
+from core.testing import create_user
+
+def authorization(user):
+    """Returns the Authorization header of a user"""
+    return f"Bearer {AccessToken.for_user(user)}"
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_RATE_LIMIT=10)
+class ValidScenariosProfilingTests(TestCase):
+    """This class is built to test staff users get a profile of the requests they ask for"""
+
+    def setUp(self):
+        cache.clear()
+        self.staff = create_user("staff@example.com", is_staff=True)
+        self.client = Client(HTTP_AUTHORIZATION=authorization(self.staff))
+        models.StoriesModel.objects.create(user=self.staff, title="Test story")
+
+    def test_profile_is_stored_and_retrievable(self):
+        """Test ?profile=1 returns the URL of a profile with the functions and allocations of the request"""
+        # Act
+        response = self.client.get(reverse("stories"), {"profile": "1"})
+        profile_response = self.client.get(response["X-Profile-Url"])
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["X-Profile-Url"].startswith("http://testserver/api/profiles/"))
+        self.assertEqual(profile_response.status_code, 200)
+        profile = json.loads(profile_response.content)["Profile retrieved successfully✅"]
+        self.assertEqual(profile["path"], "/api/stories/?profile=1")
+        self.assertEqual(profile["status_code"], 200)
+        self.assertEqual(profile["user_id"], self.staff.pk)
+        self.assertIn("cumulative", profile["profile"])
+        self.assertGreater(profile["function_calls"], 0)
+        self.assertGreater(profile["peak_memory_bytes"], 0)
+        self.assertTrue(profile["allocations"])
+
+    def test_profile_requested_by_header(self):
+        """Test the X-Profile header asks for a profile like the query parameter"""
+        # Act
+        response = self.client.get(reverse("stories"), headers={"X-Profile": "1"})
+
+        # Assert
+        self.assertIn("X-Profile-Url", response)
+
+    def test_profile_of_session_staff_user(self):
+        """Test a staff user logged in with a session (e.g. the admin) can profile a request"""
+        # Arrange
+        client = Client()
+        client.force_login(self.staff)
+
+        # Act
+        response = client.get(reverse("dashboard-endpoint"), {"profile": "1"})
+
+        # Assert
+        self.assertIn("X-Profile-Url", response)
+
+class InvalidScenariosProfilingTests(TestCase):
+    """This class is built to test profiling is refused to other users and rate limited"""
+
+    def setUp(self):
+        cache.clear()
+        self.staff = create_user("staff@example.com", is_staff=True)
+        self.user = create_user("user@example.com")
+
+    def test_non_staff_user_is_not_profiled(self):
+        """Test the request of a user who is not staff is served without profile"""
+        # Act
+        response = Client().get(reverse("stories"), {"profile": "1"}, HTTP_AUTHORIZATION=authorization(self.user))
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Url", response)
+        self.assertNotIn("X-Profile-Skipped", response)
+
+    def test_anonymous_request_is_not_profiled(self):
+        """Test a request without credentials (or with an invalid token) is served without profile"""
+        # Act
+        anonymous = Client().get(reverse("dashboard-endpoint"), {"profile": "1"})
+        invalid = Client().get(reverse("dashboard-endpoint"), {"profile": "1"}, HTTP_AUTHORIZATION="Bearer invalid")
+
+        # Assert
+        self.assertNotIn("X-Profile-Url", anonymous)
+        self.assertNotIn("X-Profile-Url", invalid)
+
+    @override_settings(PROFILING_RATE_LIMIT=1)
+    def test_profiles_are_rate_limited(self):
+        """Test a staff user asking for more profiles than the rate limit is served without them"""
+        # Arrange
+        client = Client(HTTP_AUTHORIZATION=authorization(self.staff))
+
+        # Act
+        first = client.get(reverse("stories"), {"profile": "1"})
+        second = client.get(reverse("stories"), {"profile": "1"})
+
+        # Assert
+        self.assertIn("X-Profile-Url", first)
+        self.assertEqual(second.status_code, 200)
+        self.assertNotIn("X-Profile-Url", second)
+        self.assertEqual(second["X-Profile-Skipped"], "rate-limited")
+
+    def test_one_profile_at_a_time(self):
+        """Test a request is not profiled while another profile is running in the process"""
+        # Arrange
+        client = Client(HTTP_AUTHORIZATION=authorization(self.staff))
+
+        # Act
+        with profiling._profiling_lock:
+            response = client.get(reverse("stories"), {"profile": "1"})
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Profile-Skipped"], "busy")
+
+    def test_profile_is_staff_only(self):
+        """Test a user who is not staff cannot read a profile, and an unknown profile is not found"""
+        # Arrange
+        response = Client().get(reverse("stories"), {"profile": "1"}, HTTP_AUTHORIZATION=authorization(self.staff))
+
+        # Act
+        forbidden = Client().get(response["X-Profile-Url"], HTTP_AUTHORIZATION=authorization(self.user))
+        missing = Client().get(
+            reverse("profile-details", args=["does-not-exist"]), HTTP_AUTHORIZATION=authorization(self.staff)
+        )
+
+        # Assert
+        self.assertEqual(forbidden.status_code, 403)
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_async_requests_are_not_profiled(self):
+        """Test async requests are not profiled, the profilers would measure the whole event loop"""
+        # Act
+        response = await AsyncClient().get(
+            reverse("async-stories"), {"profile": "1"}, headers={"Authorization": authorization(self.staff)}
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Profile-Skipped"], "async")
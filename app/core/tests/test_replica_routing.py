@@ -0,0 +1,196 @@
+"""
+This file tests the routing of reads to the read replicas and the sync of SQLite replicas
+"""
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from rest_framework.request import Request
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import models, routers
+from core.authentication import ClaimsJWTAuthentication, ClaimsRefreshToken
+from core.management.commands.sync_replicas import backup_database
+from core.middleware import ReplicaRoutingMiddleware
+from core.testing import create_user
+
+# TransactionTestCase: inside TestCase's transaction every read would stay on the default database
+@override_settings(DATABASE_REPLICAS=["replica1"], DATABASE_REPLICA_STICKY_SECONDS=5)
+class ValidScenariosReplicaRoutingTests(TransactionTestCase):
+    """This class is built to test reads go to a replica unless the client wrote recently"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("replica@example.com")
+        self.router = routers.ReplicaRouter()
+        self.factory = RequestFactory()
+        self.authorization = f"Bearer {AccessToken.for_user(self.user)}"
+
+    def run_middleware(self, method):
+        """Runs a request through the middleware and returns whether its reads used the replicas"""
+        seen = {}
+
+        def get_response(request):
+            seen["replica_reads"] = routers.replica_reads_enabled()
+            return HttpResponse()
+
+        request = getattr(self.factory, method)("/api/stories/", HTTP_AUTHORIZATION=self.authorization)
+        ReplicaRoutingMiddleware(get_response)(request)
+        return seen["replica_reads"]
+
+    def test_reads_use_replica_when_enabled(self):
+        """Test reads go to a replica inside use_replicas and to the default database outside"""
+        # Act
+        with routers.use_replicas():
+            replica_alias = self.router.db_for_read(models.StoriesModel)
+        default_alias = self.router.db_for_read(models.StoriesModel)
+
+        # Assert
+        self.assertEqual(replica_alias, "replica1")
+        self.assertIsNone(default_alias)
+        self.assertEqual(self.router.db_for_write(models.StoriesModel), "default")
+
+    def test_reads_inside_transaction_use_default(self):
+        """Test reads inside an atomic block stay on the default database"""
+        # Act
+        with routers.use_replicas(), transaction.atomic():
+            alias = self.router.db_for_read(models.StoriesModel)
+
+        # Assert
+        self.assertEqual(alias, "default")
+
+    def test_replicas_are_not_migrated(self):
+        """Test migrations never run on a replica"""
+        # Assert
+        self.assertFalse(self.router.allow_migrate("replica1", "core"))
+        self.assertIsNone(self.router.allow_migrate("default", "core"))
+
+    def test_safe_request_reads_from_replica(self):
+        """Test a GET reads from the replicas"""
+        # Act
+        replica_reads = self.run_middleware("get")
+
+        # Assert
+        self.assertTrue(replica_reads)
+
+    def test_unsafe_request_makes_client_sticky(self):
+        """Test a GET right after a POST of the same user reads from the default database"""
+        # Act
+        write_replica_reads = self.run_middleware("post")
+        read_replica_reads = self.run_middleware("get")
+
+        # Assert
+        self.assertFalse(write_replica_reads)
+        self.assertFalse(read_replica_reads)
+
+    def test_stickiness_is_per_user(self):
+        """Test a write of one user does not make other users sticky"""
+        # Arrange
+        self.run_middleware("post")
+        other_user = create_user("other-replica@example.com")
+        self.authorization = f"Bearer {AccessToken.for_user(other_user)}"
+
+        # Act
+        replica_reads = self.run_middleware("get")
+
+        # Assert
+        self.assertTrue(replica_reads)
+
+    def test_stickiness_is_shared_by_the_workers(self):
+        """Test a read handled by another worker than the write (another cache connection) reads from the default database"""
+        # Arrange
+        with mock.patch("core.routers.cache", caches.create_connection("default")):
+            self.run_middleware("post")
+
+        # Act
+        with mock.patch("core.routers.cache", caches.create_connection("default")):
+            replica_reads = self.run_middleware("get")
+
+        # Assert
+        self.assertFalse(replica_reads)
+
+    def test_token_is_decoded_once_per_request(self):
+        """Test DRF's authentication reuses the token the middleware decoded"""
+        # Arrange
+        self.authorization = f"Bearer {ClaimsRefreshToken.for_user(self.user).access_token}"
+        authenticated = {}
+
+        def get_response(request):
+            authenticated["user"], _ = ClaimsJWTAuthentication().authenticate(Request(request))
+            return HttpResponse()
+
+        request = self.factory.get("/api/stories/", HTTP_AUTHORIZATION=self.authorization)
+
+        # Act
+        with mock.patch.object(
+            ClaimsJWTAuthentication, "get_validated_token", autospec=True,
+            side_effect=ClaimsJWTAuthentication.get_validated_token,
+        ) as get_validated_token:
+            ReplicaRoutingMiddleware(get_response)(request)
+
+        # Assert
+        self.assertEqual(get_validated_token.call_count, 1)
+        self.assertEqual(authenticated["user"].pk, self.user.pk)
+
+    @override_settings(DATABASE_REPLICA_STICKY_SECONDS=0)
+    def test_stickiness_expires(self):
+        """Test a client reads from the replicas again once the sticky window is over"""
+        # Arrange
+        self.run_middleware("post")
+
+        # Act
+        replica_reads = self.run_middleware("get")
+
+        # Assert
+        self.assertTrue(replica_reads)
+
+class InvalidScenariosReplicaRoutingTests(TestCase):
+    """This class is built to test routing is a no-op without replicas"""
+
+    def test_no_replicas_reads_default(self):
+        """Test reads are not routed when no replica is configured"""
+        # Act
+        with override_settings(DATABASE_REPLICAS=[]), routers.use_replicas():
+            alias = routers.ReplicaRouter().db_for_read(models.StoriesModel)
+
+        # Assert
+        self.assertIsNone(alias)
+
+    def test_invalid_token_is_not_an_identity(self):
+        """Test a request with a bad token has no identity and is never sticky"""
+        # Arrange
+        request = RequestFactory().get("/api/stories/", HTTP_AUTHORIZATION="Bearer not-a-token")
+
+        # Act
+        identity = routers.get_request_identity(request)
+
+        # Assert
+        self.assertIsNone(identity)
+        self.assertFalse(routers.is_sticky(identity))
+
+class ValidScenariosSyncReplicasTests(TestCase):
+    """This class is built to test SQLite replicas are refreshed with the backup API"""
+
+    def test_backup_copies_rows(self):
+        """Test the replica sees the rows of the primary after a sync"""
+        # Arrange
+        directory = tempfile.mkdtemp()
+        primary_path = os.path.join(directory, "primary.sqlite3")
+        replica_path = os.path.join(directory, "replica.sqlite3")
+        with sqlite3.connect(primary_path) as primary:
+            primary.execute("CREATE TABLE story (title TEXT)")
+            primary.execute("INSERT INTO story VALUES ('Copied story')")
+        primary.close()
+
+        # Act
+        backup_database(primary_path, replica_path)
+
+        # Assert
+        replica = sqlite3.connect(replica_path)
+        self.assertEqual(replica.execute("SELECT title FROM story").fetchall(), [("Copied story",)])
+        replica.close()
@@ -0,0 +1,122 @@
+"""
+This file tests the request timing middleware (Server-Timing header and structured logs)
+"""
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import models, timing
+from core.testing import create_user
+
+SERVER_TIMING = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) queries", view;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+$'
+)
+
+@override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0, REQUEST_TIMING_HEADER=True, REQUEST_TIMING_LOG_THRESHOLD_MS=0)
+class ValidScenariosRequestTimingTests(TestCase):
+    """This class is built to test measured requests report their timings"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("timing@example.com")
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.client = Client()
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+        models.PointsModel.objects.create(story=self.story, content="Test point")
+        self.url = reverse("story-points", args=[self.story.story_id])
+
+    def test_server_timing_header_counts_queries(self):
+        """Test the Server-Timing header holds the number of queries of the request"""
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, **self.headers)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        match = SERVER_TIMING.match(response["Server-Timing"])
+        self.assertIsNotNone(match)
+        self.assertEqual(int(match.group(1)), len(queries))
+
+    def test_measures_are_logged_as_fields(self):
+        """Test a measured request is logged with its measures as structured fields"""
+        # Act
+        with self.assertLogs("core.timing", level="INFO") as logs:
+            self.client.get(self.url, **self.headers)
+
+        # Assert
+        record = logs.records[0]
+        self.assertEqual(record.http_method, "GET")
+        self.assertEqual(record.http_path, self.url)
+        self.assertEqual(record.http_status, 200)
+        self.assertEqual(record.url_name, "story-points")
+        self.assertGreater(record.db_queries, 0)
+        self.assertGreaterEqual(record.total_ms, record.view_ms)
+        self.assertGreaterEqual(record.view_ms, 0)
+        self.assertGreater(record.render_ms, 0)
+
+    async def test_async_view_queries_are_counted(self):
+        """Test the queries an async view runs in sync_to_async threads are counted"""
+        # Act
+        response = await AsyncClient().get(
+            reverse("async-story-points", args=[self.story.story_id]),
+            headers={"Authorization": self.headers["HTTP_AUTHORIZATION"]},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        match = SERVER_TIMING.match(response["Server-Timing"])
+        self.assertIsNotNone(match)
+        self.assertGreater(int(match.group(1)), 0)
+
+    def test_queries_outside_requests_are_not_recorded(self):
+        """Test queries made outside a measured request leave no timing behind"""
+        # Act
+        models.StoriesModel.objects.count()
+
+        # Assert
+        self.assertIsNone(timing.get_current_timing())
+
+class InvalidScenariosRequestTimingTests(TestCase):
+    """This class is built to test requests that are not measured or reported"""
+
+    def setUp(self):
+        self.user = create_user("timing@example.com")
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.client = Client()
+        self.url = reverse("stories")
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_measured(self):
+        """Test a request left out of the sample has no header and is not logged"""
+        # Act
+        with self.assertNoLogs("core.timing", level="INFO"):
+            response = self.client.get(self.url, **self.headers)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0, REQUEST_TIMING_HEADER=False)
+    def test_header_can_be_disabled(self):
+        """Test measured requests are still logged when the header is disabled"""
+        # Act
+        with self.assertLogs("core.timing", level="INFO"):
+            response = self.client.get(self.url, **self.headers)
+
+        # Assert
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0, REQUEST_TIMING_LOG_THRESHOLD_MS=60000)
+    def test_fast_request_is_not_logged(self):
+        """Test requests faster than the log threshold only get the header"""
+        # Act
+        with self.assertNoLogs("core.timing", level="INFO"):
+            response = self.client.get(self.url, **self.headers)
+
+        # Assert
+        self.assertIn("Server-Timing", response)
@@ -0,0 +1,197 @@
+"""
+This file tests the versioned cache of the story read endpoints
+"""
+import json
+import os
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import metrics, models
+from core.cache import reset_stats
+from core.testing import create_user
+
+class ValidScenariosResponseCacheTests(TestCase):
+    """This class is built to test the cached responses are served and invalidated"""
+
+    def setUp(self):
+        cache.clear()
+        reset_stats()
+        self.user = create_user("cache@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+        self.script = models.ScriptsModel.objects.create(story=self.story, content="First draft")
+        models.PointsModel.objects.create(story=self.story, content="First point")
+
+    def test_repeated_get_is_served_from_cache(self):
+        """Test a repeated GET makes no queries and returns the same body"""
+        # Arrange
+        url = reverse("story-script", args=[self.story.story_id])
+        first_response = self.client.get(url)
+
+        # Act
+        with self.assertNumQueries(0):
+            second_response = self.client.get(url)
+
+        # Assert
+        self.assertEqual(second_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(second_response.content, first_response.content)
+
+    def test_write_invalidates_cached_response(self):
+        """Test a write to the story is visible on the next GET"""
+        # Arrange
+        url = reverse("story-script", args=[self.story.story_id])
+        self.client.get(url)
+
+        # Act
+        self.client.patch(url, {"content": "Second draft"}, format="json")
+        response = self.client.get(url)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["Script retrieved successfully✅"]["content"], "Second draft")
+
+    def test_bulk_write_invalidates_cached_response(self):
+        """Test a bulk points create (which sends no model signals) is visible on the next GET"""
+        # Arrange
+        url = reverse("story-points", args=[self.story.story_id])
+        self.client.get(url)
+
+        # Act
+        self.client.post(url, [{"content": "Second point"}, {"content": "Third point"}], format="json")
+        response = self.client.get(url)
+
+        # Assert
+        self.assertEqual(len(response.json()["Points retrieved successfully✅"]), 3)
+
+    def test_shared_record_update_invalidates_every_story(self):
+        """Test updating a link shared by two stories invalidates both stories"""
+        # Arrange
+        other_story = models.StoriesModel.objects.create(user=self.user, title="Other story")
+        link = models.LinksModel.objects.create(title="Shared link", description="Test link")
+        models.StoryLinkModel.objects.create(story=self.story, link=link)
+        models.StoryLinkModel.objects.create(story=other_story, link=link)
+        urls = [reverse("story-links", args=[story.story_id]) for story in (self.story, other_story)]
+        for url in urls:
+            self.client.get(url)
+
+        # Act
+        link.title = "Renamed link"
+        link.save()
+
+        # Assert
+        for url in urls:
+            self.assertIn("Renamed link", self.client.get(url).content.decode())
+
+    def test_cached_response_is_not_shared_between_users(self):
+        """Test another user does not get a cached response of a story that is not theirs"""
+        # Arrange
+        url = reverse("story-script", args=[self.story.story_id])
+        self.client.get(url)
+        other_client = APIClient()
+        other_client.force_authenticate(user=create_user("other@example.com"))
+
+        # Act
+        response = other_client.get(url)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stats_count_hits_and_misses(self):
+        """Test the statistics endpoint reports the hits and misses"""
+        # Arrange
+        url = reverse("story-points", args=[self.story.story_id])
+        self.client.get(url)
+        self.client.get(url)
+        self.client.force_authenticate(user=create_user("staff@example.com", is_staff=True))
+
+        # Act
+        response = self.client.get(reverse("cache-stats"))
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["Response cache statistics:"], {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+    def test_write_on_one_worker_invalidates_every_worker(self):
+        """Test a write handled by one worker's cache is seen by a worker reading through another cache"""
+        # Arrange
+        url = reverse("story-script", args=[self.story.story_id])
+        # Two connections to the same cache, as two worker processes have
+        first_worker, second_worker = caches.create_connection("default"), caches.create_connection("default")
+        with mock.patch("core.cache.cache", first_worker):
+            self.client.get(url)
+
+        # Act
+        with mock.patch("core.cache.cache", second_worker):
+            self.client.patch(url, {"content": "Second draft"}, format="json")
+        with mock.patch("core.cache.cache", first_worker):
+            response = self.client.get(url)
+
+        # Assert
+        self.assertEqual(response.json()["Script retrieved successfully✅"]["content"], "Second draft")
+
+    def test_stats_cover_every_worker(self):
+        """Test the statistics add up the lookups of every worker process (their metrics files)"""
+        # Arrange
+        url = reverse("story-points", args=[self.story.story_id])
+        self.client.get(url)
+        other_process = {"buckets": [], "cache": [["story-points", "hit", 3], ["story-script", "miss", 1]]}
+        path = metrics.get_directory() / "metrics-999999.json"
+        path.write_text(json.dumps(other_process))
+        self.addCleanup(os.remove, path)
+        self.client.force_authenticate(user=create_user("staff@example.com", is_staff=True))
+
+        # Act
+        response = self.client.get(reverse("cache-stats"))
+
+        # Assert
+        self.assertEqual(response.data["Response cache statistics:"], {"hits": 3, "misses": 2, "hit_ratio": 0.6})
+
+    def test_lookups_do_not_write_to_the_cache(self):
+        """Test a cached GET only reads the shared cache (the counters are kept per process)"""
+        # Arrange
+        url = reverse("story-points", args=[self.story.story_id])
+        self.client.get(url)
+
+        # Act
+        with mock.patch.object(cache, "set") as cache_set, mock.patch.object(cache, "incr") as cache_incr:
+            response = self.client.get(url)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        cache_set.assert_not_called()
+        cache_incr.assert_not_called()
+
+    def test_reset_sets_the_counters_back_to_zero(self):
+        """Test DELETE on the statistics endpoint starts the counters from zero"""
+        # Arrange
+        url = reverse("story-points", args=[self.story.story_id])
+        self.client.get(url)
+        self.client.get(url)
+        self.client.force_authenticate(user=create_user("staff@example.com", is_staff=True))
+
+        # Act
+        response = self.client.delete(reverse("cache-stats"))
+
+        # Assert
+        self.assertEqual(response.data["Response cache statistics reset✅"], {"hits": 0, "misses": 0, "hit_ratio": None})
+
+class InvalidScenariosResponseCacheTests(TestCase):
+    """This class is built to test the cache statistics endpoint is restricted"""
+
+    def test_stats_require_staff_user(self):
+        """Test a regular user cannot read the cache statistics"""
+        # Arrange
+        client = APIClient()
+        client.force_authenticate(user=create_user("regular@example.com"))
+
+        # Act
+        response = client.get(reverse("cache-stats"))
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
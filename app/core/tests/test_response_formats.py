@@ -0,0 +1,166 @@
+"""
+This file tests the MessagePack format and the compact envelope of the API responses
+"""
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models
+from core.renderers import compact_envelope, msgpack
+from core.testing import create_user
+
+class ValidScenariosCompactEnvelopeTests(TestCase):
+    """This class is built to test the compact envelope returns the bare data"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("envelope@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Envelope story")
+        models.PointsModel.objects.create(story=self.story, content="First point")
+        models.VAKSModel.objects.create(story=self.story, sight="a", sound="b", smell="c", taste="d", touch="e", emotion="f")
+        self.points_url = reverse("story-points", args=[self.story.story_id])
+
+    def test_query_parameter_returns_bare_data(self):
+        """Test ?envelope=compact returns the data without its message key"""
+        # Arrange
+        full_response = self.client.get(self.points_url)
+
+        # Act
+        response = self.client.get(self.points_url, {"envelope": "compact"})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), full_response.json()["Points retrieved successfully✅"])
+
+    def test_accept_parameter_returns_bare_data(self):
+        """Test Accept: application/json; envelope=compact returns the bare data (cached apart from the full body)"""
+        # Arrange
+        full_response = self.client.get(self.points_url)
+
+        # Act
+        response = self.client.get(self.points_url, HTTP_ACCEPT="application/json; envelope=compact")
+
+        # Assert
+        self.assertEqual(response.json(), full_response.json()["Points retrieved successfully✅"])
+        self.assertIn("Points retrieved successfully✅", self.client.get(self.points_url).json())
+
+    def test_stories_list_keeps_pagination_links(self):
+        """Test the compact stories list has its results and links"""
+        # Act
+        response = self.client.get(reverse("stories"), {"envelope": "compact"})
+
+        # Assert
+        self.assertEqual(list(response.json()), ["results", "next", "previous"])
+        self.assertEqual(response.json()["results"][0]["title"], "Envelope story")
+
+    def test_message_only_response_has_no_body(self):
+        """Test a response made only of messages has no data"""
+        # Act
+        data = compact_envelope({"Success ✅": "VAKS has been deleted"}, 200)
+
+        # Assert
+        self.assertIsNone(data)
+
+class InvalidScenariosCompactEnvelopeTests(TestCase):
+    """This class is built to test errors in the compact envelope"""
+
+    def setUp(self):
+        self.user = create_user("envelope-errors@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_error_message_is_under_errors(self):
+        """Test an error made of a message is returned under "errors\""""
+        # Act
+        response = self.client.get(reverse("story-points", args=[999]), {"envelope": "compact"})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {"errors": "Story not found"})
+
+    def test_error_details_replace_message(self):
+        """Test the details of an error are kept rather than its message"""
+        # Act
+        data = compact_envelope({"Error❌": "VAKS update failed", "Details": {"sight": ["Required"]}}, 400)
+
+        # Assert
+        self.assertEqual(data, {"errors": {"sight": ["Required"]}})
+
+@skipUnless(msgpack, "msgpack is not installed")
+class ValidScenariosMessagePackTests(TestCase):
+    """This class is built to test the API answers and reads MessagePack"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("msgpack@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="MessagePack story ✅")
+        for number in range(20):
+            models.PointsModel.objects.create(story=self.story, content=f"Point {number}")
+        self.points_url = reverse("story-points", args=[self.story.story_id])
+
+    def test_msgpack_response_holds_json_data(self):
+        """Test Accept: application/msgpack returns the same data as JSON"""
+        # Arrange
+        json_response = self.client.get(self.points_url)
+
+        # Act
+        response = self.client.get(self.points_url, HTTP_ACCEPT="application/msgpack")
+
+        # Assert
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(response.content), json_response.json())
+
+    def test_compact_msgpack_is_smallest(self):
+        """Test compact MessagePack is smaller than the full JSON and MessagePack bodies"""
+        # Act
+        json_body = self.client.get(self.points_url).content
+        msgpack_body = self.client.get(self.points_url, {"format": "msgpack"}).content
+        compact_body = self.client.get(self.points_url, HTTP_ACCEPT="application/msgpack; envelope=compact").content
+
+        # Assert
+        self.assertLess(len(msgpack_body), len(json_body))
+        self.assertLess(len(compact_body), len(msgpack_body))
+        self.assertEqual(msgpack.unpackb(compact_body)[0]["content"], "Point 0")
+
+    def test_msgpack_request_body(self):
+        """Test points can be created from a MessagePack body"""
+        # Act
+        response = self.client.post(
+            self.points_url,
+            msgpack.packb([{"content": "Packed point"}]),
+            content_type="application/msgpack",
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(models.PointsModel.objects.filter(story=self.story, content="Packed point").exists())
+
+@skipUnless(msgpack, "msgpack is not installed")
+class InvalidScenariosMessagePackTests(TestCase):
+    """This class is built to test malformed MessagePack bodies are rejected"""
+
+    def setUp(self):
+        self.user = create_user("msgpack-errors@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="MessagePack story")
+
+    def test_malformed_body_is_rejected(self):
+        """Test a body that is not MessagePack gets a 400"""
+        # Act
+        response = self.client.post(
+            reverse("story-points", args=[self.story.story_id]),
+            b"\xc1\x00",
+            content_type="application/msgpack",
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
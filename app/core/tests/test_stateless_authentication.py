@@ -0,0 +1,254 @@
+"""
+This file tests the JWT authentication building request.user from the token's claims
+"""
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import models
+from core.authentication import ClaimsJWTAuthentication, ClaimsRefreshToken, user_cache
+from core.testing import create_user
+from django.contrib.auth import get_user_model
+
+def user_queries(queries):
+    """Returns the queries reading the users table"""
+    table = get_user_model()._meta.db_table
+    return [query for query in queries if f'FROM "{table}"' in query["sql"]]
+
+class ValidScenariosStatelessAuthenticationTests(TestCase):
+    """This class is built to test requests are authenticated from the token's claims"""
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = create_user("claims@example.com")
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+        self.client = Client(HTTP_AUTHORIZATION=f"Bearer {ClaimsRefreshToken.for_user(self.user).access_token}")
+
+    def test_claims_token_makes_no_user_query(self):
+        """Test a request with a claims token does not read the user's row"""
+        # Act
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("story-details", args=[self.story.story_id]))
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_queries(context.captured_queries), [])
+
+    def test_claims_user_has_the_user_primary_key(self):
+        """Test the user built from the claims has the same primary key (type included) as the row"""
+        # Arrange
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+
+        # Act
+        user = ClaimsJWTAuthentication().get_user(token)
+
+        # Assert
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user, self.user)
+
+    def test_staff_permission_comes_from_the_claim(self):
+        """Test the is_staff claim grants the staff endpoints without a query"""
+        # Arrange
+        self.user.is_staff = True
+        self.user.save()
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {ClaimsRefreshToken.for_user(self.user).access_token}")
+
+        # Act
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(reverse("cache-stats"))
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_queries(context.captured_queries), [])
+
+    def test_login_and_refresh_issue_claims(self):
+        """Test the login tokens carry the claims, and a refresh gives them the user's current values"""
+        # Arrange
+        login = self.client.post(
+            reverse("token-obtain-pair-endpoint"), {"email": "claims@example.com", "password": "Testpass123"},
+        )
+        refresh = json.loads(login.content)["refresh"]
+        self.user.is_staff = True
+        self.user.save()
+
+        # Act
+        response = self.client.post(reverse("token-refresh-endpoint"), {"refresh": refresh})
+
+        # Assert
+        self.assertEqual(login.status_code, 200)
+        self.assertIs(AccessToken(json.loads(login.content)["access"])["is_staff"], False)
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(AccessToken(json.loads(response.content)["access"])["is_staff"], True)
+
+    def test_refresh_loads_the_user_and_checks_the_token_once(self):
+        """Test a refresh reads the user's row once and verifies the given token once"""
+        # Arrange
+        refresh = str(ClaimsRefreshToken.for_user(self.user))
+
+        # Act
+        with mock.patch("core.revocation.check_token") as check_token:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(reverse("token-refresh-endpoint"), {"refresh": refresh})
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(user_queries(context.captured_queries)), 1)
+        self.assertEqual(check_token.call_count, 1)
+
+    def test_profile_is_served_from_the_user_cache(self):
+        """Test the user profile reads the row once, then from the cache until the user changes"""
+        # Act
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(reverse("user-profile-endpoint"))
+        with CaptureQueriesContext(connection) as second:
+            self.client.get(reverse("user-profile-endpoint"))
+        self.user.city = "paris"
+        self.user.save()
+        with CaptureQueriesContext(connection) as changed:
+            response = self.client.get(reverse("user-profile-endpoint"))
+
+        # Assert
+        self.assertEqual(len(user_queries(first.captured_queries)), 1)
+        self.assertEqual(user_queries(second.captured_queries), [])
+        self.assertEqual(len(user_queries(changed.captured_queries)), 1)
+        self.assertEqual(json.loads(response.content)["User information"]["city"], "paris")
+
+    def test_token_without_claims_is_authenticated_from_the_cache(self):
+        """Test a token issued without the claims still authenticates its user"""
+        # Arrange
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+        # Act
+        response = client.get(reverse("story-details", args=[self.story.story_id]))
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(USER_CACHE_SIZE=2)
+    def test_user_cache_is_bounded(self):
+        """Test the cache keeps the USER_CACHE_SIZE most recently used users"""
+        # Arrange
+        users = [self.user, create_user("second@example.com"), create_user("third@example.com")]
+
+        # Act
+        for user in users:
+            user_cache.get(user.pk)
+
+        # Assert
+        self.assertEqual(list(user_cache.users), [str(users[1].pk), str(users[2].pk)])
+
+    def test_user_cache_entries_expire(self):
+        """Test a cached user is read again after USER_CACHE_SECONDS"""
+        # Arrange
+        user_cache.get(self.user.pk)
+
+        # Act
+        with mock.patch("core.authentication.time.monotonic", return_value=10**9):
+            with self.assertNumQueries(1):
+                user_cache.get(self.user.pk)
+
+class InvalidScenariosStatelessAuthenticationTests(TestCase):
+    """This class is built to test deleted and inactive users are refused"""
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = create_user("claims@example.com")
+
+    def test_deleted_user_without_claims_is_refused(self):
+        """Test a token without claims of a deleted user is refused"""
+        # Arrange
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        self.user.delete()
+
+        # Act
+        response = client.get(reverse("stories"))
+
+        # Assert
+        self.assertEqual(response.status_code, 401)
+
+    def test_inactive_user_without_claims_is_refused(self):
+        """Test a token without claims of an inactive user is refused"""
+        # Arrange
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        self.user.is_active = False
+        self.user.save()
+
+        # Act
+        response = client.get(reverse("stories"))
+
+        # Assert
+        self.assertEqual(response.status_code, 401)
+
+    def test_profile_of_user_deleted_by_another_process_is_not_found(self):
+        """Test the profile of a user deleted by another process after the claims token was issued is not found"""
+        # Arrange
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {ClaimsRefreshToken.for_user(self.user).access_token}")
+        user_id = self.user.pk
+        self.user.delete()
+        # The delete signal only ran in this process
+        user_cache.enable(user_id)
+
+        # Act
+        response = client.get(reverse("user-profile-endpoint"))
+
+        # Assert
+        self.assertEqual(response.status_code, 404)
+
+    def test_refresh_of_deleted_user_is_refused(self):
+        """Test a refresh token of a deleted user is not refreshed"""
+        # Arrange
+        refresh = ClaimsRefreshToken.for_user(self.user)
+        self.user.delete()
+
+        # Act
+        response = Client().post(reverse("token-refresh-endpoint"), {"refresh": str(refresh)})
+
+        # Assert
+        self.assertEqual(response.status_code, 401)
+
+    def test_claims_token_of_deleted_user_is_refused(self):
+        """Test a claims token of a user deleted after it was issued is refused"""
+        # Arrange
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {ClaimsRefreshToken.for_user(self.user).access_token}")
+        self.user.delete()
+
+        # Act
+        response = client.get(reverse("stories"))
+
+        # Assert
+        self.assertEqual(response.status_code, 401)
+
+    def test_claims_token_of_inactive_user_is_refused(self):
+        """Test a claims token of a user made inactive after it was issued is refused"""
+        # Arrange
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {ClaimsRefreshToken.for_user(self.user).access_token}")
+        self.user.is_active = False
+        self.user.save()
+
+        # Act
+        response = client.get(reverse("stories"))
+
+        # Assert
+        self.assertEqual(response.status_code, 401)
+
+    def test_claims_token_of_reactivated_user_is_trusted_again(self):
+        """Test the claims of a user made active again are used without a query"""
+        # Arrange
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {ClaimsRefreshToken.for_user(self.user).access_token}")
+        self.user.is_active = False
+        self.user.save()
+        self.user.is_active = True
+        self.user.save()
+
+        # Act
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(reverse("stories"))
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_queries(context.captured_queries), [])
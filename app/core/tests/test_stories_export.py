@@ -0,0 +1,122 @@
+"""
+This file tests the NDJSON export of a user's stories
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import models
+from core.testing import create_user
+
+class ValidScenariosStoriesExportTests(TestCase):
+    """This class is built to test exporting every story of a user"""
+
+    def setUp(self):
+        self.user = create_user("export@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("stories-export")
+
+    def add_stories(self, count):
+        """Adds count stories, each with an incident, a person and a point"""
+        start = models.StoriesModel.objects.count()
+        for number in range(start, start + count):
+            story = models.StoriesModel.objects.create(user=self.user, title=f"Story {number}")
+            incident = models.IncidentsModel.objects.create(
+                story=story,
+                incident_what="Test what",
+                incident_where="Test where",
+                incident_when=timezone.now(),
+            )
+            person = models.PeoplesModel.objects.create(first_name=f"Person {number}", type="friend")
+            models.PeopleIncidentModel.objects.create(person=person, incident=incident)
+            models.PointsModel.objects.create(story=story, content=f"Point {number}")
+
+    def read_lines(self, response):
+        """Consumes the streamed response and returns the decoded lines"""
+        return [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    def test_export_streams_one_full_story_per_line(self):
+        """Test the export is newline delimited JSON with a full story per line"""
+        # Arrange
+        self.add_stories(3)
+
+        # Act
+        response = self.client.get(self.url)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = self.read_lines(response)
+        self.assertEqual([line["title"] for line in lines], ["Story 0", "Story 1", "Story 2"])
+        self.assertEqual(lines[0]["people"][0]["first_name"], "Person 0")
+        self.assertEqual(lines[0]["points"][0]["content"], "Point 0")
+        self.assertIsNone(lines[0]["script"])
+
+    @override_settings(STORIES_EXPORT_CHUNK_SIZE=2)
+    def test_export_query_count_grows_per_chunk_not_per_story(self):
+        """Test the children are prefetched once per chunk of stories"""
+        # Arrange
+        self.add_stories(4)
+
+        # Act / Assert
+        # savepoint, one stories query read in chunks, 2 chunks x 6 children prefetches, release savepoint
+        response = self.client.get(self.url)
+        with self.assertNumQueries(15):
+            lines = self.read_lines(response)
+        self.assertEqual(len(lines), 4)
+
+    @override_settings(STORIES_EXPORT_CHUNK_SIZE=2)
+    async def test_export_is_streamed_asynchronously_under_asgi(self):
+        """Test the ASGI export streams from an async iterator, with the same lines as the WSGI one"""
+        # Arrange
+        await sync_to_async(self.add_stories)(3)
+        expected = await sync_to_async(lambda: b"".join(self.client.get(self.url).streaming_content))()
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+        # Act
+        response = await AsyncClient().get(self.url, headers=headers)
+
+        # Assert
+        self.assertTrue(response.is_async)
+        self.assertEqual(b"".join([chunk async for chunk in response.streaming_content]), expected)
+
+    def test_export_without_stories_is_empty(self):
+        """Test a user without stories gets an empty export"""
+        # Act
+        response = self.client.get(self.url)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.read_lines(response), [])
+
+class InvalidScenariosStoriesExportTests(TestCase):
+    """This class is built to test the export is restricted to the user's own stories"""
+
+    def test_export_excludes_other_users_stories(self):
+        """Test another user's stories are not exported"""
+        # Arrange
+        owner = create_user("export-owner@example.com")
+        models.StoriesModel.objects.create(user=owner, title="Private story")
+        client = APIClient()
+        client.force_authenticate(user=create_user("export-other@example.com"))
+
+        # Act
+        response = client.get(reverse("stories-export"))
+
+        # Assert
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+    def test_export_requires_authentication(self):
+        """Test an anonymous user cannot export stories"""
+        # Act
+        response = APIClient().get(reverse("stories-export"))
+
+        # Assert
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,200 @@
+"""
+This file tests the NDJSON import of stories (endpoint and management command)
+"""
+import json
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import models
+from core.importer import StoryImporter
+from core.testing import create_user
+
+def story_line(number, **overrides):
+    """Returns one NDJSON line holding a full story"""
+    story = {
+        "title": f"Story {number}",
+        "incident": {"incident_what": "Test what", "incident_where": "Test where", "incident_when": "2024-01-01T10:00:00Z"},
+        "people": [{"first_name": f"Person {number}", "type": "friend"}, {"first_name": "Shared person", "type": "friend"}],
+        "vaks": {"sight": "a", "sound": "b", "smell": "c", "taste": "d", "touch": "e", "emotion": "f"},
+        "points": [{"content": f"Point {number}"}, {"content": "Another point"}],
+        "script": {"content": f"Script {number}"},
+        "links": [{"title": "Shared link", "description": "Test link"}],
+        "characters": [{"body_language": "calm", "dialog": f"Line {number}"}],
+    }
+    story.update(overrides)
+    return json.dumps(story)
+
+class ValidScenariosStoriesImportTests(TestCase):
+    """This class is built to test importing stories from NDJSON"""
+
+    def setUp(self):
+        self.user = create_user("import@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("stories-import")
+
+    def post_lines(self, lines):
+        """Posts the lines as an NDJSON body"""
+        return self.client.post(self.url, "\n".join(lines) + "\n", content_type="application/x-ndjson")
+
+    def test_import_creates_stories_with_children(self):
+        """Test every story is imported with its children and shared records are reused"""
+        # Act
+        response = self.post_lines([story_line(number) for number in range(3)])
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["Stories imported successfully✅"]["imported"], 3)
+        stories = models.StoriesModel.objects.filter(user=self.user)
+        self.assertEqual(stories.count(), 3)
+        self.assertEqual(models.IncidentsModel.objects.filter(story__user=self.user).count(), 3)
+        self.assertEqual(models.PointsModel.objects.filter(story__user=self.user).count(), 6)
+        self.assertEqual(models.PeopleIncidentModel.objects.filter(incident__story__user=self.user).count(), 6)
+        self.assertEqual(models.PeoplesModel.objects.filter(first_name="Shared person").count(), 1)
+        self.assertEqual(models.LinksModel.objects.count(), 1)
+        self.assertEqual(models.StoryLinkModel.objects.count(), 3)
+
+    def test_export_can_be_imported(self):
+        """Test the export of a user can be imported for another user"""
+        # Arrange
+        self.post_lines([story_line(number) for number in range(2)])
+        exported = b"".join(self.client.get(reverse("stories-export")).streaming_content).decode()
+        other_user = create_user("import-copy@example.com")
+        self.client.force_authenticate(user=other_user)
+
+        # Act
+        response = self.client.post(self.url, exported, content_type="application/x-ndjson")
+
+        # Assert
+        self.assertEqual(response.data["Stories imported successfully✅"]["imported"], 2)
+        self.assertEqual(
+            list(models.ScriptsModel.objects.filter(story__user=other_user).values_list("content", flat=True).order_by("content")),
+            ["Script 0", "Script 1"],
+        )
+
+    @override_settings(STORIES_IMPORT_RETRY_DELAY=0)
+    def test_locked_batch_is_retried(self):
+        """Test a batch failing on a database lock is written again instead of reported as failed"""
+        # Arrange
+        write_batch = StoryImporter.write_batch
+        calls = []
+
+        def locked_once(importer, records):
+            calls.append(len(records))
+            if len(calls) == 1:
+                raise OperationalError("database is locked")
+            return write_batch(importer, records)
+
+        # Act
+        with mock.patch.object(StoryImporter, "write_batch", autospec=True, side_effect=locked_once):
+            response = self.post_lines([story_line(0), story_line(1)])
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["Stories imported successfully✅"]["imported"], 2)
+        self.assertEqual(response.data["Stories imported successfully✅"]["failed"], 0)
+        self.assertEqual(calls, [2, 2])
+
+    @override_settings(STORIES_IMPORT_BATCH_SIZE=2)
+    def test_import_writes_in_batches(self):
+        """Test the query count grows per batch of stories, not per story"""
+        # Arrange
+        lines = [story_line(number) for number in range(4)]
+
+        # Act / Assert
+        # Per batch: savepoint, 5 story tables, 3 x (lookup + insert) shared tables, 3 junction tables, release
+        # (the second batch reuses the shared link, so it has nothing to insert there)
+        with self.assertNumQueries(16 + 15):
+            response = self.post_lines(lines)
+        self.assertEqual(response.data["Stories imported successfully✅"]["imported"], 4)
+
+    def test_command_imports_a_file(self):
+        """Test the import_stories command reads a file and reports progress"""
+        # Arrange
+        output = StringIO()
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson", encoding="utf-8") as ndjson:
+            ndjson.write("\n".join(story_line(number) for number in range(2)))
+            ndjson.flush()
+
+            # Act
+            call_command("import_stories", ndjson.name, email=self.user.email, stdout=output, stderr=StringIO())
+
+        # Assert
+        self.assertIn("Imported 2 of 2 stories", output.getvalue())
+        self.assertEqual(models.StoriesModel.objects.filter(user=self.user).count(), 2)
+
+class InvalidScenariosStoriesImportTests(TestCase):
+    """This class is built to test invalid lines are reported without stopping the import"""
+
+    def setUp(self):
+        self.user = create_user("import-invalid@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("stories-import")
+
+    def test_invalid_lines_are_reported_by_line_number(self):
+        """Test invalid lines are skipped and reported while the valid ones are imported"""
+        # Arrange
+        body = "\n".join([
+            story_line(0),
+            "not json",
+            story_line(1, title=""),
+            story_line(2, incident=None),
+        ])
+
+        # Act
+        response = self.client.post(self.url, body, content_type="application/x-ndjson")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        report = response.data["Stories imported successfully✅"]
+        self.assertEqual(report["imported"], 1)
+        self.assertEqual(report["failed"], 3)
+        self.assertEqual(sorted(report["errors"]), [2, 3, 4])
+        self.assertIn("title", report["errors"][3])
+        self.assertIn("people", report["errors"][4])
+
+    @override_settings(STORIES_IMPORT_BATCH_SIZE=1, STORIES_IMPORT_RETRIES=2, STORIES_IMPORT_RETRY_DELAY=0)
+    def test_database_staying_locked_is_service_unavailable(self):
+        """Test an import whose batch stays locked stops with a 503 instead of failing valid lines"""
+        # Arrange
+        write_batch = StoryImporter.write_batch
+        calls = []
+
+        def locked_after_first(importer, records):
+            calls.append(len(records))
+            if len(calls) > 1:
+                raise OperationalError("database is locked")
+            return write_batch(importer, records)
+
+        # Act
+        with mock.patch.object(StoryImporter, "write_batch", autospec=True, side_effect=locked_after_first):
+            response = self.client.post(
+                self.url, "\n".join([story_line(0), story_line(1)]), content_type="application/x-ndjson",
+            )
+
+        # Assert
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+        report = response.data["Story import interrupted, the database is busy❌"]
+        self.assertEqual(report["imported"], 1)
+        self.assertEqual(report["failed"], 0)
+        # First batch, then the second one and its 2 retries
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(models.StoriesModel.objects.count(), 1)
+
+    def test_nothing_imported_is_a_bad_request(self):
+        """Test a body without any valid line is rejected"""
+        # Act
+        response = self.client.post(self.url, "[]\n", content_type="application/x-ndjson")
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(models.StoriesModel.objects.count(), 0)
@@ -0,0 +1,106 @@
+"""
+This file tests the keyset (cursor) pagination of the stories list endpoint
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import models
+from django.contrib.auth import get_user_model
+
+class ValidScenariosStoriesPaginationTests(TestCase):
+    """This class is built to test paging through the stories list"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="pagination@example.com",
+            first_name="TestFirstname",
+            last_name="TestLastname",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.stories = [
+            models.StoriesModel.objects.create(user=self.user, title=f"Story {number}")
+            for number in range(5)
+        ]
+        # Give every story the same timestamp so the story_id tie-breaker is exercised
+        models.StoriesModel.objects.filter(user=self.user).update(created_at=timezone.now())
+
+    def test_walking_next_links_returns_every_story_once_newest_first(self):
+        """Test following the next links visits all stories in order"""
+        # Arrange
+        url = reverse("stories") + "?page_size=2"
+        seen = []
+
+        # Act
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(story["story_id"] for story in response.data["Here are your stories:"])
+            url = response.data["next"]
+
+        # Assert
+        expected = sorted((story.story_id for story in self.stories), reverse=True)
+        self.assertEqual(seen, expected)
+
+    def test_previous_link_returns_the_page_before(self):
+        """Test the previous link of the second page returns the first page"""
+        # Arrange
+        first_page = self.client.get(reverse("stories") + "?page_size=2")
+        second_page = self.client.get(first_page.data["next"])
+
+        # Act
+        actual = self.client.get(second_page.data["previous"])
+
+        # Assert
+        self.assertEqual(actual.data["Here are your stories:"], first_page.data["Here are your stories:"])
+        self.assertIsNone(first_page.data["previous"])
+
+    def test_other_users_stories_are_not_listed(self):
+        """Test only the requesting user's stories are paginated"""
+        # Arrange
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            first_name="Other",
+            last_name="User",
+            date_of_birth="2003-10-18",
+            city="derby",
+            password="Testpass123",
+        )
+        models.StoriesModel.objects.create(user=other_user, title="Not yours")
+
+        # Act
+        response = self.client.get(reverse("stories") + "?page_size=50")
+
+        # Assert
+        self.assertEqual(len(response.data["Here are your stories:"]), len(self.stories))
+        self.assertIsNone(response.data["next"])
+
+class InvalidScenariosStoriesPaginationTests(TestCase):
+    """This class is built to test bad cursors sent to the stories list"""
+
+    def test_tampered_cursor_is_rejected(self):
+        """Test an invalid cursor returns 404"""
+        # Arrange
+        user = get_user_model().objects.create_user(
+            email="cursor@example.com",
+            first_name="TestFirstname",
+            last_name="TestLastname",
+            date_of_birth="2003-10-18",
+            city="london",
+            password="Testpass123",
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        # Act
+        response = client.get(reverse("stories") + "?cursor=not-a-cursor")
+
+        # Assert
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,114 @@
+"""
+This file tests the story scoped views (ownership check merged into the child lookup)
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import models
+from core.testing import create_user
+
+class ValidScenariosStoryScopedViewsTests(TestCase):
+    """This class is built to test that simple story child reads cost one query"""
+
+    def setUp(self):
+        self.user = create_user("scoped@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Test story")
+        incident = models.IncidentsModel.objects.create(
+            story=self.story,
+            incident_what="Test what",
+            incident_where="Test where",
+            incident_when=timezone.now(),
+        )
+        models.VAKSModel.objects.create(
+            story=self.story, sight="a", sound="b", smell="c", taste="d", touch="e", emotion="f",
+        )
+        models.ScriptsModel.objects.create(story=self.story, content="Test script")
+        self.point = models.PointsModel.objects.create(story=self.story, content="Test point")
+        self.person = models.PeoplesModel.objects.create(first_name="Test", type="friend")
+        models.PeopleIncidentModel.objects.create(person=self.person, incident=incident)
+        self.link = models.LinksModel.objects.create(title="Test link", description="Test description")
+        models.StoryLinkModel.objects.create(story=self.story, link=self.link)
+        self.character = models.CharactersModel.objects.create(body_language="calm", dialog="Hello")
+        models.StoryCharactersModel.objects.create(story=self.story, character=self.character)
+
+    def test_child_reads_cost_one_query(self):
+        """Test every simple child read is a single joined query"""
+        # Arrange
+        story_id = self.story.story_id
+        urls = [
+            reverse("story-incident", args=[story_id]),
+            reverse("story-vaks", args=[story_id]),
+            reverse("story-script", args=[story_id]),
+            reverse("story-point-details", args=[story_id, self.point.point_id]),
+            reverse("story-people-details", args=[story_id, self.person.person_id]),
+            reverse("story-link-details", args=[story_id, self.link.link_id]),
+            reverse("story-character-details", args=[story_id, self.character.character_id]),
+        ]
+
+        for url in urls:
+            # Act / Assert
+            # Nothing cached: the story's updated_at (conditional GET validators) and the joined read
+            cache.clear()
+            with self.subTest(url=url), self.assertNumQueries(2):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_removing_a_link_keeps_the_shared_link(self):
+        """Test deleting a link from a story only removes the junction record"""
+        # Act
+        response = self.client.delete(reverse("story-link-details", args=[self.story.story_id, self.link.link_id]))
+
+        # Assert
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(models.StoryLinkModel.objects.filter(story=self.story).exists())
+        self.assertTrue(models.LinksModel.objects.filter(link_id=self.link.link_id).exists())
+
+class InvalidScenariosStoryScopedViewsTests(TestCase):
+    """This class is built to test the 404 responses of the story scoped views"""
+
+    def setUp(self):
+        self.owner = create_user("owner@example.com")
+        self.story = models.StoriesModel.objects.create(user=self.owner, title="Private story")
+        self.point = models.PointsModel.objects.create(story=self.story, content="Private point")
+        self.client = APIClient()
+
+    def test_other_users_story_reports_story_not_found(self):
+        """Test a child of another user's story is reported as a missing story"""
+        # Arrange
+        self.client.force_authenticate(user=create_user("intruder@example.com"))
+
+        # Act
+        response = self.client.get(reverse("story-point-details", args=[self.story.story_id, self.point.point_id]))
+
+        # Assert
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data, {"Errors❌":"Story not found"})
+
+    def test_missing_child_reports_child_not_found(self):
+        """Test a missing child of the user's own story is reported as a missing child"""
+        # Arrange
+        self.client.force_authenticate(user=self.owner)
+
+        # Act
+        response = self.client.get(reverse("story-script", args=[self.story.story_id]))
+
+        # Assert
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data, {"Errors❌":"Script not found"})
+
+    def test_other_users_story_list_is_not_found(self):
+        """Test listing the points of another user's story returns 404 instead of an empty list"""
+        # Arrange
+        self.client.force_authenticate(user=create_user("lister@example.com"))
+
+        # Act
+        response = self.client.get(reverse("story-points", args=[self.story.story_id]))
+
+        # Assert
+        self.assertEqual(response.status_code, 404)
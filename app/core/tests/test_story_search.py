@@ -0,0 +1,175 @@
+"""
+This file tests the full-text search of stories
+"""
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import models
+from core.testing import create_user
+
+class ValidScenariosStorySearchTests(TestCase):
+    """This class is built to test searching the user's stories"""
+
+    def setUp(self):
+        self.user = create_user("search@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("stories-search")
+        self.story = models.StoriesModel.objects.create(user=self.user, title="The lighthouse keeper")
+        models.IncidentsModel.objects.create(
+            story=self.story,
+            incident_what="A storm knocked out the lamp",
+            incident_where="Cornwall",
+            incident_when=timezone.now(),
+        )
+        self.point = models.PointsModel.objects.create(story=self.story, content="Nobody believed the keeper")
+        models.ScriptsModel.objects.create(story=self.story, content="It was a dark and stormy night")
+
+    def search(self, query):
+        """Returns the search results for the query"""
+        response = self.client.get(self.url, {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return response.data["Search results✅"]
+
+    def test_search_matches_children_with_snippets(self):
+        """Test a word found in the children returns the story with highlighted snippets"""
+        # Act
+        results = self.search("keeper")
+
+        # Assert
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["story_id"], self.story.story_id)
+        self.assertEqual(results[0]["title"], "The lighthouse keeper")
+        self.assertEqual({match["source"] for match in results[0]["matches"]}, {"title", "point"})
+        self.assertIn("<mark>keeper</mark>", results[0]["matches"][0]["snippet"])
+
+    def test_snippet_text_is_escaped(self):
+        """Test the user's text in a snippet is HTML escaped, only the highlight is markup"""
+        # Arrange
+        models.PointsModel.objects.create(story=self.story, content="<script>alert(1)</script> beacon & flare")
+
+        # Act
+        results = self.search("beacon")
+
+        # Assert
+        snippet = results[0]["matches"][0]["snippet"]
+        self.assertNotIn("<script>", snippet)
+        self.assertIn("&lt;script&gt;", snippet)
+        self.assertIn("<mark>beacon</mark> &amp; flare", snippet)
+
+    def test_last_word_matches_as_prefix(self):
+        """Test the last word of the query matches word prefixes"""
+        # Act / Assert
+        self.assertEqual(len(self.search("corn")), 1)
+        self.assertEqual(self.search("storm lamp")[0]["matches"][0]["source"], "incident")
+
+    def test_index_follows_writes(self):
+        """Test updates, bulk updates and deletes are reflected in the results"""
+        # Act
+        self.point.content = "The gulls were loud"
+        self.point.save()
+        models.ScriptsModel.objects.filter(story=self.story).update(content="Fog rolled in")
+
+        # Assert
+        self.assertEqual([match["source"] for match in self.search("keeper")[0]["matches"]], ["title"])
+        self.assertEqual(len(self.search("gulls")), 1)
+        self.assertEqual(len(self.search("fog")), 1)
+        self.assertEqual(self.search("stormy"), [])
+
+        # Act
+        self.story.delete()
+
+        # Assert
+        self.assertEqual(self.search("gulls"), [])
+
+    def test_shared_character_update_is_indexed(self):
+        """Test a character's dialog is searchable and follows updates of the shared character"""
+        # Arrange
+        character = models.CharactersModel.objects.create(body_language="calm", dialog="Ahoy there")
+        models.StoryCharactersModel.objects.create(story=self.story, character=character)
+
+        # Act
+        character.dialog = "Farewell sailor"
+        character.save()
+
+        # Assert
+        self.assertEqual(self.search("ahoy"), [])
+        self.assertEqual(self.search("sailor")[0]["matches"][0]["source"], "character")
+
+    def test_operators_are_searched_literally(self):
+        """Test FTS5 syntax typed by the user does not break the query"""
+        # Act / Assert
+        self.assertEqual(self.search('keeper" OR (NEAR'), [])
+
+    def test_rebuild_command_restores_the_index(self):
+        """Test the rebuild command reindexes every story"""
+        # Arrange
+        output = StringIO()
+
+        # Act
+        call_command("rebuild_search_index", stdout=output)
+
+        # Assert
+        self.assertIn("Search index rebuilt", output.getvalue())
+        self.assertEqual(len(self.search("keeper")), 1)
+
+    def test_migrate_restores_dropped_triggers(self):
+        """Test the post_migrate receiver puts back the triggers and the rows written without them"""
+        # Arrange
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER core_pointsmodel_search_insert")
+        models.PointsModel.objects.create(story=self.story, content="The albatross returned")
+
+        # Act
+        emit_post_migrate_signal(verbosity=0, interactive=False, db=connection.alias)
+        models.PointsModel.objects.create(story=self.story, content="The gull returned")
+
+        # Assert
+        self.assertEqual(len(self.search("albatross")), 1)
+        self.assertEqual(len(self.search("gull")), 1)
+
+    def test_complete_index_is_not_rebuilt_after_migrate(self):
+        """Test migrate leaves the index alone when none of its triggers is missing"""
+        # Act
+        with mock.patch("core.search.rebuild_index") as rebuild_index:
+            emit_post_migrate_signal(verbosity=0, interactive=False, db=connection.alias)
+
+        # Assert
+        rebuild_index.assert_not_called()
+
+class InvalidScenariosStorySearchTests(TestCase):
+    """This class is built to test the search is scoped and validated"""
+
+    def setUp(self):
+        self.user = create_user("search-invalid@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("stories-search")
+
+    def test_other_users_stories_are_not_found(self):
+        """Test stories of another user never appear in the results"""
+        # Arrange
+        owner = create_user("search-owner@example.com")
+        models.StoriesModel.objects.create(user=owner, title="Secret voyage")
+
+        # Act
+        response = self.client.get(self.url, {"q": "voyage"})
+
+        # Assert
+        self.assertEqual(response.data["Search results✅"], [])
+
+    def test_query_is_required(self):
+        """Test a blank query is rejected"""
+        # Act
+        response = self.client.get(self.url, {"q": "  "})
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,164 @@
+"""
+This file tests the rotation and revocation of the refresh tokens
+"""
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import models, revocation
+from core.authentication import ClaimsRefreshToken
+from core.testing import create_user
+
+def refresh(token):
+    """Posts a refresh token to the refresh endpoint"""
+    return Client().post(reverse("token-refresh-endpoint"), {"refresh": str(token)})
+
+class ValidScenariosTokenRevocationTests(TestCase):
+    """This class is built to test refresh tokens are rotated and the store stays cheap to check"""
+
+    def setUp(self):
+        revocation.store.reset()
+        self.user = create_user("revocation@example.com")
+
+    def test_refresh_rotates_the_token_in_its_family(self):
+        """Test every refresh returns a new refresh token of the same family"""
+        # Arrange
+        token = ClaimsRefreshToken.for_user(self.user)
+
+        # Act
+        first = json.loads(refresh(token).content)
+        second = json.loads(refresh(first["refresh"]).content)
+
+        # Assert
+        rotated = ClaimsRefreshToken(second["refresh"])
+        self.assertNotEqual(rotated["jti"], token["jti"])
+        self.assertEqual(rotated[revocation.FAMILY_CLAIM], token["jti"])
+        self.assertNotIn(revocation.FAMILY_CLAIM, AccessToken(second["access"]).payload)
+        self.assertEqual(models.RevokedTokensModel.objects.count(), 2)
+
+    def test_token_without_family_starts_one(self):
+        """Test a refresh token issued without the family claim is rotated into its own family"""
+        # Arrange
+        token = ClaimsRefreshToken.for_user(self.user)
+        del token.payload[revocation.FAMILY_CLAIM]
+
+        # Act
+        response = refresh(token)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ClaimsRefreshToken(json.loads(response.content)["refresh"])[revocation.FAMILY_CLAIM], token["jti"])
+
+    @override_settings(REVOCATION_SYNC_SECONDS=3600)
+    def test_unrevoked_token_is_checked_without_query(self):
+        """Test a token missing from the Bloom filter is accepted without looking up the table"""
+        # Arrange
+        revocation.store.revoked("warm-up", "warm-up")
+
+        # Act
+        with self.assertNumQueries(0):
+            revoked = revocation.store.revoked("unknown-jti", "unknown-family")
+
+        # Assert
+        self.assertIsNone(revoked)
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        """Test every added key is found, and few others are"""
+        # Arrange
+        bloom = revocation.BloomFilter(1000, 0.01)
+
+        # Act
+        for number in range(1000):
+            bloom.add(f"key-{number}")
+
+        # Assert
+        self.assertTrue(all(f"key-{number}" in bloom for number in range(1000)))
+        false_positives = sum(f"other-{number}" in bloom for number in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_purge_deletes_expired_rows_in_batches(self):
+        """Test the purge command deletes the expired rows only"""
+        # Arrange
+        now = timezone.now()
+        for number in range(5):
+            models.RevokedTokensModel.objects.create(jti=f"old-{number}", family="f", expires_at=now - timedelta(hours=1))
+        models.RevokedTokensModel.objects.create(jti="current", family="f", expires_at=now + timedelta(hours=1))
+        output = StringIO()
+
+        # Act
+        call_command("purge_revoked_tokens", "--batch-size", "2", stdout=output)
+
+        # Assert
+        self.assertIn("5 expired revoked tokens purged", output.getvalue())
+        self.assertEqual(list(models.RevokedTokensModel.objects.values_list("jti", flat=True)), ["current"])
+
+class InvalidScenariosTokenRevocationTests(TestCase):
+    """This class is built to test revoked refresh tokens and their families are refused"""
+
+    def setUp(self):
+        revocation.store.reset()
+        self.user = create_user("revocation@example.com")
+
+    def test_rotated_token_is_refused(self):
+        """Test a refresh token cannot be used again after its rotation"""
+        # Arrange
+        token = ClaimsRefreshToken.for_user(self.user)
+        refresh(token)
+
+        # Act
+        with self.assertLogs("core.revocation", "WARNING"):
+            response = refresh(token)
+
+        # Assert
+        self.assertEqual(response.status_code, 401)
+
+    def test_reuse_revokes_the_family(self):
+        """Test reusing a rotated token also refuses the newer tokens of its family"""
+        # Arrange
+        token = ClaimsRefreshToken.for_user(self.user)
+        rotated = json.loads(refresh(token).content)["refresh"]
+
+        # Act
+        with self.assertLogs("core.revocation", "WARNING"):
+            refresh(token)
+        response = refresh(rotated)
+
+        # Assert
+        self.assertEqual(response.status_code, 401)
+        self.assertTrue(
+            models.RevokedTokensModel.objects.filter(jti=revocation.family_key(token["jti"])).exists()
+        )
+
+    def test_concurrent_rotation_revokes_the_family(self):
+        """Test a token revoked between its check and its rotation (another request) revokes its family"""
+        # Arrange
+        token = ClaimsRefreshToken.for_user(self.user)
+        revocation.revoke_token(token)
+
+        # Act / Assert
+        with self.assertLogs("core.revocation", "WARNING"), self.assertRaises(TokenError):
+            revocation.revoke_token(token)
+        self.assertEqual(revocation.store.revoked("new-jti", token["jti"]), "family")
+
+    @override_settings(REVOCATION_SYNC_SECONDS=0)
+    def test_revocation_of_another_process_is_synced(self):
+        """Test a family revoked by another process (a row this one did not add) is refused after a sync"""
+        # Arrange
+        token = ClaimsRefreshToken.for_user(self.user)
+        revocation.store.revoked("warm-up", "warm-up")
+        models.RevokedTokensModel.objects.create(
+            jti=revocation.family_key(token["jti"]), family=token["jti"], expires_at=timezone.now() + timedelta(days=1),
+        )
+
+        # Act
+        response = refresh(token)
+
+        # Assert
+        self.assertEqual(response.status_code, 401)
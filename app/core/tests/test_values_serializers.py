@@ -0,0 +1,106 @@
+"""
+This file tests the .values() read path renders the same JSON as the serializers
+"""
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers as drf_serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core import models, serializers
+from core.testing import create_user
+
+class ValidScenariosValuesSerializerTests(TestCase):
+    """This class is built to test .values() rows serialize byte for byte like model instances"""
+
+    def setUp(self):
+        self.user = create_user("values@example.com")
+        self.story = models.StoriesModel.objects.create(user=self.user, title="Ünïcode story “quoted”")
+        models.StoriesModel.objects.create(user=self.user, title="Second story")
+        self.incident = models.IncidentsModel.objects.create(
+            story=self.story, incident_what="What", incident_where="Where", incident_when=timezone.now(),
+        )
+        for number in range(3):
+            models.PointsModel.objects.create(story=self.story, content=f"Point {number} ✅")
+            person = models.PeoplesModel.objects.create(first_name=f"Person {number}", type="friend")
+            models.PeopleIncidentModel.objects.create(person=person, incident=self.incident)
+            link = models.LinksModel.objects.create(title=f"Link {number}", description="Description")
+            models.StoryLinkModel.objects.create(story=self.story, link=link)
+            character = models.CharactersModel.objects.create(body_language="calm", dialog=f"Line {number}\n")
+            models.StoryCharactersModel.objects.create(story=self.story, character=character)
+
+    def assertSameJSON(self, serializer_class, rows_serializer, queryset):
+        """Asserts both read paths render the same bytes for the queryset"""
+        expected = JSONRenderer().render(serializer_class(list(queryset), many=True).data)
+        actual = JSONRenderer().render(rows_serializer.serialize(rows_serializer.values(queryset)))
+        self.assertEqual(actual, expected)
+
+    def test_stories_rows_match_serializer(self):
+        """Test story rows (with their created_at date) render like StorySerializer"""
+        # Assert
+        self.assertSameJSON(serializers.StorySerializer, serializers.story_rows, models.StoriesModel.objects.order_by("story_id"))
+
+    def test_children_rows_match_serializers(self):
+        """Test points, people, links and characters rows render like their serializers"""
+        # Arrange
+        cases = [
+            (serializers.PointsSerializer, serializers.points_rows, models.PointsModel.objects.order_by("point_id")),
+            (serializers.PeopleSerializer, serializers.people_rows, models.PeoplesModel.objects.order_by("person_id")),
+            (serializers.LinksSerializer, serializers.links_rows, models.LinksModel.objects.order_by("link_id")),
+            (serializers.CharactersSerializer, serializers.characters_rows, models.CharactersModel.objects.order_by("character_id")),
+        ]
+
+        # Assert
+        for serializer_class, rows_serializer, queryset in cases:
+            with self.subTest(serializer=serializer_class.__name__):
+                self.assertSameJSON(serializer_class, rows_serializer, queryset)
+
+    def test_renamed_and_related_fields_match_serializer(self):
+        """Test fields with another source keep the serializer's names and order"""
+        # Arrange
+        class RenamedIncidentSerializer(drf_serializers.Serializer):
+            when = drf_serializers.DateTimeField(source="incident_when")
+            story = drf_serializers.PrimaryKeyRelatedField(read_only=True)
+            title = drf_serializers.CharField(source="story.title")
+
+        # Assert
+        self.assertSameJSON(
+            RenamedIncidentSerializer,
+            serializers.ValuesSerializer(RenamedIncidentSerializer),
+            models.IncidentsModel.objects.all(),
+        )
+
+    def test_endpoints_return_serializer_output(self):
+        """Test the list endpoints return the same data as the serializers"""
+        # Arrange
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        story_id = self.story.story_id
+        stories = models.StoriesModel.objects.filter(user=self.user).order_by("-created_at", "-story_id")
+
+        # Act
+        stories_response = client.get(reverse("stories"))
+        points_response = client.get(reverse("story-points", args=[story_id]))
+
+        # Assert
+        self.assertEqual(
+            stories_response.json()["Here are your stories:"],
+            serializers.StorySerializer(stories, many=True).data,
+        )
+        self.assertEqual(
+            points_response.json()["Points retrieved successfully✅"],
+            serializers.PointsSerializer(models.PointsModel.objects.filter(story=self.story), many=True).data,
+        )
+
+    def test_values_rows_are_not_modified(self):
+        """Test serializing leaves the rows as they are (the pagination cursor reads them afterwards)"""
+        # Arrange
+        rows = list(serializers.story_rows.values(models.StoriesModel.objects.all()))
+        created_at = rows[0]["created_at"]
+
+        # Act
+        serializers.story_rows.serialize(rows)
+
+        # Assert
+        self.assertEqual(rows[0]["created_at"], created_at)
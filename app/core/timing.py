@@ -0,0 +1,109 @@
+"""
+Per request timing: database queries and time, view time, render time, total time and response cache lookups
+
+record_query is a database execute wrapper (the hook behind connection.execute_wrapper) added to
+every connection when it is created (see CoreConfig.ready), so it also sees the connections of
+other threads. It adds each query to the RequestTiming of the current request, found through a
+context variable: the queries async views run in sync_to_async threads are counted too, and
+queries made outside a measured request only pay a context variable lookup.
+RequestTimingMiddleware (core/middleware.py) reports the sampled requests, MetricsMiddleware adds
+every request to the metrics (core/metrics.py); both share one measure per request.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Timing of the request being measured in the current context (None outside a measured request)
+_current_timing = ContextVar("core_request_timing", default=None)
+
+class RequestTiming:
+    """Timings of one request (perf_counter() readings and seconds spent in the database)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ended = None
+        self.view_started = None
+        self.view_ended = None
+        self.render_ended = None
+        self.queries = 0
+        self.database_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def rendered(self, response):
+        """Post render callback of template (DRF) responses marking the end of their rendering"""
+        self.render_ended = time.perf_counter()
+
+    def durations(self):
+        """Returns the database, view, render and total durations in milliseconds
+
+        The view time includes the queries it made; responses that are not rendered after the view
+        (e.g. plain HttpResponses) have no render time.
+        """
+        ended = self.ended if self.ended is not None else time.perf_counter()
+        view_ended = self.view_ended if self.view_ended is not None else ended
+        return {
+            "db": self.database_seconds * 1000,
+            "view": (view_ended - self.view_started) * 1000 if self.view_started is not None else 0.0,
+            "render": (self.render_ended - self.view_ended) * 1000 if self.render_ended is not None else 0.0,
+            "total": (ended - self.started) * 1000,
+        }
+
+    def server_timing(self):
+        """Returns the value of the Server-Timing header"""
+        durations = self.durations()
+        return (
+            f'db;dur={durations["db"]:.2f};desc="{self.queries} queries", '
+            f'view;dur={durations["view"]:.2f}, render;dur={durations["render"]:.2f}, total;dur={durations["total"]:.2f}'
+        )
+
+def get_current_timing():
+    """Returns the timing of the request being measured, if any"""
+    return _current_timing.get()
+
+@contextmanager
+def time_request():
+    """Measures the request handled inside the block, or joins the measure already running"""
+    timing = _current_timing.get()
+    if timing is not None:
+        try:
+            yield timing
+        finally:
+            timing.ended = time.perf_counter()
+        return
+
+    timing = RequestTiming()
+    token = _current_timing.set(timing)
+    try:
+        yield timing
+    finally:
+        timing.ended = time.perf_counter()
+        _current_timing.reset(token)
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding the query and its duration to the current request's timing"""
+    timing = _current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        # Async views run their queries one at a time in a single thread (thread_sensitive)
+        timing.queries += 1
+        timing.database_seconds += time.perf_counter() - started
+
+def record_cache_lookup(hit):
+    """Counts a response cache hit or miss in the current request's timing"""
+    timing = _current_timing.get()
+    if timing is not None:
+        if hit:
+            timing.cache_hits += 1
+        else:
+            timing.cache_misses += 1
+
+def install_query_timer(sender=None, connection=None, **kwargs):
+    """Adds record_query to a database connection (connection_created receiver)"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
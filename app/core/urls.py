@@ -1,11 +1,17 @@
 from django.urls import path, include
-from core import views
+from core import views, async_views
 
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 urlpatterns = [
     # Dashboard endpoints
     path("", views.dashboardApi.as_view(), name="dashboard-endpoint"),
+    # Cache endpoints
+    path("cache/stats/", views.cacheStatsApi.as_view(), name="cache-stats"),
+    # Metrics endpoint (no trailing slash, where Prometheus looks by default)
+    path("metrics", views.metricsApi.as_view(), name="metrics"),
+    # Profiling endpoint
+    path("profiles/<str:profile_id>/", views.profileDetailsApi.as_view(), name="profile-details"),
     # User endpoints
     path("user/", views.userProfileApi.as_view(), name="user-profile-endpoint"),
     path("user/registration/", views.registerUserApi.as_view(), name="user-registration-endpoint"),
@@ -14,8 +20,12 @@ urlpatterns = [
     path("user/token/refresh/", TokenRefreshView.as_view(), name="token-refresh-endpoint"),
     # Story endpoints
     path("stories/", views.storiesApi.as_view(), name="stories"),
+    path("stories/export/", views.storiesExportApi.as_view(), name="stories-export"),
+    path("stories/import/", views.storiesImportApi.as_view(), name="stories-import"),
+    path("stories/search/", views.storiesSearchApi.as_view(), name="stories-search"),
     path("stories/create-new-story/", views.storyCreateApi.as_view(), name="create-story"),
     path("stories/<int:story_id>/", views.storyDetailsApi.as_view(), name="story-details"),
+    path("stories/<int:story_id>/full/", views.storyFullApi.as_view(), name="story-full"),
     # Incident endpoint
     path("stories/<int:story_id>/incident/", views.storyIncidentApi.as_view(), name="story-incident"),
     # People endpoints
@@ -34,4 +44,19 @@ urlpatterns = [
     # Character endpoints
     path("stories/<int:story_id>/characters/", views.charactersApi.as_view(), name="story-characters"),
     path("stories/<int:story_id>/characters/<int:character_id>/", views.characterDetailsApi.as_view(), name="story-character-details"),
+    # Async (ASGI native) read endpoints, same responses as the ones above
+    path("async/stories/", async_views.asyncStoriesView.as_view(), name="async-stories"),
+    path("async/stories/<int:story_id>/", async_views.asyncStoryDetailsView.as_view(), name="async-story-details"),
+    path("async/stories/<int:story_id>/full/", async_views.asyncStoryFullView.as_view(), name="async-story-full"),
+    path("async/stories/<int:story_id>/incident/", async_views.asyncStoryIncidentView.as_view(), name="async-story-incident"),
+    path("async/stories/<int:story_id>/people/", async_views.asyncPeopleView.as_view(), name="async-story-people"),
+    path("async/stories/<int:story_id>/people/<int:person_id>/", async_views.asyncPersonDetailsView.as_view(), name="async-story-people-details"),
+    path("async/stories/<int:story_id>/vaks/", async_views.asyncVaksView.as_view(), name="async-story-vaks"),
+    path("async/stories/<int:story_id>/points/", async_views.asyncPointsView.as_view(), name="async-story-points"),
+    path("async/stories/<int:story_id>/points/<int:point_id>/", async_views.asyncPointDetailsView.as_view(), name="async-story-point-details"),
+    path("async/stories/<int:story_id>/script/", async_views.asyncScriptView.as_view(), name="async-story-script"),
+    path("async/stories/<int:story_id>/links/", async_views.asyncLinksView.as_view(), name="async-story-links"),
+    path("async/stories/<int:story_id>/links/<int:link_id>/", async_views.asyncLinkDetailsView.as_view(), name="async-story-link-details"),
+    path("async/stories/<int:story_id>/characters/", async_views.asyncCharactersView.as_view(), name="async-story-characters"),
+    path("async/stories/<int:story_id>/characters/<int:character_id>/", async_views.asyncCharacterDetailsView.as_view(), name="async-story-character-details"),
 ]
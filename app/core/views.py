@@ -1,12 +1,28 @@
+import itertools
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework.views import APIView
 
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 
 from rest_framework import status
 
-from core import serializers, models
+from django.db import transaction
+
+from core import serializers, models, pagination, search
+from core.renderers import ORJSONRenderer
+from core.importer import DatabaseBusy, StoryImporter
+from core.cache import cache_story_response, get_stats, reset_stats
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics, store as metrics_store
+from core.permissions import HasMetricsToken
+from core.profiling import get_profile
+from core.authentication import get_full_user
+from core.conditional import story_conditional_get
 
 """
 Core application APIs
@@ -19,17 +35,24 @@ class dashboardApi(APIView):
         apiEndpointList = {
             "Admin":"http://127.0.0.1:8000/admin/",
             "Dashboard":"http://127.0.0.1:8000/api/",
+            "Response cache statistics (staff only)":"http://127.0.0.1:8000/api/cache/stats/",
+            "Metrics of every endpoint (Prometheus text format)":"http://127.0.0.1:8000/api/metrics",
+            "Profile of a request (staff only, add ?profile=1 to any request)":"http://127.0.0.1:8000/api/profiles/profile_id/",
             "User registration":"http://127.0.0.1:8000/api/user/registration/",
             "Token/Login":"http://127.0.0.1:8000/api/user/token/",
             "Token refresh/re-login":"http://127.0.0.1:8000/api/user/token/refresh/",
             "Stories":"http://127.0.0.1:8000/api/stories/",
             "Create story":"http://127.0.0.1:8000/api/stories/create-new-story/",
+            "Export all stories (NDJSON)":"http://127.0.0.1:8000/api/stories/export/",
+            "Import stories (NDJSON)":"http://127.0.0.1:8000/api/stories/import/",
+            "Search stories":"http://127.0.0.1:8000/api/stories/search/?q=",
             "View specific story":"http://127.0.0.1:8000/api/stories/story_id/",
+            "View a story with everything that belongs to it":"http://127.0.0.1:8000/api/stories/story_id/full/",
             "View, create and modify a specific story incident":"http://127.0.0.1:8000/api/stories/story_id/incident/",
-            "View, create a specific incident people list":"http://127.0.0.1:8000/api/stories/story_id/people/",
+            "View, create a specific incident people list (one person or a list of people)":"http://127.0.0.1:8000/api/stories/story_id/people/",
             "Modify a specific incident people list":"http://127.0.0.1:8000/api/stories/story_id/people/person_id/",
             "View, create or modify a specific VAKS for a story":"http://127.0.0.1:8000/api/stories/story_id/vaks/",
-            "View or create a point for a story":"http://127.0.0.1:8000/api/stories/story_id/points/",
+            "View or create (one or many), bulk update or bulk delete points for a story":"http://127.0.0.1:8000/api/stories/story_id/points/",
             "View update or delete a specific point for a story":"http://127.0.0.1:8000/api/stories/story_id/points/point_id/",
             "Create retrieve update or delete a script for a story":"http://127.0.0.1:8000/api/stories/story_id/script/",
             "View or create a link for a story":"http://127.0.0.1:8000/api/stories/story_id/links/",
@@ -45,6 +68,61 @@ class dashboardApi(APIView):
             status=status.HTTP_200_OK
         )
 
+# Cache API endpoints
+class cacheStatsApi(APIView):
+    """Api exposing the story response cache hit/miss counters"""
+    permission_classes = [IsAdminUser,]
+
+    def get(self, request, format=None):
+        """Handles GET requests made to the cache statistics API endpoint"""
+        return Response(
+            {
+                "Response cache statistics:":get_stats(),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def delete(self, request, format=None):
+        """Handles DELETE requests made to the cache statistics API endpoint - resets the counters"""
+        reset_stats()
+        return Response(
+            {
+                "Response cache statistics reset✅":get_stats(),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+# Metrics API endpoint
+class metricsApi(APIView):
+    """Api exposing the per endpoint metrics of every worker process in the Prometheus text format"""
+    # Scrapers send METRICS_TOKEN instead of a JWT
+    authentication_classes = []
+    permission_classes = [HasMetricsToken,]
+
+    def get(self, request, format=None):
+        """Handles GET requests made to the metrics API endpoint"""
+        return HttpResponse(render_metrics(metrics_store.collect()), content_type=METRICS_CONTENT_TYPE)
+
+# Profiling API endpoint
+class profileDetailsApi(APIView):
+    """Api exposing the profile of a request profiled with ?profile=1 (see core/profiling.py)"""
+    permission_classes = [IsAdminUser,]
+
+    def get(self, request, profile_id, format=None):
+        """Handles GET requests made to the profile API endpoint"""
+        profile = get_profile(profile_id)
+        if profile is None:
+            return Response(
+                {"Errors❌":"Profile not found or expired"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(
+            {
+                "Profile retrieved successfully✅":profile,
+            },
+            status=status.HTTP_200_OK,
+        )
+
 # User API endpoints
 class registerUserApi(APIView):
     """Api for user registration"""
@@ -72,7 +150,10 @@ class userProfileApi(APIView):
 
     def get(self, request, format=None):
         """Handles GET requests to the user profile API endpoint"""
-        user = request.user
+        # request.user only holds the token's claims, the full row comes from the per-process user cache
+        user = get_full_user(request.user)
+        if user is None:
+            return Response({"Errors❌":"User not found"}, status=status.HTTP_404_NOT_FOUND)
         serialized_data = self.serializer_class(user)
         return Response({"User information": serialized_data.data}, status=status.HTTP_200_OK)
 
@@ -109,22 +190,142 @@ class userProfileApi(APIView):
 
 # Stories API endpoints
 class storiesApi(APIView):
-    """Api for viewing stories"""
+    """Api for viewing stories (newest first, one page at a time)"""
     serializer_class=serializers.StorySerializer
+    pagination_class=pagination.StoryCursorPagination
     permission_classes=[IsAuthenticated,]
 
     def get(self, request, format=None):
         """Method to handle GET requests to this stories api endpoint"""
         user=request.user
-        queryset = models.StoriesModel.objects.filter(user=user)
-        serialized_data=self.serializer_class(queryset, many=True)
+        # Plain .values() rows instead of model instances (same output as serializer_class)
+        queryset = serializers.story_rows.values(models.StoriesModel.objects.filter(user=user))
+
+        # Keyset pagination (?cursor=...&page_size=...) so later pages cost the same as the first
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, request)
         return Response(
             {
-                "Here are your stories:":serialized_data.data,
+                "Here are your stories:":serializers.story_rows.serialize(page),
+                "next":paginator.get_next_link(),
+                "previous":paginator.get_previous_link(),
             },
             status=status.HTTP_200_OK,
         )
 
+class storiesExportApi(APIView):
+    """Api streaming all of the user's stories as newline delimited JSON (one full story per line)"""
+    serializer_class=serializers.FullStorySerializer
+    permission_classes=[IsAuthenticated,]
+
+    def get(self, request, format=None):
+        """Method to handle GET requests to the stories export api endpoint
+
+        Under ASGI the lines come from an async iterator: Django would read a sync one whole
+        (sync_to_async(list)) before sending the first byte.
+        """
+        if isinstance(request._request, ASGIRequest):
+            lines = self.astream_stories(request.user)
+        else:
+            lines = self.stream_stories(request.user)
+        response = StreamingHttpResponse(lines, content_type="application/x-ndjson")
+        response["Content-Disposition"] = 'attachment; filename="stories.ndjson"'
+        return response
+
+    def stream_stories(self, user):
+        """Yields one JSON line per story
+
+        The stories are read chunk by chunk (each chunk with its own prefetch of the children),
+        so memory stays flat whatever the number of stories, all within one transaction so the
+        export is a consistent snapshot. The database runs in WAL mode (settings.py), so that
+        snapshot does not block the writers however long the client takes to read.
+        """
+        chunk_size = getattr(settings, "STORIES_EXPORT_CHUNK_SIZE", 500)
+        renderer = ORJSONRenderer()
+
+        with transaction.atomic():
+            stories = models.StoriesModel.objects.with_children().filter(user=user).order_by("story_id")
+            for story in stories.iterator(chunk_size=chunk_size):
+                yield renderer.render(self.serializer_class(story).data) + b"\n"
+
+    async def astream_stories(self, user):
+        """Yields the lines of stream_stories, a chunk at a time, from the database thread
+
+        The sync generator (and its transaction) always runs in the request's database thread,
+        and is closed there when the client goes away.
+        """
+        chunk_size = getattr(settings, "STORIES_EXPORT_CHUNK_SIZE", 500)
+        lines = self.stream_stories(user)
+        next_chunk = sync_to_async(lambda: b"".join(itertools.islice(lines, chunk_size)))
+        try:
+            while chunk := await next_chunk():
+                yield chunk
+        finally:
+            await sync_to_async(lines.close)()
+
+class storiesSearchApi(APIView):
+    """Api for full-text search across the user's stories (best match first)"""
+    permission_classes=[IsAuthenticated,]
+
+    def get(self, request, format=None):
+        """Method to handle GET requests to the stories search api endpoint (?q=...&limit=...)"""
+        if not search.is_available():
+            return Response(
+                {"Errors❌":"Search is not available on this database"},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response(
+                {"Errors❌":"A search query (?q=) is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        max_limit = getattr(settings, "STORY_SEARCH_MAX_RESULTS", 100)
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), max_limit)
+        except ValueError:
+            return Response(
+                {"Errors❌":"limit must be a number"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            {"Search results✅":search.search_stories(request.user, query, limit)},
+            status=status.HTTP_200_OK,
+        )
+
+class storiesImportApi(APIView):
+    """Api importing stories from newline delimited JSON (one full story per line, like the export)"""
+    permission_classes=[IsAuthenticated,]
+
+    def post(self, request, format=None):
+        """Method to handle POST requests to the stories import api endpoint
+
+        The body is read line by line from the request stream (never loaded whole).
+        """
+        stream = request.stream
+        try:
+            report = StoryImporter(request.user).run(stream if stream is not None else [])
+        except DatabaseBusy as busy:
+            # The batches before the busy one are imported, the report says how many stories
+            return Response(
+                {"Story import interrupted, the database is busy❌":busy.report.as_dict()},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1"},
+            )
+
+        if report.failed and not report.imported:
+            return Response(
+                {"Story import failed❌":report.as_dict()},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {"Stories imported successfully✅":report.as_dict()},
+            status=status.HTTP_200_OK,
+        )
+
 class storyCreateApi(APIView):
     """Api for creating new stories"""
     serializer_class=serializers.StorySerializer
@@ -148,17 +349,73 @@ class storyCreateApi(APIView):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-class storyDetailsApi(APIView):
+class storyScopedApi(APIView):
+    """Base Api for endpoints nested under one of the user's stories
+
+    Child records are fetched together with the story ownership check in one joined query,
+    e.g. PointsModel.objects.get(story__user=user, story_id=story_id, point_id=point_id).
+    Only when that lookup finds nothing is a second query made, to tell a missing (or not owned)
+    story apart from a missing child so the 404 messages stay the same.
+    """
+    permission_classes = [IsAuthenticated,]
+
+    def get_story(self, story_id):
+        """Returns the user's story (raises StoriesModel.DoesNotExist)"""
+        return models.StoriesModel.objects.get(user=self.request.user, story_id=story_id)
+
+    def story_queryset(self, story_id):
+        """Returns the queryset of the story when it belongs to the user"""
+        return models.StoriesModel.objects.filter(user=self.request.user, story_id=story_id)
+
+    def story_exists(self, story_id):
+        """Checks whether the story exists and belongs to the user"""
+        return self.story_queryset(story_id).exists()
+
+    def story_lookup(self, story_id, story_path="story"):
+        """Returns the lookup arguments scoping a query to the user's story
+
+        story_path is the relation from the queried model to the story, e.g. "incident__story"
+        for PeopleIncidentModel or "storylinkmodel__story" for LinksModel.
+        """
+        return {
+            f"{story_path}__user": self.request.user,
+            f"{story_path}_id": story_id,
+        }
+
+    def get_story_child(self, queryset, story_id, story_path="story", **lookup):
+        """Returns one child of the user's story using a single joined query"""
+        return queryset.get(**self.story_lookup(story_id, story_path), **lookup)
+
+    def filter_story_children(self, queryset, story_id, story_path="story", **lookup):
+        """Returns the children of the user's story using a single joined query"""
+        return queryset.filter(**self.story_lookup(story_id, story_path), **lookup)
+
+    def story_child_not_found(self, story_id, child_error, story_error=None):
+        """Returns the 404 response for a failed child lookup (story error first, like before)"""
+        return self.not_found_response(self.story_exists(story_id), child_error, story_error)
+
+    def not_found_response(self, story_exists, child_error, story_error=None):
+        """Returns the 404 response of a failed child lookup, given whether the user's story exists"""
+        if not story_exists:
+            return Response(
+                story_error or {"Errors❌":"Story not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(
+            child_error,
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+class storyDetailsApi(storyScopedApi):
     """Api for viewing story details"""
     serializer_class=serializers.StorySerializer
-    permission_classes=[IsAuthenticated,]
 
+    @story_conditional_get
+    @cache_story_response
     def get(self, request, story_id, format=None):
         """Method to handle GET requests to the stories details api endpoint"""
-        user=request.user
-
         try:
-            story=models.StoriesModel.objects.get(user=user, story_id=story_id)
+            story=self.get_story(story_id)
             serialized_data=self.serializer_class(story)
             return Response(
                 {
@@ -179,7 +436,7 @@ class storyDetailsApi(APIView):
         user = request.user
 
         try:
-            story = models.StoriesModel.objects.get(user=user, story_id=story_id)
+            story = self.get_story(story_id)
         except models.StoriesModel.DoesNotExist:
             return Response(
                 {"Error": "Story not found ❌"},
@@ -204,27 +461,49 @@ class storyDetailsApi(APIView):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-class storyIncidentApi(APIView):
-    """API endpoint for incidents of a story"""
-    serializer_class = serializers.IncidentsSerializer
-    permission_classes = [IsAuthenticated]
+class storyFullApi(storyScopedApi):
+    """Api for viewing a story together with everything that belongs to it in one request"""
+    serializer_class=serializers.FullStorySerializer
 
+    @story_conditional_get
+    @cache_story_response
     def get(self, request, story_id, format=None):
-        """Method to handle GET requests to this API endpoint - retrieve a story's incident"""
-        user = request.user
+        """Method to handle GET requests to the full story api endpoint"""
+        user=request.user
 
         try:
-            story = models.StoriesModel.objects.get(user=user, story_id=story_id)
-            incident = models.IncidentsModel.objects.get(story=story)
+            story=models.StoriesModel.objects.with_children().get(user=user, story_id=story_id)
         except models.StoriesModel.DoesNotExist:
             return Response(
-                {"Errors": "Story not found or does not belong to you❌"},
+                {
+                    "Error:":"Story retrieval failed❌",
+                },
                 status=status.HTTP_404_NOT_FOUND,
             )
+
+        serialized_data=self.serializer_class(story)
+        return Response(
+            {
+                "Full story retrieved successfully✅":serialized_data.data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+class storyIncidentApi(storyScopedApi):
+    """API endpoint for incidents of a story"""
+    serializer_class = serializers.IncidentsSerializer
+
+    @story_conditional_get
+    @cache_story_response
+    def get(self, request, story_id, format=None):
+        """Method to handle GET requests to this API endpoint - retrieve a story's incident"""
+        try:
+            incident = self.get_story_child(models.IncidentsModel.objects, story_id)
         except models.IncidentsModel.DoesNotExist:
-            return Response(
+            return self.story_child_not_found(
+                story_id,
                 {"Errors": "Incident not found or does not belong to you❌"},
-                status=status.HTTP_404_NOT_FOUND,
+                story_error={"Errors": "Story not found or does not belong to you❌"},
             )
 
         serialized_incident = self.serializer_class(incident)
@@ -237,12 +516,9 @@ class storyIncidentApi(APIView):
 
     def post(self, request, story_id, format=None):
         """Method to handle POST request to create an incident for a story"""
-
-        user = request.user
-
         # Check if the story exists and belongs to the user
         try:
-            story = models.StoriesModel.objects.get(user=user, story_id=story_id)
+            story = self.get_story(story_id)
         except models.StoriesModel.DoesNotExist:
             return Response(
                 {"Error": "Story not found or does not belong to you ❌"},
@@ -276,25 +552,16 @@ class storyIncidentApi(APIView):
 
     def put(self, request, story_id, format=None):
         """Handle PUT requests for completely updating a story's incident"""
-        user = request.user
-
-        try:
-            story = models.StoriesModel.objects.get(user=user, story_id=story_id)
-        except models.StoriesModel.DoesNotExist:
-            return Response(
-                {"Errors": "We could not find this story or you do not have access to it ❌"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
         try:
-            incident = models.IncidentsModel.objects.get(story=story)
+            incident = self.get_story_child(models.IncidentsModel.objects, story_id)
         except models.IncidentsModel.DoesNotExist:
-            return Response(
+            return self.story_child_not_found(
+                story_id,
                 {"Errors": "Incident not found for this story ❌"},
-                status=status.HTTP_404_NOT_FOUND,
+                story_error={"Errors": "We could not find this story or you do not have access to it ❌"},
             )
 
-        serialized_user_input = self.serializer_class(incident, data=request.data, context={"story": story})
+        serialized_user_input = self.serializer_class(incident, data=request.data)
 
         if serialized_user_input.is_valid():
             serialized_user_input.save()
@@ -310,23 +577,18 @@ class storyIncidentApi(APIView):
 
     def patch(self, request, story_id, format=None):
         """Handle PATCH requests to partially update a story's incident"""
-        # Check if the story belongs to the user
-        user = request.user
-
+        # Find the incident of the user's story
         try:
-            story = models.StoriesModel.objects.get(user=user, story_id=story_id)
-        except models.StoriesModel.DoesNotExist:
-            return Response(
-                {
-                    "Errors":"story not found or you are not authorized to view it",
-                },
-                status=status.HTTP_404_NOT_FOUND,
+            incident = self.get_story_child(models.IncidentsModel.objects, story_id)
+        except models.IncidentsModel.DoesNotExist:
+            return self.story_child_not_found(
+                story_id,
+                {"Errors": "Incident not found for this story ❌"},
+                story_error={"Errors":"story not found or you are not authorized to view it"},
             )
-        # Find corresponding incident
-        incident = models.IncidentsModel.objects.get(story=story)
 
         # Handle PATCH
-        serialized_user_input = self.serializer_class(incident, data=request.data, context={"story":story}, partial=True)
+        serialized_user_input = self.serializer_class(incident, data=request.data, partial=True)
 
         if serialized_user_input.is_valid():
             serialized_user_input.save()
@@ -341,24 +603,14 @@ class storyIncidentApi(APIView):
 
     def delete(self, request, story_id, format=None):
         """Method to handle DELETE requests to delete an incident of a story"""
-        user = request.user
-
         try:
-            # Fetch the story for the logged-in user
-            story = models.StoriesModel.objects.get(user=user, story_id=story_id)
-
-            # Try to get the incident associated with the story
-            incident = models.IncidentsModel.objects.get(story=story)
-
-        except models.StoriesModel.DoesNotExist:
-            return Response(
-                {"Errors": "Story not found or you do not have access to it ❌"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            # Fetch the incident of the logged-in user's story
+            incident = self.get_story_child(models.IncidentsModel.objects, story_id)
         except models.IncidentsModel.DoesNotExist:
-            return Response(
+            return self.story_child_not_found(
+                story_id,
                 {"Errors": "Incident not found for this story ❌"},
-                status=status.HTTP_404_NOT_FOUND,
+                story_error={"Errors": "Story not found or you do not have access to it ❌"},
             )
 
         # If incident is found, delete it
@@ -369,145 +621,137 @@ class storyIncidentApi(APIView):
             status=status.HTTP_204_NO_CONTENT
         )
 
-class storyPeopleApi(APIView):
+class storyPeopleApi(storyScopedApi):
     """API View to manage requests made to the people endpoint"""
     people_serializer_class = serializers.PeopleSerializer
     people_incident_serializer_class = serializers.PeopleIncidentSerializer
-    permission_classes = [IsAuthenticated]
 
+    @story_conditional_get
+    @cache_story_response
     def get(self, request, story_id, format=None):
         """Handles GET requests made to the people endpoint"""
-        # Ensure the user has access to the story
-        user = request.user
-
-        try:
-            story = models.StoriesModel.objects.get(user=user, story_id=story_id)
-        except models.StoriesModel.DoesNotExist:
-            return Response(
-                {"Errors": "Story not found or you do not have access to this story ❌"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Ensure story has an incident
-        try:
-            incident = models.IncidentsModel.objects.get(story=story)
-        except models.IncidentsModel.DoesNotExist:
-            return Response(
+        # Find the people of the user's story incident with one join through the look up table
+        people = list(serializers.people_rows.values(self.filter_story_children(
+            models.PeoplesModel.objects,
+            story_id,
+            story_path="peopleincidentmodel__incident__story",
+        )))
+
+        # No people could also mean the story is not the user's or has no incident
+        if not people and not self.filter_story_children(models.IncidentsModel.objects, story_id).exists():
+            return self.story_child_not_found(
+                story_id,
                 {"Errors": "Incident not found for this story ❌"},
-                status=status.HTTP_404_NOT_FOUND,
+                story_error={"Errors": "Story not found or you do not have access to this story ❌"},
             )
-        # Go through look up table and find list of people for incident
-        people_incidents = models.PeopleIncidentModel.objects.filter(incident=incident)
-        people = [people_incident_record.person for people_incident_record in people_incidents]  # Extract PeopleModel instances
-
-        # Serialize list of people
-        serialized_people = self.people_serializer_class(people, many=True)
 
         return Response(
-            {"People involved in this incident (the WHO)": serialized_people.data},
+            {"People involved in this incident (the WHO)": serializers.people_rows.serialize(people)},
             status=status.HTTP_200_OK,
         )
 
     def post(self, request, story_id, format=None):
         """Handles POST requests made to the people endpoint"""
-        # Check user is owner of story
-        user = request.user
-
+        # Check user is owner of story and story has an incident
         try:
-            story = models.StoriesModel.objects.get(user=user, story_id=story_id)
-        except models.StoriesModel.DoesNotExist:
-            return Response(
-                {"Errors:":"Story not found or does not belong to you❌"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Check story has an incident
-        try:
-            incident = models.IncidentsModel.objects.get(story=story)
+            incident = self.get_story_child(models.IncidentsModel.objects, story_id)
         except models.IncidentsModel.DoesNotExist:
-            return Response(
+            return self.story_child_not_found(
+                story_id,
                 {"Errors:":"Incident not found or story does not have one❌"},
-                status=status.HTTP_404_NOT_FOUND,
+                story_error={"Errors:":"Story not found or does not belong to you❌"},
             )
 
+        # Accept one person or a list of people, both go through the same batched path
+        many = isinstance(request.data, list)
+
         # Serialize model to accept HTML form and raw data POST requests
-        serialized_people_model = self.people_serializer_class(data=request.data)
+        serialized_people_model = self.people_serializer_class(
+            data=request.data if many else [request.data],
+            many=True,
+            context={"incident": incident},
+        )
 
         # Validate data
-        if serialized_people_model.is_valid():
-            # Create or get the person
-            person, created = models.PeoplesModel.objects.get_or_create(
-                **serialized_people_model.validated_data
+        if not serialized_people_model.is_valid():
+            # {index: errors} of the invalid items (LIST_SERIALIZER_ERRORS_AS_DICT)
+            errors = serialized_people_model.errors
+            # Return error message
+            return Response(
+                {"Errors❌:":errors if many else errors.get(0, errors)},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-            # Create the link in the junction table (if not already linked)
-            people_incident, link_created = models.PeopleIncidentModel.objects.get_or_create(
-                person=person,
-                incident=incident,
-            )
+        # Create or get the people and link them to the incident (if not already linked)
+        with transaction.atomic():
+            people = serialized_people_model.save()
+        linked_people = len(serialized_people_model.linked_people)
 
-            # Return success message
+        # Return success message
+        if many:
             return Response(
                 {
-                    "Success✅": "Person successfully added to the incident" if link_created else "Person was already linked to the incident",
-                    "Person data":self.people_serializer_class(person).data
+                    "Success✅": f"{linked_people} people added to the incident, {len(people) - linked_people} were already linked",
+                    "People data":self.people_serializer_class(people, many=True).data
                 },
                 status=status.HTTP_201_CREATED,
             )
-
-        # Return error message
         return Response(
-            {"Errors❌:":serialized_people_model.errors},
-            status=status.HTTP_400_BAD_REQUEST,
+            {
+                "Success✅": "Person successfully added to the incident" if linked_people else "Person was already linked to the incident",
+                "Person data":self.people_serializer_class(people[0]).data
+            },
+            status=status.HTTP_201_CREATED,
         )
 
-class storyPeopleApiDetails(APIView):
+class storyPeopleApiDetails(storyScopedApi):
     """API View to manage requests made to the people endpoint for details"""
     people_serializer_class = serializers.PeopleSerializer
     people_incident_serializer_class = serializers.PeopleIncidentSerializer
-    permission_classes = [IsAuthenticated]
 
-    def get(self, request, story_id, person_id, format=None):
-        """Handles GET requests made to the people endpoint"""
-        # Ensure the user has access to the story
-        user = request.user
+    def get_people_incident(self, story_id, person_id):
+        """Returns the junction record (with its person) linking the person to the story's incident"""
+        return self.get_story_child(
+            models.PeopleIncidentModel.objects.select_related("person"),
+            story_id,
+            story_path="incident__story",
+            person_id=person_id,
+        )
 
-        try:
-            story = models.StoriesModel.objects.get(user=user, story_id=story_id)
-        except models.StoriesModel.DoesNotExist:
+    def person_not_found(self, story_id, person_id):
+        """Returns the 404 response saying which part of the person lookup failed"""
+        if not self.story_exists(story_id):
             return Response(
-                {"Errors": "Story not found or you do not have access to this story ❌"},
+                {"Errors❌": "Story not found or you do not have access to it"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-
-        # Ensure story has an incident
-        try:
-            incident = models.IncidentsModel.objects.get(story=story)
-        except models.IncidentsModel.DoesNotExist:
+        if not models.IncidentsModel.objects.filter(story_id=story_id).exists():
             return Response(
-                {"Errors": "Incident not found for this story ❌"},
+                {"Errors❌": "Incident not found or the story does not have one"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-
-        # Check that the person exists
-        try:
-            person = models.PeoplesModel.objects.get(person_id=person_id)
-        except models.PeoplesModel.DoesNotExist:
+        if not models.PeoplesModel.objects.filter(person_id=person_id).exists():
             return Response(
                 {"Errors❌":"Person was not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        return Response(
+            {"Errors❌": "This person is not linked to this incident"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
 
-        # Ensure the person belongs to this incident (check junction table)
+    @story_conditional_get
+    @cache_story_response
+    def get(self, request, story_id, person_id, format=None):
+        """Handles GET requests made to the people endpoint"""
+        # Ensure the user owns the story and the person belongs to its incident (check junction table)
         try:
-            people_incident = models.PeopleIncidentModel.objects.get(person=person, incident=incident)
+            people_incident = self.get_people_incident(story_id, person_id)
         except models.PeopleIncidentModel.DoesNotExist:
-            return Response(
-                {"Errors❌": "This person is not linked to this incident"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            return self.person_not_found(story_id, person_id)
 
         # Serialize person
-        serialized_person = self.people_serializer_class(person)
+        serialized_person = self.people_serializer_class(people_incident.person)
 
         return Response(
             {"Person": serialized_person.data},
@@ -516,46 +760,14 @@ class storyPeopleApiDetails(APIView):
 
     def put(self, request, story_id, person_id, format=None):
         """Handles PUT requests made to this API endpoint"""
-        # Check that story belongs to user
-        user = request.user
-
-        try:
-            story = models.StoriesModel.objects.get(user=user, story_id=story_id)
-        except models.StoriesModel.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story does not exist or you do not have access to it"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Check that story has incident
-        try:
-            incident = models.IncidentsModel.objects.get(story=story)
-        except models.IncidentsModel.DoesNotExist:
-            return Response(
-                {"Errors❌":"Incident does not exist or your story does not have one"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Check that the person exists
+        # Ensure the user owns the story and the person belongs to its incident (check junction table)
         try:
-            person = models.PeoplesModel.objects.get(person_id=person_id)
-        except models.PeoplesModel.DoesNotExist:
-            return Response(
-                {"Errors❌":"Person was not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Ensure the person belongs to this incident (check junction table)
-        try:
-            people_incident = models.PeopleIncidentModel.objects.get(person=person, incident=incident)
+            people_incident = self.get_people_incident(story_id, person_id)
         except models.PeopleIncidentModel.DoesNotExist:
-            return Response(
-                {"Errors❌": "This person is not linked to this incident"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            return self.person_not_found(story_id, person_id)
 
         # Serialize user input with person and user input
-        serialized_user_input = self.people_serializer_class(person, data=request.data)
+        serialized_user_input = self.people_serializer_class(people_incident.person, data=request.data)
         # Validate data
         if serialized_user_input.is_valid():
             # Save data in person table
@@ -578,46 +790,14 @@ class storyPeopleApiDetails(APIView):
 
     def patch(self, request, story_id, person_id, format=None):
         """Handles PATCH request made to this API endpoint"""
-        # Check user owns story
-        user = request.user
-
+        # Ensure the user owns the story and the person belongs to its incident (check junction table)
         try:
-            story = models.StoriesModel.objects.get(user=user, story_id=story_id)
-        except models.StoriesModel.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found or does not exist"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Check story has incident
-        try:
-            incident = models.IncidentsModel.objects.get(story=story)
-        except models.IncidentsModel.DoesNotExist:
-            return Response(
-                {"Errors❌":"Incident not found or story does not have one"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Check incident has person
-        try:
-            person = models.PeoplesModel.objects.get(person_id=person_id)
-        except models.PeoplesModel.DoesNotExist:
-            return Response(
-                {"Errors❌":"person not found or does not exist"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Ensure the person belongs to this incident (check junction table)
-        try:
-            people_incident = models.PeopleIncidentModel.objects.get(person=person, incident=incident)
+            people_incident = self.get_people_incident(story_id, person_id)
         except models.PeopleIncidentModel.DoesNotExist:
-            return Response(
-                {"Errors❌": "This person is not linked to this incident"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            return self.person_not_found(story_id, person_id)
 
         # Serialise person with changes
-        serialized_user_input = self.people_serializer_class(person, data=request.data, partial=True)
+        serialized_user_input = self.people_serializer_class(people_incident.person, data=request.data, partial=True)
         # Validate data
         if serialized_user_input.is_valid():
             # Save data
@@ -640,43 +820,11 @@ class storyPeopleApiDetails(APIView):
 
     def delete(self, request, story_id, person_id, format=None):
         """Handles DELETE request made to remove a person from an incident"""
-        user = request.user
-
-        # Ensure the user owns the story
+        # Ensure the user owns the story and the person belongs to its incident (check junction table)
         try:
-            story = models.StoriesModel.objects.get(user=user, story_id=story_id)
-        except models.StoriesModel.DoesNotExist:
-            return Response(
-                {"Errors❌": "Story not found or does not exist"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Ensure the story has an incident
-        try:
-            incident = models.IncidentsModel.objects.get(story=story)
-        except models.IncidentsModel.DoesNotExist:
-            return Response(
-                {"Errors❌": "Incident not found or the story does not have one"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Ensure the person exists
-        try:
-            person = models.PeoplesModel.objects.get(person_id=person_id)
-        except models.PeoplesModel.DoesNotExist:
-            return Response(
-                {"Errors❌": "Person not found or does not exist"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Ensure the person belongs to this incident (check junction table)
-        try:
-            people_incident = models.PeopleIncidentModel.objects.get(person=person, incident=incident)
+            people_incident = self.get_people_incident(story_id, person_id)
         except models.PeopleIncidentModel.DoesNotExist:
-            return Response(
-                {"Errors❌": "This person is not linked to this incident"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            return self.person_not_found(story_id, person_id)
 
         # Delete the link between the person and the incident
         people_incident.delete()
@@ -686,7 +834,7 @@ class storyPeopleApiDetails(APIView):
             status=status.HTTP_204_NO_CONTENT,
         )
 
-class vaksApi(APIView):
+class vaksApi(storyScopedApi):
     """API endpoint to manage requests made for CRUD operations of VAKS to a story"""
     # Establish serializers
     story_serializer_class = serializers.StorySerializer
@@ -696,28 +844,18 @@ class vaksApi(APIView):
     story_model_class = models.StoriesModel
     vaks_model_class = models.VAKSModel
 
-    # Establish authentification and permission
-    permission_classes = [IsAuthenticated,]
-
+    @story_conditional_get
+    @cache_story_response
     def get(self, request, story_id, format=None):
         """Handles GET methods made to this endpoint to RETRIEVE vaks of a story"""
-        # Verify user owns story
-        user = request.user
+        # Identify VAKS of the user's story
         try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Error❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Identify VAKS of the story
-        try:
-            vaks = self.vaks_model_class.objects.get(story=story)
+            vaks = self.get_story_child(self.vaks_model_class.objects, story_id)
         except self.vaks_model_class.DoesNotExist:
-            return Response(
+            return self.story_child_not_found(
+                story_id,
                 {"Error❌":"VAKS not found for this story"},
-                status=status.HTTP_404_NOT_FOUND,
+                story_error={"Error❌":"Story not found"},
             )
 
         # Serialize the data retrieved
@@ -732,9 +870,8 @@ class vaksApi(APIView):
     def post(self, request, story_id, format=None):
         """Handles POST requests made to this endpoint to CREATE vaks of a story"""
         # Validate that user owns story
-        user = request.user
         try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
+            story = self.get_story(story_id)
         except self.story_model_class.DoesNotExist:
             return Response(
                 {"Error❌":"Story not found"},
@@ -761,23 +898,14 @@ class vaksApi(APIView):
 
     def put(self, request, story_id, format=None):
         """Handles PUT requests made to this endpoint to UPDATE vaks of a story"""
-        # Validate user owns story
-        user = request.user
+        # Validate user owns story and story has vaks
         try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Error❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Validate story has vaks
-        try:
-            vaks = self.vaks_model_class.objects.get(story=story)
+            vaks = self.get_story_child(self.vaks_model_class.objects, story_id)
         except self.vaks_model_class.DoesNotExist:
-            return Response(
+            return self.story_child_not_found(
+                story_id,
                 {"Error❌":"VAKS not found"},
-                status=status.HTTP_404_NOT_FOUND,
+                story_error={"Error❌":"Story not found"},
             )
 
         # Serialize user input
@@ -800,23 +928,14 @@ class vaksApi(APIView):
 
     def patch(self, request, story_id, format=None):
         """Handles PATCH requests made to this endpoint to UPDATE vaks of a story"""
-        # Validate user owns story
-        user = request.user
+        # Validate user owns story and story has vaks
         try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Error❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Validate story has vaks
-        try:
-            vaks = self.vaks_model_class.objects.get(story=story)
+            vaks = self.get_story_child(self.vaks_model_class.objects, story_id)
         except self.vaks_model_class.DoesNotExist:
-            return Response(
+            return self.story_child_not_found(
+                story_id,
                 {"Error❌":"VAKS not found"},
-                status=status.HTTP_404_NOT_FOUND,
+                story_error={"Error❌":"Story not found"},
             )
 
         # Serialize user input
@@ -839,22 +958,14 @@ class vaksApi(APIView):
 
     def delete(self, request, story_id, format=None):
         """Handles DELETE requests to remove a story's VAKS"""
-        # Ensure the user owns the story
-        user = request.user
-
-        story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        if not story:
-            return Response(
-                {"Error❌": "Story not found or does not belong to you"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Ensure the story has a VAKS
-        vaks = self.vaks_model_class.objects.get(story=story)
-        if not vaks:
-            return Response(
+        # Ensure the user owns the story and the story has a VAKS
+        try:
+            vaks = self.get_story_child(self.vaks_model_class.objects, story_id)
+        except self.vaks_model_class.DoesNotExist:
+            return self.story_child_not_found(
+                story_id,
                 {"Error❌": "VAKS not found for this story"},
-                status=status.HTTP_404_NOT_FOUND,
+                story_error={"Error❌": "Story not found or does not belong to you"},
             )
 
         # Delete the VAKS entry
@@ -865,79 +976,166 @@ class vaksApi(APIView):
             status=status.HTTP_204_NO_CONTENT,
         )
 
-class pointsApi(APIView):
+class pointsApi(storyScopedApi):
     """Api to handle all CRUD requests made to the points api endpoint of a story"""
     # Establish serializers
     stories_serializer_class = serializers.StorySerializer
     points_serializer_class = serializers.PointsSerializer
+    point_update_serializer_class = serializers.PointUpdateSerializer
+    point_ids_serializer_class = serializers.PointIdsSerializer
 
     # Establish models
     stories_model_class = models.StoriesModel
     points_model_class = models.PointsModel
 
-    # Establish authentication and permissions
-    permission_classes = [IsAuthenticated,]
-
+    @story_conditional_get
+    @cache_story_response
     def get(self, request, story_id, format=None):
-        # Validate that the story belongs to the user
-        user = request.user
+        # Retrieve the points of the user's story as plain rows (same output as points_serializer_class)
+        points = list(serializers.points_rows.values(self.filter_story_children(self.points_model_class.objects, story_id)))
+
+        # No points could also mean the story is not the user's
+        if not points and not self.story_exists(story_id):
+            return Response(
+                {"Errors❌":"Story not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        # Return success message with point of the story
+        return Response(
+            {"Points retrieved successfully✅":serializers.points_rows.serialize(points)},
+            status=status.HTTP_200_OK,
+        )
 
+    def post(self, request, story_id, format=None):
+        # Validate that user owns the story
+        try:
+            story = self.get_story(story_id)
+        except self.stories_model_class.DoesNotExist:
+            return Response(
+                {"Errors❌":"Story not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        # A JSON array creates many points in one request
+        if isinstance(request.data, list):
+            return self.post_many(request, story)
+
+        # Serialize data entered by user
+        serialized_user_input = self.points_serializer_class(data=request.data, context={"story":story})
+        # Validate data entered
+        if serialized_user_input.is_valid():
+            # Save data
+            serialized_user_input.save()
+            # Return success message with data
+            return Response(
+                {"Points created successfully✅":serialized_user_input.data},
+                status=status.HTTP_201_CREATED,
+            )
+        # Return error message with errors
+        return Response(
+            {"Errors❌":serialized_user_input.errors},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    def post_many(self, request, story):
+        """Creates every point in the list with one INSERT (nothing is created if any point is invalid)"""
+        # Serialize data entered by user
+        serialized_user_input = self.points_serializer_class(data=request.data, many=True, context={"story":story})
+        # Validate data entered
+        if not serialized_user_input.is_valid():
+            return Response(
+                {"Errors❌":serialized_user_input.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # Save data
+        with transaction.atomic():
+            serialized_user_input.save()
+        # Return success message with data
+        return Response(
+            {"Points created successfully✅":serialized_user_input.data},
+            status=status.HTTP_201_CREATED,
+        )
+
+    def patch(self, request, story_id, format=None):
+        """Handles PATCH requests to update many points of a story at once ([{"point_id":..., "content":...}])"""
+        # Validate that user owns the story
         try:
-            story = self.stories_model_class.objects.get(user=user, story_id=story_id)
+            story = self.get_story(story_id)
         except self.stories_model_class.DoesNotExist:
             return Response(
                 {"Errors❌":"Story not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Retrieve the points of the story
-        try:
-            points = self.points_model_class.objects.filter(story=story_id)
-        except self.points_model_class.DoesNotExist:
+        # Serialize data entered by user
+        serialized_user_input = self.point_update_serializer_class(data=request.data, many=True)
+        if not serialized_user_input.is_valid():
             return Response(
-                {"Errors❌":"Points not found"},
-                status=status.HTTP_404_NOT_FOUND,
+                {"Errors❌":serialized_user_input.errors},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Serialize the data retrieved
-        serialized_data = self.points_serializer_class(points, many=True)
+        # Retrieve all the points being updated in one query and report the ones not in this story
+        point_ids = [point_data["point_id"] for point_data in serialized_user_input.validated_data]
+        points = self.points_model_class.objects.filter(story=story).in_bulk(point_ids)
+        errors = {
+            index: {"point_id": ["Point not found"]}
+            for index, point_id in enumerate(point_ids)
+            if point_id not in points
+        }
+        if errors:
+            return Response(
+                {"Errors❌":errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        # Return success message with point of the story
+        # Save data
+        serialized_user_input.instance = points.values()
+        with transaction.atomic():
+            updated_points = serialized_user_input.save()
+        # Return success message with data
         return Response(
-            {"Points retrieved successfully✅":serialized_data.data},
+            {"Points updated successfully✅":self.points_serializer_class(updated_points, many=True).data},
             status=status.HTTP_200_OK,
         )
 
-    def post(self, request, story_id, format=None):
+    def delete(self, request, story_id, format=None):
+        """Handles DELETE requests to delete many points of a story at once ({"point_ids": [...]} or [...])"""
         # Validate that user owns the story
-        user = request.user
-
         try:
-            story = self.stories_model_class.objects.get(user=user, story_id=story_id)
+            story = self.get_story(story_id)
         except self.stories_model_class.DoesNotExist:
             return Response(
                 {"Errors❌":"Story not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Serialize data entered by user
-        serialized_user_input = self.points_serializer_class(data=request.data, context={"story":story})
-        # Validate data entered
-        if serialized_user_input.is_valid():
-            # Save data
-            serialized_user_input.save()
-            # Return success message with data
+        user_input = {"point_ids": request.data} if isinstance(request.data, list) else request.data
+        serialized_user_input = self.point_ids_serializer_class(data=user_input)
+        if not serialized_user_input.is_valid():
             return Response(
-                {"Points created successfully✅":serialized_user_input.data},
-                status=status.HTTP_200_OK,
+                {"Errors❌":serialized_user_input.errors},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-        # Return error message with errors
+
+        # Delete the points of this story with the given ids
+        point_ids = set(serialized_user_input.validated_data["point_ids"])
+        with transaction.atomic():
+            points = self.points_model_class.objects.filter(story=story, point_id__in=point_ids)
+            found_point_ids = set(points.values_list("point_id", flat=True))
+            points.delete()
+
+        # Return success message
         return Response(
-            {"Errors❌":serialized_user_input.errors},
-            status=status.HTTP_400_BAD_REQUEST,
+            {
+                "Success ✅": f"{len(found_point_ids)} points have been deleted",
+                "Points not found": sorted(point_ids - found_point_ids),
+            },
+            status=status.HTTP_200_OK,
         )
 
-class pointDetailsApi(APIView):
+class pointDetailsApi(storyScopedApi):
     """API endpoint to manage requests made for CRUD operations to a specific point of a story"""
     # Establish serializers
     stories_serializer_class = serializers.StorySerializer
@@ -947,29 +1145,15 @@ class pointDetailsApi(APIView):
     stories_model_class = models.StoriesModel
     points_model_class = models.PointsModel
 
-    # Establish authentication and permissions
-    permission_classes = [IsAuthenticated,]
-
+    @story_conditional_get
+    @cache_story_response
     def get(self, request, story_id, point_id, format=None):
         """Handles GET requests to this API endpoint to retrieve a specific story point"""
-        # Validate story belongs to user
-        user = request.user
-
-        try:
-            story = self.stories_model_class.objects.get(user=user, story_id=story_id)
-        except self.stories_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Validate point belongs to story
+        # Validate story belongs to user and point belongs to story
         try:
-            point = self.points_model_class.objects.get(story=story_id, point_id=point_id)
+            point = self.get_story_child(self.points_model_class.objects, story_id, point_id=point_id)
         except self.points_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Point not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            return self.story_child_not_found(story_id, {"Errors❌":"Point not found"})
         # Serialize retrieved data (point)
         serialized_retrieved_data = self.points_serializer_class(point)
         # Return success message with data (point)
@@ -980,23 +1164,11 @@ class pointDetailsApi(APIView):
 
     def put(self, request, story_id, point_id, format=None):
         """Handles PUT requests to this API endpoint to update completely a specific story point"""
-        # Validate story belongs to a user
-        user = request.user
-        try:
-            story = self.stories_model_class.objects.get(user=user, story_id=story_id)
-        except self.stories_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Validate point belongs to a story
+        # Validate story belongs to user and point belongs to story
         try:
-            point = self.points_model_class.objects.get(story=story, point_id=point_id)
+            point = self.get_story_child(self.points_model_class.objects, story_id, point_id=point_id)
         except self.points_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Point not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            return self.story_child_not_found(story_id, {"Errors❌":"Point not found"})
         # Serialize the user input with the current point
         serialized_user_input = self.points_serializer_class(point, data=request.data)
         # Validate serialized data
@@ -1016,23 +1188,11 @@ class pointDetailsApi(APIView):
 
     def patch(self, request, story_id, point_id, format=None):
         """Handles PATCH requests to this API endpoint to partially update a specific story point"""
-        # Validate story belongs to a user
-        user = request.user
-        try:
-            story = self.stories_model_class.objects.get(user=user, story_id=story_id)
-        except self.stories_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Validate point belongs to a story
+        # Validate story belongs to user and point belongs to story
         try:
-            point = self.points_model_class.objects.get(story=story, point_id=point_id)
+            point = self.get_story_child(self.points_model_class.objects, story_id, point_id=point_id)
         except self.points_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Point not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            return self.story_child_not_found(story_id, {"Errors❌":"Point not found"})
         # Serialize the user input with the current point
         serialized_user_input = self.points_serializer_class(point, data=request.data, partial=True)
         # Validate serialized data
@@ -1052,23 +1212,11 @@ class pointDetailsApi(APIView):
 
     def delete(self, request, story_id, point_id, format=None):
         """Handles DELETE request to this API endpoint to delete a specific story point"""
-        # Validate story belongs to a user
-        user = request.user
-        try:
-            story = self.stories_model_class.objects.get(user=user, story_id=story_id)
-        except self.stories_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Validate point belongs to a story
+        # Validate story belongs to user and point belongs to story
         try:
-            point = self.points_model_class.objects.get(story=story, point_id=point_id)
+            point = self.get_story_child(self.points_model_class.objects, story_id, point_id=point_id)
         except self.points_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Point not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            return self.story_child_not_found(story_id, {"Errors❌":"Point not found"})
         # Delete point
         point.delete()
         # Return success message
@@ -1077,7 +1225,7 @@ class pointDetailsApi(APIView):
             status=status.HTTP_204_NO_CONTENT,
         )
 
-class scriptApi(APIView):
+class scriptApi(storyScopedApi):
     """API endpoint to manage requests made for CRUD operations to the script of a story"""
     # Establish serializers
     story_serializer_class = serializers.StorySerializer
@@ -1087,27 +1235,14 @@ class scriptApi(APIView):
     stories_model_class = models.StoriesModel
     scripts_model_class = models.ScriptsModel
 
-    # Establish authentication and permissions
-    permission_classes = [IsAuthenticated,]
-
+    @story_conditional_get
+    @cache_story_response
     def get(self, request, story_id, format=None):
-        # Validate story belongs to the user
-        user = request.user
-        try:
-            story = self.stories_model_class.objects.get(user=user, story_id=story_id)
-        except self.stories_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Validate story has script
+        # Validate story belongs to the user and has a script
         try:
-            script = self.scripts_model_class.objects.get(story=story_id)
+            script = self.get_story_child(self.scripts_model_class.objects, story_id)
         except self.scripts_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Script not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            return self.story_child_not_found(story_id, {"Errors❌":"Script not found"})
         # Serialize retrieved script
         serialized_retrieved_data = self.script_serializer_class(script)
         # Return success message and script
@@ -1118,9 +1253,8 @@ class scriptApi(APIView):
 
     def post(self, request, story_id, format=None):
         # Validate story belongs to the user
-        user = request.user
         try:
-            story = self.stories_model_class.objects.get(user=user, story_id=story_id)
+            story = self.get_story(story_id)
         except self.stories_model_class.DoesNotExist:
             return Response(
                 {"Errors❌":"Story not found"},
@@ -1150,23 +1284,11 @@ class scriptApi(APIView):
         )
 
     def put(self, request, story_id, format=None):
-        # Validate story belongs to the user
-        user = request.user
-        try:
-            story = self.stories_model_class.objects.get(user=user, story_id=story_id)
-        except self.stories_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Validate story has a script
+        # Validate story belongs to the user and has a script
         try:
-            script = self.scripts_model_class.objects.get(story=story_id)
+            script = self.get_story_child(self.scripts_model_class.objects, story_id)
         except self.scripts_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Script not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            return self.story_child_not_found(story_id, {"Errors❌":"Script not found"})
         # Serialize user input with script
         serialized_user_input = self.script_serializer_class(script, data=request.data)
         # Validate serialized user input
@@ -1185,23 +1307,11 @@ class scriptApi(APIView):
         )
 
     def patch(self, request, story_id, format=None):
-        # Validate story belongs to the user
-        user = request.user
-        try:
-            story = self.stories_model_class.objects.get(user=user, story_id=story_id)
-        except self.stories_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Validate story has a script
+        # Validate story belongs to the user and has a script
         try:
-            script = self.scripts_model_class.objects.get(story=story_id)
+            script = self.get_story_child(self.scripts_model_class.objects, story_id)
         except self.scripts_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Script not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            return self.story_child_not_found(story_id, {"Errors❌":"Script not found"})
         # Serialize user input with script and partial set to True
         serialized_user_input = self.script_serializer_class(script, data=request.data, partial=True)
         # Validate serialized user input
@@ -1220,23 +1330,11 @@ class scriptApi(APIView):
         )
 
     def delete(self, request, story_id, format=None):
-        # Validate story belongs to the user
-        user = request.user
-        try:
-            story = self.stories_model_class.objects.get(user=user, story_id=story_id)
-        except self.stories_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Validate story has a script
+        # Validate story belongs to the user and has a script
         try:
-            script = self.scripts_model_class.objects.get(story=story_id)
+            script = self.get_story_child(self.scripts_model_class.objects, story_id)
         except self.scripts_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Script not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            return self.story_child_not_found(story_id, {"Errors❌":"Script not found"})
         # Delete script
         script.delete()
         # Return success message and data
@@ -1245,7 +1343,7 @@ class scriptApi(APIView):
             status=status.HTTP_204_NO_CONTENT,
         )
 
-class linksApi(APIView):
+class linksApi(storyScopedApi):
     """APIView to handles CRUD requests made to the links endpoint"""
     # Class serializers
     story_serializer_class = serializers.StorySerializer
@@ -1257,49 +1355,37 @@ class linksApi(APIView):
     links_model_class = models.LinksModel
     story_link_model_class = models.StoryLinkModel
 
-    # Class authentication and permissions
-    permission_classes = [IsAuthenticated,]
-
+    @story_conditional_get
+    @cache_story_response
     def get(self, request, story_id, format=None):
         """Handles GET methods to the links API endpoint to RETRIEVE links"""
-        # Validate story belongs to user
-        user = request.user
-        try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+        # Retrieve all links belonging to the user's story with one join through the junction table
+        links = list(serializers.links_rows.values(self.filter_story_children(
+            self.links_model_class.objects,
+            story_id,
+            story_path="storylinkmodel__story",
+        )))
 
-        # Retrieve all link_ids belonging to the story
-        try:
-            links_belonging_to_story = self.story_link_model_class.objects.filter(story=story)
-        except self.story_link_model_class.DoesNotExist:
+        # No links could also mean the story is not the user's
+        if not links and not self.story_exists(story_id):
             return Response(
-                {"Errors❌":"Links not found"},
+                {"Errors❌":"Story not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        # Retrieve all links
-        links = [story_link_record.link for story_link_record in links_belonging_to_story]
-
-        # Retrieve data for each link_id
-        serialized_retrieved_data = self.links_serializer_class(links, many=True)
 
         # Return success message with link data
         return Response(
             {
                 "Success ✅": "Links retrieved successfully",
-                "Links": serialized_retrieved_data.data
+                "Links": serializers.links_rows.serialize(links)
             },
             status=status.HTTP_200_OK,
         )
 
     def post(self, request, story_id, format=None):
         """Handles POST requests to CREATE a link for a story"""
-        user = request.user
         try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
+            story = self.get_story(story_id)
         except self.story_model_class.DoesNotExist:
             return Response(
                 {"error": "Story not found ❌"},
@@ -1313,7 +1399,7 @@ class linksApi(APIView):
             link_data = serialized_input.validated_data
 
             # Check if link exists, create if not
-            link, _ = self.links_model_class.objects.get_or_create(**link_data)
+            link, _ = self.links_model_class.objects.get_or_create_by_content(**link_data)
 
             # Link the story and link if not already linked
             story_link, created = self.story_link_model_class.objects.get_or_create(story=story, link=link)
@@ -1331,7 +1417,7 @@ class linksApi(APIView):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-class linkDetailsApi(APIView):
+class linkDetailsApi(storyScopedApi):
     """APIView to handle CRUD requests to the link specific endpoint"""
     # Class serializers
     story_serializer_class = serializers.StorySerializer
@@ -1343,31 +1429,24 @@ class linkDetailsApi(APIView):
     links_model_class = models.LinksModel
     story_link_model_class = models.StoryLinkModel
 
-    # Class authentication and permissions
-    permission_classes = [IsAuthenticated,]
+    def get_link(self, story_id, link_id):
+        """Returns the link if it is attached to the user's story (one query through the junction table)"""
+        return self.get_story_child(
+            self.links_model_class.objects.distinct(),
+            story_id,
+            story_path="storylinkmodel__story",
+            link_id=link_id,
+        )
 
+    @story_conditional_get
+    @cache_story_response
     def get(self, request, story_id, link_id, format=None):
         """Handles GET methods to the links API endpoint to RETRIEVE links"""
-        # Validate story belongs to user
-        user = request.user
-        try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Validate link belongs to story
+        # Validate story belongs to user and link belongs to story
         try:
-            link = self.story_link_model_class.objects.get(story=story, link_id=link_id)
-        except self.story_link_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Link not found for this story"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Retrieve all links
-        link_details = self.links_model_class.objects.get(link_id=link_id)
+            link_details = self.get_link(story_id, link_id)
+        except self.links_model_class.DoesNotExist:
+            return self.story_child_not_found(story_id, {"Errors❌":"Link not found for this story"})
 
         # Retrieve data for each link_id
         serialized_retrieved_data = self.links_serializer_class(link_details)
@@ -1383,27 +1462,11 @@ class linkDetailsApi(APIView):
 
     def put(self, request, story_id, link_id, format=None):
         """Handles PUT requests made the the links endpoint to compeletely update a link"""
-        # Validate story belongs to user
-        user = request.user
-        try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Validate link belongs to story
+        # Validate story belongs to user and link belongs to story
         try:
-            link = self.story_link_model_class.objects.get(story=story, link_id=link_id)
-        except self.story_link_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Link not found for this story"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Retrieve the link
-        link = self.links_model_class.objects.get(link_id=link_id)
+            link = self.get_link(story_id, link_id)
+        except self.links_model_class.DoesNotExist:
+            return self.story_child_not_found(story_id, {"Errors❌":"Link not found for this story"})
 
         # Serialize user input with link
         serialized_user_input = self.links_serializer_class(link, data=request.data)
@@ -1430,27 +1493,11 @@ class linkDetailsApi(APIView):
 
     def patch(self, request, story_id, link_id, format=None):
         """Handles PUT requests made the the links endpoint to partially update a link"""
-        # Validate story belongs to user
-        user = request.user
-        try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Validate link belongs to story
+        # Validate story belongs to user and link belongs to story
         try:
-            link = self.story_link_model_class.objects.get(story=story, link_id=link_id)
-        except self.story_link_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Link not found for this story"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Retrieve the link
-        link = self.links_model_class.objects.get(link_id=link_id)
+            link = self.get_link(story_id, link_id)
+        except self.links_model_class.DoesNotExist:
+            return self.story_child_not_found(story_id, {"Errors❌":"Link not found for this story"})
 
         # Serialize user input with link
         serialized_user_input = self.links_serializer_class(link, data=request.data, partial=True)
@@ -1476,33 +1523,18 @@ class linkDetailsApi(APIView):
         )
 
     def delete(self, request, story_id, link_id, format=None):
-        """Handles DELETE request to this API endpoint to delete a specific link"""
-        # Validate story belongs to a user
-        user = request.user
-        try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Validate link belongs to a story
-        try:
-            link = self.links_model_class.objects.get(story=story, link_id=link_id)
-        except self.links_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Link not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Delete link
-        link.delete()
+        """Handles DELETE request to this API endpoint to remove a specific link from a story"""
+        # Remove the link from the user's story (links are shared, so only the junction record goes)
+        deleted, _ = self.filter_story_children(self.story_link_model_class.objects, story_id, link_id=link_id).delete()
+        if not deleted:
+            return self.story_child_not_found(story_id, {"Errors❌":"Link not found"})
         # Return success message
         return Response(
             {"Success ✅": "Link has been deleted"},
             status=status.HTTP_204_NO_CONTENT,
         )
 
-class charactersApi(APIView):
+class charactersApi(storyScopedApi):
     """APIView to handle CRUD requests to the characters API endpoint"""
     # Class serializers
     story_serializer_class = serializers.StorySerializer
@@ -1514,49 +1546,37 @@ class charactersApi(APIView):
     characters_model_class = models.CharactersModel
     story_character_model_class = models.StoryCharactersModel
 
-    # Class authentication and permissions
-    permission_classes = [IsAuthenticated,]
-
+    @story_conditional_get
+    @cache_story_response
     def get(self, request, story_id, format=None):
         """Handles GET methods to the characters API endpoint to RETRIEVE characters"""
-        # Validate story belongs to user
-        user = request.user
-        try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+        # Retrieve all characters belonging to the user's story with one join through the junction table
+        characters = list(serializers.characters_rows.values(self.filter_story_children(
+            self.characters_model_class.objects,
+            story_id,
+            story_path="storycharactersmodel__story",
+        )))
 
-        # Retrieve all character_ids belonging to the story
-        try:
-            characters_belonging_to_story = self.story_character_model_class.objects.filter(story=story)
-        except self.story_character_model_class.DoesNotExist:
+        # No characters could also mean the story is not the user's
+        if not characters and not self.story_exists(story_id):
             return Response(
-                {"Errors❌":"Characters not found"},
+                {"Errors❌":"Story not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        # Retrieve all characters
-        characters = [story_character_record.characters for story_character_record in characters_belonging_to_story]
-
-        # Retrieve data for each character_id
-        serialized_retrieved_data = self.characters_serializer_class(characters, many=True)
 
         # Return success message with character data
         return Response(
             {
                 "Success ✅": "Characters retrieved successfully",
-                "Characters": serialized_retrieved_data.data
+                "Characters": serializers.characters_rows.serialize(characters)
             },
             status=status.HTTP_200_OK,
         )
 
     def post(self, request, story_id, format=None):
         """Handles POST requests to CREATE a character for a story"""
-        user = request.user
         try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
+            story = self.get_story(story_id)
         except self.story_model_class.DoesNotExist:
             return Response(
                 {"error": "Story not found ❌"},
@@ -1570,10 +1590,10 @@ class charactersApi(APIView):
             character_data = serialized_input.validated_data
 
             # Check if character exists, create if not
-            character, _ = self.characters_model_class.objects.get_or_create(**character_data)
+            character, _ = self.characters_model_class.objects.get_or_create_by_content(**character_data)
 
             # Link the story and character if not already linked
-            story_character, created = self.story_character_model_class.objects.get_or_create(story=story, characters=character)
+            story_character, created = self.story_character_model_class.objects.get_or_create(story=story, character=character)
 
             return Response(
                 {
@@ -1588,7 +1608,7 @@ class charactersApi(APIView):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-class characterDetailsApi(APIView):
+class characterDetailsApi(storyScopedApi):
     """APIView to handle CRUD requests to the character details endpoint"""
     # Class serializers
     story_serializer_class = serializers.StorySerializer
@@ -1600,31 +1620,24 @@ class characterDetailsApi(APIView):
     characters_model_class = models.CharactersModel
     story_character_model_class = models.StoryCharactersModel
 
-    # Class authentication and permissions
-    permission_classes = [IsAuthenticated,]
+    def get_character(self, story_id, character_id):
+        """Returns the character if it is attached to the user's story (one query through the junction table)"""
+        return self.get_story_child(
+            self.characters_model_class.objects.distinct(),
+            story_id,
+            story_path="storycharactersmodel__story",
+            character_id=character_id,
+        )
 
+    @story_conditional_get
+    @cache_story_response
     def get(self, request, story_id, character_id, format=None):
         """Handles GET methods to the character details API endpoint to RETRIEVE a character"""
-        # Validate story belongs to user
-        user = request.user
-        try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Validate character belongs to story
+        # Validate story belongs to user and character belongs to story
         try:
-            character = self.story_character_model_class.objects.get(story=story, character_id=character_id)
-        except self.story_character_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Character not found for this story"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Retrieve character details
-        character_details = self.characters_model_class.objects.get(character_id=character_id)
+            character_details = self.get_character(story_id, character_id)
+        except self.characters_model_class.DoesNotExist:
+            return self.story_child_not_found(story_id, {"Errors❌":"Character not found for this story"})
 
         # Serialized retrieved data for character details
         serialized_retrieved_data = self.characters_serializer_class(character_details)
@@ -1640,27 +1653,11 @@ class characterDetailsApi(APIView):
 
     def put(self, request, story_id, character_id, format=None):
         """Handles PUT requests made the the character details endpoint to compeletely update a character"""
-        # Validate story belongs to user
-        user = request.user
-        try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Validate character belongs to story
+        # Validate story belongs to user and character belongs to story
         try:
-            link = self.story_character_model_class.objects.get(story=story, character_id=character_id)
-        except self.story_character_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Character not found for this story"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Retrieve the character
-        character = self.characters_model_class.objects.get(character_id=character_id)
+            character = self.get_character(story_id, character_id)
+        except self.characters_model_class.DoesNotExist:
+            return self.story_child_not_found(story_id, {"Errors❌":"Character not found for this story"})
 
         # Serialize user input with character
         serialized_user_input = self.characters_serializer_class(character, data=request.data)
@@ -1687,27 +1684,11 @@ class characterDetailsApi(APIView):
 
     def patch(self, request, story_id, character_id, format=None):
         """Handles PUT requests made the the character details endpoint to partially update a character"""
-        # Validate story belongs to user
-        user = request.user
+        # Validate story belongs to user and character belongs to story
         try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Validate character belongs to story
-        try:
-            character = self.story_character_model_class.objects.get(story=story, character_id=character_id)
-        except self.story_character_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Character not found for this story"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Retrieve the character
-        character = self.characters_model_class.objects.get(character_id=character_id)
+            character = self.get_character(story_id, character_id)
+        except self.characters_model_class.DoesNotExist:
+            return self.story_child_not_found(story_id, {"Errors❌":"Character not found for this story"})
 
         # Serialize user input with character
         serialized_user_input = self.characters_serializer_class(character, data=request.data, partial=True)
@@ -1733,26 +1714,11 @@ class characterDetailsApi(APIView):
         )
 
     def delete(self, request, story_id, character_id, format=None):
-        """Handles DELETE request to this API endpoint to delete a specific character"""
-        # Validate story belongs to a user
-        user = request.user
-        try:
-            story = self.story_model_class.objects.get(user=user, story_id=story_id)
-        except self.story_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Story not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Validate character belongs to a story
-        try:
-            character = self.characters_model_class.objects.get(story=story, character_id=character_id)
-        except self.characters_model_class.DoesNotExist:
-            return Response(
-                {"Errors❌":"Character not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        # Delete character
-        character.delete()
+        """Handles DELETE request to this API endpoint to remove a specific character from a story"""
+        # Remove the character from the user's story (characters are shared, so only the junction record goes)
+        deleted, _ = self.filter_story_children(self.story_character_model_class.objects, story_id, character_id=character_id).delete()
+        if not deleted:
+            return self.story_child_not_found(story_id, {"Errors❌":"Character not found"})
         # Return success message
         return Response(
             {"Success ✅": "Character has been deleted"},